@@ -0,0 +1,406 @@
+import argparse
+import asyncio
+import json
+import math
+import threading
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from typing import *
+import numpy as np
+import pandas as pd
+import streamlit as st
+import tornado.web
+from tornado.httputil import format_timestamp
+from utils import *
+from ingest import start_ingestion
+from crash_index import crash_summary
+from health import get_health_alerts
+
+API_PORT = 8600
+# plot_data rows returned without a since= cursor
+PLOT_DATA_TAIL = 100
+# rows returned at most by one request
+MAX_ROWS = 10000
+# rendered responses kept for unchanged polls
+RESPONSE_CACHE_SIZE = 256
+
+
+class ResponseCache:
+    """
+    Rendered response bodies keyed by request URI, each valid for one store version.
+
+    Pollers repeating the same request between two publishes get the cached body
+    (or a 304) without the tables being read again.
+    """
+
+    def __init__(self, size: int = RESPONSE_CACHE_SIZE):
+        self.size = size
+        self.lock = threading.Lock()
+        self.bodies: OrderedDict[str, Tuple[int, str]] = OrderedDict()
+
+    def get(self, uri: str, version: int) -> Optional[str]:
+        with self.lock:
+            cached = self.bodies.get(uri)
+            if cached is None or cached[0] != version:
+                return None
+            self.bodies.move_to_end(uri)
+            return cached[1]
+
+    def put(self, uri: str, version: int, body: str):
+        with self.lock:
+            self.bodies[uri] = (version, body)
+            self.bodies.move_to_end(uri)
+            while len(self.bodies) > self.size:
+                self.bodies.popitem(last=False)
+
+
+def frame_json(df: pd.DataFrame, orient: str = 'records') -> str:
+    return df.to_json(orient=orient, date_format='epoch', date_unit='s', default_handler=str)
+
+
+def envelope(data: str, cursor: Any = None) -> str:
+    """
+    Wraps an already serialized payload, with the cursor to pass as since= next time.
+    """
+    return f'{{"cursor": {json.dumps(cursor)}, "data": {data}}}'
+
+
+def rows_since(df: pd.DataFrame, column: np.ndarray, since: Optional[float], limit: int) -> pd.DataFrame:
+    """
+    Returns the first limit rows whose (sorted) column is greater than since, or the
+    last limit rows without since.
+    """
+    if since is None:
+        return df.iloc[max(0, len(df) - limit):]
+    start = int(np.searchsorted(column, since, side='right'))
+    return df.iloc[start:start + limit]
+
+
+class StoreHandler(tornado.web.RequestHandler):
+    """
+    Serves a response computed from DataStore tables, with conditional requests.
+
+    Subclasses name the tables a response depends on (sources) and serialize it
+    (render_body). The ETag is the latest store version of those tables and
+    Last-Modified the time it was published, so an unchanged poll is answered
+    with 304 after a few dictionary lookups, and a changed one is rendered once
+    per version whoever asks.
+    """
+    content_type = 'application/json'
+
+    def initialize(self, directory_path: str, cache: ResponseCache):
+        self.directory_path = directory_path
+        self.cache = cache
+
+    def compute_etag(self) -> Optional[str]:
+        # set from the store version in get(), never by hashing the body
+        return None
+
+    def sources(self, *args) -> List[Tuple[Optional[str], str]]:
+        raise NotImplementedError
+
+    def render_body(self, *args) -> str:
+        raise NotImplementedError
+
+    def since(self) -> Optional[float]:
+        since = self.get_query_argument('since', None)
+        try:
+            return None if since is None else float(since)
+        except ValueError:
+            raise tornado.web.HTTPError(400, "since must be a number")
+
+    def limit(self, default: int = MAX_ROWS) -> int:
+        try:
+            return max(0, min(MAX_ROWS, int(self.get_query_argument('limit', default))))
+        except ValueError:
+            raise tornado.web.HTTPError(400, "limit must be an integer")
+
+    def not_modified(self, published: float) -> bool:
+        if self.request.headers.get('If-None-Match'):
+            return self.check_etag_header()
+        if_modified_since = self.request.headers.get('If-Modified-Since')
+        if not if_modified_since:
+            return False
+        try:
+            # HTTP dates have whole seconds, rounding down would hide a publish later in
+            # the same second; rounding up only costs a full response in that second
+            return math.ceil(published) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+
+    def get(self, *args):
+        version, published = get_data_store().published(self.directory_path, self.sources(*args))
+        self.set_header('ETag', f'"{version}"')
+        self.set_header('Cache-Control', 'no-cache')
+        if published:
+            self.set_header('Last-Modified', format_timestamp(published))
+        if version and self.not_modified(published):
+            self.set_status(304)
+            return
+        body = self.cache.get(self.request.uri, version)
+        if body is None:
+            body = self.render_body(*args)
+            self.cache.put(self.request.uri, version, body)
+        self.set_header('Content-Type', self.content_type)
+        self.write(body)
+
+    def fuzzer(self, fuzzer_name: str) -> str:
+        if fuzzer_name not in get_fuzzers(self.directory_path):
+            raise tornado.web.HTTPError(404, f"No fuzzer {fuzzer_name}")
+        return fuzzer_name
+
+
+class FuzzersHandler(StoreHandler):
+    """
+    GET /api/fuzzers: {fuzzer name: node}.
+    """
+
+    def sources(self):
+        return [(None, 'fuzzers')]
+
+    def render_body(self):
+        return envelope(json.dumps({fuzzer_name: fuzzer_node(fuzzer_name)
+                                    for fuzzer_name in get_fuzzers(self.directory_path)}))
+
+
+class FuzzerStatsHandler(StoreHandler):
+    """
+    GET /api/fuzzer_stats: {fuzzer name: {stat: value}}, timestamps in epoch seconds.
+    """
+
+    def sources(self):
+        return [(None, 'fuzzer_stats')]
+
+    def render_body(self):
+        fuzzer_stats = get_fuzzer_stats(self.directory_path)
+        if fuzzer_stats is None:
+            return envelope('{}')
+        return envelope(frame_json(fuzzer_stats, orient='index'))
+
+
+class PlotDataHandler(StoreHandler):
+    """
+    GET /api/plot_data/<fuzzer>?since=<relative_time>&limit=<rows>: plot_data rows
+    after since, or the last PLOT_DATA_TAIL rows. The cursor is the relative_time
+    of the last row returned.
+    """
+
+    def sources(self, fuzzer_name):
+        return [(self.fuzzer(fuzzer_name), 'plot_data')]
+
+    def render_body(self, fuzzer_name):
+        plot_data = get_table(self.directory_path, fuzzer_name, 'plot_data')
+        since = self.since()
+        if plot_data is None or plot_data.empty:
+            return envelope('[]', since)
+        rows = rows_since(plot_data, plot_data['relative_time'].to_numpy(), since,
+                          self.limit(MAX_ROWS if since is not None else PLOT_DATA_TAIL))
+        cursor = rows['relative_time'].iloc[-1].item() if not rows.empty else since
+        return envelope(frame_json(rows), cursor)
+
+
+def queue_summary(corpus: pd.DataFrame) -> Dict[str, Any]:
+    return {
+        'entries': len(corpus),
+        'favored': int(corpus['favored'].sum()),
+        'new_coverage': int(corpus['cov'].sum()),
+        'imported': int(corpus['sync'].notna().sum()),
+        'last_id': int(corpus.index[-1]) if len(corpus) else None,
+        'last_time': None if corpus.empty or pd.isna(corpus['time'].max()) else int(corpus['time'].max()),
+    }
+
+
+class QueueSummaryHandler(StoreHandler):
+    """
+    GET /api/queue: per fuzzer, the number of queue entries, favored entries,
+    entries with new coverage and imported entries, the last id and the latest
+    find time (ms since the fuzzer started).
+    """
+
+    def sources(self):
+        return [(None, 'fuzzers')] + [(fuzzer_name, 'corpus') for fuzzer_name in get_fuzzers(self.directory_path)]
+
+    def render_body(self):
+        return envelope(json.dumps({fuzzer_name: queue_summary(corpus) for fuzzer_name, corpus
+                                    in get_tables(self.directory_path, 'corpus').items()}))
+
+
+class QueueEntriesHandler(StoreHandler):
+    """
+    GET /api/queue/<fuzzer>?since=<id>&limit=<rows>: queue entries with an id
+    greater than since (all entries without it). The cursor is the last id returned.
+    """
+
+    def sources(self, fuzzer_name):
+        return [(self.fuzzer(fuzzer_name), 'corpus')]
+
+    def render_body(self, fuzzer_name):
+        corpus = get_table(self.directory_path, fuzzer_name, 'corpus')
+        since = self.since()
+        if corpus is None or corpus.empty:
+            return envelope('[]', since)
+        rows = rows_since(corpus, corpus.index.to_numpy(), -1 if since is None else since, self.limit())
+        cursor = int(rows.index[-1]) if not rows.empty else since
+        return envelope(frame_json(rows.reset_index()), cursor)
+
+
+class CrashesHandler(StoreHandler):
+    """
+    GET /api/crashes?since=<mtime_ns>: saved, distinct and first-found crashes and
+    hangs per fuzzer, and with since the inputs saved after that modification time
+    (ns). The cursor is the latest modification time of the index.
+    """
+
+    def sources(self):
+        return [(None, 'crash_index')]
+
+    def render_body(self):
+        crash_index = get_data_store().get(self.directory_path, None, 'crash_index')
+        since = self.since()
+        if crash_index is None or crash_index.empty:
+            return envelope('{"summary": [], "new": []}', since)
+        summary = frame_json(crash_summary(crash_index).reset_index())
+        new = '[]'
+        if since is not None:
+            rows = crash_index[crash_index['mtime_ns'] > since].sort_values('mtime_ns')
+            new = frame_json(rows[['fuzzer', 'kind', 'file_name', 'size', 'mtime_ns', 'digest', 'copies',
+                                   'first_copy']].iloc[:self.limit()])
+        cursor = int(crash_index['mtime_ns'].max())
+        return envelope(f'{{"summary": {summary}, "new": {new}}}', cursor)
+
+
+class HealthHandler(StoreHandler):
+    """
+    GET /api/health: the active health alerts (fuzzer, rule, severity, since).
+    """
+
+    def sources(self):
+        return [(None, 'health_alerts')]
+
+    def render_body(self):
+        alerts = get_health_alerts(self.directory_path)
+        if alerts is None:
+            return envelope('[]')
+        return envelope(frame_json(alerts))
+
+
+def prometheus_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class MetricsHandler(StoreHandler):
+    """
+    GET /metrics: Prometheus text exposition of every numeric fuzzer_stats value
+    (aflplusplus_<stat>, timestamps in epoch seconds), queue summaries, crash
+    counts and rolling window metrics, labelled by fuzzer.
+    """
+    content_type = 'text/plain; version=0.0.4; charset=utf-8'
+
+    def sources(self):
+        return [(None, 'fuzzers'), (None, 'fuzzer_stats'), (None, 'crash_index')] + \
+            [(fuzzer_name, table) for fuzzer_name in get_fuzzers(self.directory_path)
+             for table in ('corpus', 'window_metrics')]
+
+    def render_body(self):
+        lines = []
+
+        def gauge(name: str, help_text: str, samples: Iterable[Tuple[Dict[str, str], float]]):
+            samples = [(labels, value) for labels, value in samples if pd.notna(value)]
+            if not samples:
+                return
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            for labels, value in samples:
+                label_text = ','.join(f'{key}="{prometheus_label(str(label))}"' for key, label in labels.items())
+                value = float(value)
+                lines.append(f"{name}{{{label_text}}} {int(value) if value.is_integer() else repr(value)}")
+
+        fuzzer_stats = get_fuzzer_stats(self.directory_path)
+        if fuzzer_stats is not None:
+            for column in fuzzer_stats.columns:
+                values = fuzzer_stats[column]
+                if pd.api.types.is_datetime64_any_dtype(values):
+                    values = values.astype('int64').where(values.notna()) // 10 ** 9
+                elif not pd.api.types.is_numeric_dtype(values):
+                    continue
+                gauge(f"aflplusplus_{column}", f"fuzzer_stats {column}",
+                      (({'fuzzer': fuzzer_name}, value) for fuzzer_name, value in values.items()))
+
+        summaries = {fuzzer_name: queue_summary(corpus) for fuzzer_name, corpus
+                     in get_tables(self.directory_path, 'corpus').items()}
+        for key in ('entries', 'favored', 'new_coverage', 'imported'):
+            gauge(f"aflplusplus_queue_{key}", f"queue_data {key.replace('_', ' ')}",
+                  (({'fuzzer': fuzzer_name}, summary[key]) for fuzzer_name, summary in summaries.items()))
+
+        crash_index = get_data_store().get(self.directory_path, None, 'crash_index')
+        if crash_index is not None and not crash_index.empty:
+            summary = crash_summary(crash_index)
+            for column in summary.columns:
+                gauge(f"aflplusplus_saved_inputs_{column}", f"crashes/ and hangs/ inputs, {column}",
+                      (({'fuzzer': fuzzer_name, 'kind': kind}, value)
+                       for (fuzzer_name, kind), value in summary[column].items()))
+
+        window_metrics = get_tables(self.directory_path, 'window_metrics')
+        if window_metrics:
+            combined = pd.concat(window_metrics, names=['fuzzer'])
+            for column in combined.columns:
+                gauge(f"aflplusplus_window_{column}", f"{column} over the trailing window",
+                      (({'fuzzer': fuzzer_name, 'window': window}, value)
+                       for (fuzzer_name, window), value in combined[column].items()))
+        return '\n'.join(lines) + '\n'
+
+
+def log_request(handler: tornado.web.RequestHandler):
+    # requests are not logged, dozens of pollers would flood the output. Errors
+    # still are, by tornado itself.
+    pass
+
+
+def make_app(directory_path: str) -> tornado.web.Application:
+    """
+    Returns the API application serving a campaign's ingested data.
+    """
+    settings = {'directory_path': directory_path, 'cache': ResponseCache()}
+    return tornado.web.Application(log_function=log_request, handlers=[
+        (r'/api/fuzzers', FuzzersHandler, settings),
+        (r'/api/fuzzer_stats', FuzzerStatsHandler, settings),
+        (r'/api/plot_data/(.+)', PlotDataHandler, settings),
+        (r'/api/queue', QueueSummaryHandler, settings),
+        (r'/api/queue/(.+)', QueueEntriesHandler, settings),
+        (r'/api/crashes', CrashesHandler, settings),
+        (r'/api/health', HealthHandler, settings),
+        (r'/metrics', MetricsHandler, settings),
+    ])
+
+
+async def serve(directory_path: str, port: int, address: str):
+    make_app(directory_path).listen(port, address)
+    await asyncio.Event().wait()
+
+
+@st.cache_resource
+def start_api(directory_path: str, port: int = API_PORT, address: str = '127.0.0.1') -> threading.Thread:
+    """
+    Starts (once per process) the API on a background thread, sharing the
+    DataStore and ingestion of the Streamlit pages.
+    """
+    start_ingestion(directory_path)
+    thread = threading.Thread(target=asyncio.run, args=(serve(directory_path, port, address),),
+                              name=f"api:{port}", daemon=True)
+    thread.start()
+    return thread
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serves a campaign's ingested data as JSON and Prometheus metrics.")
+    parser.add_argument('directory', nargs='?', default='sample-data', help="campaign output directory")
+    parser.add_argument('--port', type=int, default=API_PORT)
+    parser.add_argument('--address', default='127.0.0.1')
+    args = parser.parse_args()
+    start_ingestion(args.directory)
+    print(f"[*] Serving {args.directory} on http://{args.address}:{args.port}")
+    asyncio.run(serve(args.directory, args.port, args.address))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,366 @@
+"""
+Benchmarks the loaders, ingesters and pages against a synthetic campaign and
+compares the results with the baselines recorded in baseline.json.
+
+    python benchmarks/benchmark.py                     # small campaign, compare
+    python benchmarks/benchmark.py --scale medium --record
+    python benchmarks/benchmark.py --only load_introspection --repeat 5
+
+Measured per loader (on the main instance's files): cold load from a fresh
+cursor, incremental load of what one step() of the campaign appended, and peak
+traced allocation of the cold load.
+
+Measured per ingester (INGESTERS of ingest.py, on the main instance or the whole
+campaign): cold refresh with an empty store and no on-disk caches, warm refresh
+with an empty store restoring the on-disk caches (a dashboard restart),
+incremental refresh after one step(), and peak traced allocation of the cold refresh.
+
+Measured once the whole campaign is ingested: the memory held by the tables of
+an average fuzzer (get_table_footprint).
+
+Measured per page, each in its own process: first render without on-disk caches,
+first render restoring them, ingestion of one step() and the rerender that
+follows, and the process' peak RSS.
+
+A result regresses when it exceeds its baseline by more than --tolerance (and by
+more than the noise floors below). The exit status is 1 if any result regressed.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import re
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date
+from typing import *
+
+import streamlit
+from streamlit.testing.v1 import AppTest
+
+BENCHMARKS_PATH = os.path.dirname(os.path.abspath(__file__))
+REPOSITORY_PATH = os.path.dirname(BENCHMARKS_PATH)
+sys.path.append(REPOSITORY_PATH)
+
+from synthetic import ensure_campaign, read_manifest, SyntheticCampaign
+from utils import *
+from ingest import INGESTERS, IngestionService, start_ingestion
+
+BASELINE_PATH = os.path.join(BENCHMARKS_PATH, 'baseline.json')
+SCALES = {
+    'small': {'fuzzers': 5, 'nodes': 0, 'seed': 0, 'plot_rows': 10000, 'queue_entries': 2000,
+              'crashes': 20, 'hangs': 10, 'introspection_mb': 16},
+    'medium': {'fuzzers': 8, 'nodes': 0, 'seed': 0, 'plot_rows': 100000, 'queue_entries': 20000,
+               'crashes': 200, 'hangs': 50, 'introspection_mb': 256},
+    'large': {'fuzzers': 8, 'nodes': 0, 'seed': 0, 'plot_rows': 500000, 'queue_entries': 100000,
+              'crashes': 1000, 'hangs': 200, 'introspection_mb': 2048},
+}
+PAGES = ['dashboard.py', 'queue_page.py', 'development.py', 'mutation_history.py', 'crashes_hangs.py', 'bitmap.py']
+# fuzzing time appended by one step() of the campaign
+STEP_SECONDS = 300
+PAGE_TIMEOUT = 1800
+# differences below these are noise, whatever the ratio
+MIN_TIME_DELTA = 0.05
+MIN_MEMORY_DELTA = 8.0
+# loader -> (source file, whether it has a header line)
+TAILED_LOADERS = {
+    load_plot_data: ('plot_data', True),
+    load_queue_data: ('queue_data', True),
+    load_plot_det_data: ('plot_det_data', False),
+    load_introspection: ('introspection.txt', False),
+}
+
+
+def time_call(func: Callable[[], Any]) -> float:
+    gc.collect()
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def peak_memory(func: Callable[[], Any]) -> float:
+    """
+    Returns the peak memory (MB) traced while running func, numpy and pandas buffers included.
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def median_time(funcs: Iterable[Callable[[], Any]]) -> float:
+    return statistics.median(time_call(func) for func in funcs)
+
+
+def clear_caches(directory_path: str, on_disk: bool = True):
+    """
+    Drops the process' DataStore, and the campaign's on-disk caches if on_disk.
+    """
+    get_data_store.clear()
+    if on_disk:
+        shutil.rmtree(snapshot_path(directory_path, '', ''), ignore_errors=True)
+
+
+def benchmark_loaders(campaign: SyntheticCampaign, repeat: int, selected: Callable[[str], bool]) -> Dict[str, float]:
+    results = {}
+    directory_path = campaign.directory_path
+    if selected('load.load_fuzzer_stats'):
+        clear_caches(directory_path)
+        refresh_fuzzer_registry(directory_path)
+        results['load.load_fuzzer_stats.cold_s'] = median_time(
+            lambda: load_fuzzer_stats(directory_path) for _ in range(repeat))
+        results['load.load_fuzzer_stats.peak_mb'] = peak_memory(
+            lambda: load_fuzzer_stats(directory_path))
+
+    for loader, (source, has_header) in TAILED_LOADERS.items():
+        name = f"load.{loader.__name__}"
+        file_path = os.path.join(campaign.main.path, source)
+        if not selected(name) or not os.path.exists(file_path):
+            continue
+        results[f"{name}.cold_s"] = median_time(
+            lambda: loader(file_path, FileTail(file_path, has_header=has_header)) for _ in range(repeat))
+        results[f"{name}.peak_mb"] = peak_memory(
+            lambda: loader(file_path, FileTail(file_path, has_header=has_header)))
+        tail = FileTail(file_path, has_header=has_header)
+        loader(file_path, tail)
+        incremental = []
+        for _ in range(repeat):
+            campaign.step(STEP_SECONDS)
+            incremental.append(time_call(lambda: loader(file_path, tail)))
+        results[f"{name}.incremental_s"] = statistics.median(incremental)
+
+    if selected('load.build_corpus_table'):
+        file_path = os.path.join(campaign.main.path, 'queue_data')
+        tail = FileTail(file_path)
+        queue_data, _ = load_queue_data(file_path, tail)
+        results['load.build_corpus_table.cold_s'] = median_time(
+            lambda: build_corpus_table(queue_data) for _ in range(repeat))
+        results['load.build_corpus_table.peak_mb'] = peak_memory(
+            lambda: build_corpus_table(queue_data))
+        corpus = build_corpus_table(queue_data)
+        campaign.step(STEP_SECONDS)
+        new_rows, _ = load_queue_data(file_path, tail)
+        results['load.build_corpus_table.incremental_s'] = median_time(
+            lambda: build_corpus_table(new_rows, corpus) for _ in range(repeat))
+    return results
+
+
+def benchmark_ingesters(campaign: SyntheticCampaign, repeat: int, selected: Callable[[str], bool]) -> Dict[str, float]:
+    results = {}
+    directory_path = campaign.directory_path
+    fuzzer_name = campaign.main.name
+    seen = set()
+    for artifact, ingester in INGESTERS.items():
+        name = f"ingest.{artifact}"
+        # e.g. crashes and hangs share one campaign-wide ingester
+        if ingester in seen or not selected(name):
+            continue
+        seen.add(ingester)
+
+        def refresh(on_disk: bool):
+            clear_caches(directory_path, on_disk)
+            refresh_fuzzer_registry(directory_path)
+            return lambda: ingester(directory_path, fuzzer_name)
+
+        results[f"{name}.cold_s"] = median_time(refresh(True) for _ in range(repeat))
+        results[f"{name}.warm_s"] = median_time(refresh(False) for _ in range(repeat))
+        results[f"{name}.peak_mb"] = peak_memory(refresh(True))
+        incremental = []
+        for _ in range(repeat):
+            campaign.step(STEP_SECONDS)
+            incremental.append(time_call(lambda: ingester(directory_path, fuzzer_name)))
+        results[f"{name}.incremental_s"] = statistics.median(incremental)
+    clear_caches(directory_path)
+    return results
+
+
+def benchmark_footprint(campaign: SyntheticCampaign, selected: Callable[[str], bool]) -> Dict[str, float]:
+    directory_path = campaign.directory_path
+    if not selected('footprint.tables_per_fuzzer'):
+        return {}
+    clear_caches(directory_path)
+    IngestionService(directory_path).ingest_all()
+    footprint = get_table_footprint(directory_path)
+    clear_caches(directory_path)
+    return {'footprint.tables_per_fuzzer_mb': footprint['total'].mean() / 1024 / 1024}
+
+
+def page_script(page: str, directory_path: str) -> str:
+    with open(os.path.join(REPOSITORY_PATH, page)) as f:
+        source = f.read()
+    pattern = r"^DATA_DIRECTORY_PATH = .*$"
+    if not re.search(pattern, source, flags=re.MULTILINE):
+        raise ValueError(f"{page} has no DATA_DIRECTORY_PATH to point at the campaign")
+    return re.sub(pattern, f"DATA_DIRECTORY_PATH = {directory_path!r}", source, count=1, flags=re.MULTILINE)
+
+
+def run_page(page: str, directory_path: str, warm: bool) -> Dict[str, float]:
+    """
+    Runs in a worker process: renders a page on the campaign and times it.
+
+    Without warm, only the first render is timed, with no on-disk caches. With warm,
+    the first render restores the caches left by a previous run, and one step()
+    of the campaign is then ingested and rerendered.
+    """
+    name = f"page.{os.path.splitext(page)[0]}"
+    if not warm:
+        clear_caches(directory_path)
+    app = AppTest.from_string(page_script(page, directory_path), default_timeout=PAGE_TIMEOUT)
+    results = {}
+
+    def render():
+        app.run()
+        # the page renders before the first ingestion pass is done, time both
+        start_ingestion(directory_path).ready.wait()
+
+    first_render = time_call(render)
+    if app.exception:
+        raise RuntimeError(f"{page} failed: {app.exception[0].value}")
+    if not warm:
+        results[f"{name}.cold_s"] = first_render
+        results[f"{name}.rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        return results
+
+    results[f"{name}.warm_s"] = first_render
+    # ingest on this thread from now on, so the step is parsed exactly once
+    service = start_ingestion(directory_path)
+    service.ready.wait()
+    service.stop()
+    campaign = ensure_campaign(directory_path, read_manifest(directory_path))
+    checkpoint = campaign.checkpoint()
+    try:
+        campaign.step(STEP_SECONDS)
+        results[f"{name}.ingest_s"] = time_call(service.ingest_all)
+        results[f"{name}.rerun_s"] = time_call(app.run)
+    finally:
+        campaign.rollback(checkpoint)
+        campaign.close()
+    return results
+
+
+def benchmark_pages(directory_path: str, selected: Callable[[str], bool]) -> Dict[str, float]:
+    results = {}
+    for page in PAGES:
+        if not selected(f"page.{os.path.splitext(page)[0]}"):
+            continue
+        for warm in (False, True):
+            command = [sys.executable, __file__, '--page', page, '--work-dir', directory_path]
+            if warm:
+                command.append('--warm')
+            completed = subprocess.run(command, capture_output=True, text=True)
+            if completed.returncode != 0:
+                print(f"[!] Benchmark of {page} failed:\n{completed.stderr[-4000:]}")
+                break
+            results.update(json.loads(completed.stdout.strip().splitlines()[-1]))
+    return results
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float], tolerance: float) -> List[str]:
+    """
+    Prints results next to their baselines and returns the names of the regressed ones.
+    """
+    regressions = []
+    print(f"{'benchmark':<48} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for name, value in sorted(results.items()):
+        expected = baseline.get(name)
+        if expected is None:
+            print(f"{name:<48} {'-':>10} {value:>10.3f}")
+            continue
+        ratio = value / expected if expected else float('inf')
+        floor = MIN_MEMORY_DELTA if name.endswith('_mb') else MIN_TIME_DELTA
+        regressed = value > expected * (1 + tolerance) and value - expected > floor
+        if regressed:
+            regressions.append(name)
+        print(f"{name:<48} {expected:>10.3f} {value:>10.3f} {ratio:>6.2f}x{'  REGRESSED' if regressed else ''}")
+    return regressions
+
+
+def read_baselines() -> Dict[str, Dict]:
+    try:
+        with open(BASELINE_PATH) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def record(scale: str, results: Dict[str, float]):
+    baselines = read_baselines()
+    baselines[scale] = {
+        'recorded': date.today().isoformat(),
+        'machine': {'python': platform.python_version(), 'platform': platform.platform(),
+                    'cpus': os.cpu_count()},
+        'campaign': SCALES[scale],
+        'results': {name: round(value, 4) for name, value in sorted(results.items())},
+    }
+    with open(BASELINE_PATH, 'w') as f:
+        json.dump(baselines, f, indent=2)
+        f.write('\n')
+    print(f"Recorded {len(results)} {scale} baselines to {BASELINE_PATH}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip(),
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', choices=SCALES, default='small')
+    parser.add_argument('--work-dir', help="where the synthetic campaign is generated and kept between runs")
+    parser.add_argument('--repeat', type=int, default=3, help="runs per timing, the median is kept")
+    parser.add_argument('--only', help="regular expression selecting benchmarks by name, e.g. 'load\\.'")
+    parser.add_argument('--skip-pages', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.5,
+                        help="relative slowdown or memory growth counted as a regression")
+    parser.add_argument('--record', action='store_true', help="save the results as the scale's baselines")
+    parser.add_argument('--page', help=argparse.SUPPRESS)
+    parser.add_argument('--warm', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.page:
+        print(json.dumps(run_page(args.page, args.work_dir, args.warm)))
+        return
+
+    directory_path = args.work_dir or os.path.join(
+        tempfile.gettempdir(), 'aflplusplus-dashboard-benchmark', args.scale)
+    selected = (lambda name: re.search(args.only, name) is not None) if args.only else (lambda name: True)
+
+    start = time.perf_counter()
+    campaign = ensure_campaign(directory_path, SCALES[args.scale])
+    print(f"Campaign {directory_path} ready in {time.perf_counter() - start:.1f}s")
+    results = {}
+    checkpoint = campaign.checkpoint()
+    try:
+        results.update(benchmark_loaders(campaign, args.repeat, selected))
+        results.update(benchmark_ingesters(campaign, args.repeat, selected))
+        results.update(benchmark_footprint(campaign, selected))
+    finally:
+        campaign.rollback(checkpoint)
+        campaign.close()
+    if not args.skip_pages:
+        results.update(benchmark_pages(directory_path, selected))
+
+    if args.record:
+        record(args.scale, results)
+        return
+    baseline = read_baselines().get(args.scale)
+    if baseline is None:
+        print(f"[!] No {args.scale} baselines recorded, run with --record")
+        compare(results, {}, args.tolerance)
+        return
+    if baseline['campaign'] != SCALES[args.scale]:
+        print(f"[!] The {args.scale} baselines were recorded on a different campaign")
+    regressions = compare(results, baseline['results'], args.tolerance)
+    if regressions:
+        print(f"[!] {len(regressions)} regressions: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,589 @@
+"""
+Writes synthetic AFL++ output directories at configurable scale, optionally
+appending to them live like running fuzzers would.
+
+    python benchmarks/synthetic.py /tmp/campaign --fuzzers 8 --plot-rows 100000 \\
+        --queue-entries 20000 --introspection-mb 2048
+    python benchmarks/synthetic.py /tmp/campaign --live 5
+
+Every artifact the dashboard reads is written in AFL++'s format: fuzzer_stats,
+fuzzer_setup, cmdline, plot_data, plot_det_data (main instance only), queue_data,
+introspection.txt, fuzz_bitmap and queue/, crashes/ and hangs/ entries named with
+the id:..,src:..,op:.. grammar. Secondary instances import part of their queue
+from the main instance (",sync:main" entries with identical contents), so corpus
+dedup has work to do.
+
+When --introspection-mb asks for a larger log than the queue entries produce,
+the remaining QUEUE records describe entries beyond those written to queue/, as
+writing millions of testcases is not needed to exercise the parser.
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import time
+from typing import *
+
+# seconds between two plot_data rows, as written by afl-fuzz
+PLOT_INTERVAL = 5
+# fraction of a secondary instance's queue imported from the main instance
+SYNC_RATIO = 0.2
+# a CYCLE record is written every this many QUEUE records
+CYCLE_EVERY = 500
+MANIFEST_NAME = '.synthetic.json'
+
+PLOT_DATA_HEADER = (
+    "# relative_time, cycles_done, cur_item, corpus_count, pending_total, pending_favs, "
+    "map_size, saved_crashes, saved_hangs, max_depth, execs_per_sec, total_execs, "
+    "edges_found, total_crashes, servers_count\n")
+QUEUE_DATA_HEADER = (
+    "# filename, length, exec_us, selected, skipped, mutations, finds, crashes, timeouts, "
+    "bitmap_size, perf_score, weight, colorized, favored, disabled\n")
+DETERMINISTIC_OPS = ['flip1', 'flip2', 'flip4', 'flip8', 'arith8', 'arith16', 'int8', 'int16']
+HAVOC_MUTATIONS = ['FLIP-BIT_1', 'FLIP-BIT_6', 'ARITH8+_6', 'ARITH16+_31', 'ARITH32+_10',
+                   'INTERESTING16_16', 'RAND8_166', 'BYTESUB_', 'CLONE-COPY_217_127_2',
+                   'CLONE-COPY_323_237_19', 'DEL_12_4', 'OVERWRITE-COPY_40_8_3']
+
+
+class SyntheticFuzzer:
+    """
+    State of one synthetic fuzzer instance and the writers of its artifacts.
+
+    Time advances by PLOT_INTERVAL per plot_data row. Queue entries, edges, crashes
+    and hangs are found at a rate decaying with run time, as in a real campaign.
+    """
+
+    def __init__(self, campaign: 'SyntheticCampaign', name: str, seed: int):
+        self.campaign = campaign
+        self.name = name
+        self.path = os.path.join(campaign.directory_path, name)
+        # absolute, as in the paths afl-fuzz writes to queue_data and introspection.txt
+        self.queue_directory = os.path.join(os.path.abspath(self.path), 'queue')
+        self.rng = random.Random(seed)
+        self.is_main = name.rsplit('/', 1)[-1] == 'main'
+        self.start_time = campaign.start_time
+        self.run_time = 0
+        self.execs = 0
+        self.cycles = 0
+        self.queue_size = 0
+        self.crashes = 0
+        self.hangs = 0
+        self.introspection_entries = 0
+        self.max_depth = 1
+        # per queue entry: size and depth, used to pick realistic parents
+        self.sizes: List[int] = []
+        self.depths: List[int] = []
+        self.queue_names: List[str] = []
+        # edges only this instance covers, in discovery order
+        self._own_edges: Optional[List[int]] = None
+
+    # -- derived counters --------------------------------------------------
+
+    @property
+    def execs_per_sec(self) -> float:
+        return 600.0 * (1 + 0.1 * self.rng.random())
+
+    def edges(self) -> int:
+        # coverage saturates: the first edges are found quickly, later ones slowly
+        map_size = self.campaign.map_size
+        return min(map_size, int(map_size * 0.05 + map_size * 0.15 * (1 - 1 / (1 + self.run_time / 3600))))
+
+    def queue_path(self, queue_id: int) -> str:
+        return os.path.join(self.queue_directory, self.queue_names[queue_id])
+
+    # -- queue entries -----------------------------------------------------
+
+    def _entry_name(self, queue_id: int, time_ms: int) -> str:
+        rng = self.rng
+        if queue_id < self.campaign.seeds:
+            return f"id:{queue_id:06d},time:0,execs:0,orig:{rng.getrandbits(160):040x}"
+        parent = rng.randrange(queue_id)
+        if not self.is_main and self.campaign.main is not None and rng.random() < SYNC_RATIO \
+                and self.campaign.main.queue_size:
+            return f"id:{queue_id:06d},sync:main,src:{rng.randrange(self.campaign.main.queue_size):06d}"
+        name = f"id:{queue_id:06d},src:{parent:06d}"
+        kind = rng.random()
+        if kind < 0.1:
+            name += f"+{rng.randrange(queue_id):06d},time:{time_ms},execs:{self.execs},op:splice,rep:{rng.randint(1, 16)}"
+        elif kind < 0.3 and self.is_main:
+            name += f",time:{time_ms},execs:{self.execs},op:{rng.choice(DETERMINISTIC_OPS)},pos:{rng.randrange(self.sizes[parent])}"
+        else:
+            name += f",time:{time_ms},execs:{self.execs},op:havoc,rep:{rng.randint(1, 16)}"
+        return name + (',+cov' if rng.random() < 0.3 else '')
+
+    def add_queue_entry(self, time_ms: int):
+        """
+        Adds a queue entry, writing its testcase, queue_data row and (unless imported
+        or a seed) introspection record.
+        """
+        queue_id = self.queue_size
+        name = self._entry_name(queue_id, time_ms)
+        src = int(name.split('src:')[1][:6]) if ',src:' in name else None
+        if ',sync:' in name:
+            contents = self.campaign.main.read_entry(src)
+            depth = 1
+        else:
+            size = max(1, min(self.campaign.max_entry_size, int(self.rng.lognormvariate(5, 1.2))))
+            contents = self.rng.randbytes(size)
+            depth = 1 if src is None else self.depths[src] + 1
+        self.sizes.append(len(contents))
+        self.depths.append(depth)
+        self.max_depth = max(self.max_depth, depth)
+        self.queue_names.append(name)
+        self.queue_size += 1
+        with open(os.path.join(self.path, 'queue', name), 'wb') as f:
+            f.write(contents)
+        self._queue_data.write(
+            f'"{self.queue_path(queue_id)}",{len(contents)},{self.rng.randint(100, 2000)},'
+            f'{self.rng.randint(0, 3)},{self.rng.randint(0, 2)},{self.rng.randint(0, 300000)},'
+            f'{self.rng.randint(0, 50)},0,0,{self.rng.randint(500, 2000)},100.000,1.000,0,'
+            f'{int(self.rng.random() < 0.2)},0\n')
+        if src is not None and ',sync:' not in name:
+            self._introspection.write(self._introspection_record(queue_id))
+
+    def read_entry(self, queue_id: int) -> bytes:
+        with open(self.queue_path(queue_id), 'rb') as f:
+            return f.read()
+
+    def add_finding(self, kind: str, time_ms: int):
+        """
+        Saves a crash ("crashes") or hang ("hangs") and its UNIQUE_* introspection record.
+        """
+        if kind == 'crashes':
+            finding_id, self.crashes = self.crashes, self.crashes + 1
+            name = f"id:{finding_id:06d},sig:{self.rng.choice([6, 11])},"
+            record = 'UNIQUE_CRASH'
+        else:
+            finding_id, self.hangs = self.hangs, self.hangs + 1
+            name = f"id:{finding_id:06d},"
+            record = 'UNIQUE_TIMEOUT'
+        parent = self.rng.randrange(self.queue_size)
+        name += f"src:{parent:06d},time:{time_ms},execs:{self.execs},op:havoc,rep:{self.rng.randint(1, 16)}"
+        directory = os.path.join(self.path, kind)
+        if not os.path.exists(os.path.join(directory, 'README.txt')):
+            with open(os.path.join(directory, 'README.txt'), 'w') as f:
+                f.write("Command line used to find this crash:\n\n" + self.command_line() + "\n")
+        with open(os.path.join(directory, name), 'wb') as f:
+            f.write(self.rng.randbytes(self.sizes[parent]))
+        self._introspection.write(f"{record} {self.queue_path(parent)} {self._havoc_stack()}\n")
+
+    # -- introspection -----------------------------------------------------
+
+    def _havoc_stack(self) -> str:
+        count = self.rng.randint(2, 12)
+        mutations = ' '.join(self.rng.choices(HAVOC_MUTATIONS, k=count))
+        return f"HAVOC-0-{count} {mutations}"
+
+    def _introspection_record(self, queue_id: int) -> str:
+        # entries past the queue are only described in the log (see module docstring)
+        if queue_id < self.queue_size:
+            name = self.queue_names[queue_id]
+            parent = self.queue_path(int(name.split('src:')[1][:6]))
+            result = self.queue_path(queue_id)
+        else:
+            parent_id = self.rng.randrange(self.queue_size)
+            name = (f"id:{queue_id:06d},src:{parent_id:06d},time:{self.run_time * 1000},"
+                    f"execs:{self.execs},op:havoc,rep:{self.rng.randint(1, 16)}")
+            parent = self.queue_path(parent_id)
+            result = os.path.join(self.queue_directory, name)
+        if ',op:flip' in name or ',op:arith' in name or ',op:int' in name:
+            mutation = f"FLIP_BIT1-{self.rng.randrange(2000)}"
+        elif ',op:splice' in name:
+            mutation = f"SPLICE-{self.rng.randrange(queue_id)} {self._havoc_stack()}"
+        else:
+            mutation = self._havoc_stack()
+        self.introspection_entries += 1
+        line = f"QUEUE {parent} {mutation} = {result}\n"
+        if self.introspection_entries % CYCLE_EVERY == 0:
+            self.cycles += 1
+            line += (f"CYCLE cycle={self.cycles} cycle_wo_finds=0 time_wo_finds={self.rng.randrange(600)} "
+                     f"expand_havoc={min(self.cycles, 4)} queue={self.queue_size}\n")
+        return line
+
+    def pad_introspection(self, target_bytes: int):
+        """
+        Appends QUEUE records of entries past the queue until the log reaches target_bytes.
+        """
+        if not self.queue_size:
+            return
+        buffer, written = [], self._introspection.tell()
+        queue_id = max(self.queue_size, self.campaign.seeds)
+        while written < target_bytes:
+            line = self._introspection_record(queue_id)
+            queue_id += 1
+            buffer.append(line)
+            written += len(line)
+            if len(buffer) >= 10000:
+                self._introspection.write(''.join(buffer))
+                buffer = []
+        self._introspection.write(''.join(buffer))
+
+    # -- whole-file artifacts ----------------------------------------------
+
+    def command_line(self) -> str:
+        role = '-M' if self.is_main else '-S'
+        return f"afl-fuzz {role} {self.name.rsplit('/', 1)[-1]} -i in -o {os.path.abspath(self.campaign.directory_path)} -- ./target @@"
+
+    def plot_data_row(self) -> str:
+        edges = self.edges()
+        return (f"{self.run_time}, {self.cycles}, {self.rng.randrange(max(1, self.queue_size))}, "
+                f"{self.queue_size}, {self.queue_size // 2}, {self.queue_size // 20}, "
+                f"{100 * edges / self.campaign.map_size:.2f}%, {self.crashes}, {self.hangs}, "
+                f"{self.max_depth}, {self.execs_per_sec:.2f}, {self.execs}, {edges}, {self.crashes}, 0\n")
+
+    def plot_det_data_row(self) -> str:
+        hours, rest = divmod(self.run_time, 3600)
+        minutes, seconds = divmod(rest, 60)
+        find = self.rng.randint(0, 200)
+        return (f"[{hours:02d}:{minutes:02d}:{seconds:02d}] fuzz {self.rng.randrange(max(1, self.queue_size))} (0), "
+                f"find {find}/{find + self.rng.randint(0, 200)} among {self.queue_size}(2.00) and spend "
+                f"{self.rng.randint(0, 20)}/{self.rng.randint(20, 80)}(10.00), cover {10 + 50 * self.edges() / self.campaign.map_size:.2f} yet, "
+                f"{self.rng.randint(0, 1000)}/47 undet bits, continue 0.\n")
+
+    def write_fuzzer_stats(self):
+        edges = self.edges()
+        now = self.start_time + self.run_time
+        stats = {
+            'start_time': self.start_time, 'last_update': now, 'run_time': self.run_time,
+            'fuzzer_pid': 1000 + self.rng.randrange(60000), 'cycles_done': self.cycles,
+            'cycles_wo_finds': 0, 'time_wo_finds': self.rng.randrange(600),
+            'fuzz_time': int(self.run_time * 0.95), 'calibration_time': int(self.run_time * 0.02),
+            'cmplog_time': 0, 'sync_time': int(self.run_time * 0.01), 'trim_time': 0,
+            'execs_done': self.execs, 'execs_per_sec': f"{self.execs_per_sec:.2f}",
+            'execs_ps_last_min': f"{self.execs_per_sec:.2f}", 'corpus_count': self.queue_size,
+            'corpus_favored': self.queue_size // 5,
+            'corpus_found': max(0, self.queue_size - self.campaign.seeds),
+            'corpus_imported': sum(',sync:' in name for name in self.queue_names[-1000:]),
+            'corpus_variable': 0, 'max_depth': self.max_depth,
+            'cur_item': self.rng.randrange(max(1, self.queue_size)),
+            'pending_favs': self.queue_size // 20, 'pending_total': self.queue_size // 2,
+            'stability': '100.00%', 'bitmap_cvg': f"{100 * edges / self.campaign.map_size:.2f}%",
+            'saved_crashes': self.crashes, 'saved_hangs': self.hangs, 'total_tmout': self.hangs * 3,
+            'last_find': now, 'last_crash': now if self.crashes else 0,
+            'last_hang': now if self.hangs else 0, 'execs_since_crash': self.execs,
+            'exec_timeout': 40, 'slowest_exec_ms': 0, 'peak_rss_mb': 0, 'cpu_affinity': 0,
+            'edges_found': edges, 'total_edges': self.campaign.map_size, 'var_byte_count': 0,
+            'havoc_expansion': 0, 'auto_dict_entries': 0, 'testcache_size': sum(self.sizes),
+            'testcache_count': self.queue_size, 'testcache_evict': 0,
+            'afl_banner': './target', 'afl_version': '++4.35a',
+            'target_mode': 'shmem_testcase default', 'command_line': self.command_line(),
+        }
+        temp_path = os.path.join(self.path, '.fuzzer_stats_tmp')
+        with open(temp_path, 'w') as f:
+            f.writelines(f"{key:<18}: {value}\n" for key, value in stats.items())
+        os.replace(temp_path, os.path.join(self.path, 'fuzzer_stats'))
+
+    def write_fuzz_bitmap(self):
+        # virgin bits: 0xff for edges never hit. Instances share most of their
+        # coverage (a prefix of the campaign's edge order) plus a few edges of their own.
+        edges = self.edges()
+        virgin = bytearray(b'\xff' * self.campaign.map_size)
+        shared = int(edges * 0.9)
+        for edge in self.campaign.edge_order[:shared]:
+            virgin[edge] = 0xfe
+        if self._own_edges is None:
+            self._own_edges = self.campaign.edge_order[shared:]
+            random.Random(self.name).shuffle(self._own_edges)
+        for edge in self._own_edges[:edges - shared]:
+            virgin[edge] = 0xfe
+        with open(os.path.join(self.path, 'fuzz_bitmap'), 'wb') as f:
+            f.write(virgin)
+
+    # -- generation --------------------------------------------------------
+
+    def _open_logs(self):
+        self._queue_data = open(os.path.join(self.path, 'queue_data'), 'a')
+        self._introspection = open(os.path.join(self.path, 'introspection.txt'), 'a')
+        self._plot_data = open(os.path.join(self.path, 'plot_data'), 'a')
+        self._plot_det_data = open(os.path.join(self.path, 'plot_det_data'), 'a') if self.is_main else None
+
+    def _logs(self) -> List[IO]:
+        return [f for f in (self._queue_data, self._introspection, self._plot_data, self._plot_det_data)
+                if f is not None]
+
+    def flush(self):
+        for f in self._logs():
+            f.flush()
+
+    def close(self):
+        for f in self._logs():
+            f.close()
+
+    def generate(self, plot_rows: int, queue_entries: int, crashes: int, hangs: int, introspection_bytes: int):
+        """
+        Writes the instance's artifacts as of plot_rows * PLOT_INTERVAL seconds of fuzzing.
+        """
+        for directory in ('queue', 'crashes', 'hangs'):
+            os.makedirs(os.path.join(self.path, directory), exist_ok=True)
+        os.makedirs(os.path.join(self.path, 'queue', '.state'), exist_ok=True)
+        with open(os.path.join(self.path, 'cmdline'), 'w') as f:
+            f.write("./target\n@@\n")
+        with open(os.path.join(self.path, 'fuzzer_setup'), 'w') as f:
+            f.write(f"# environment variables:\n# command line:\n{self.command_line()}\n")
+        with open(os.path.join(self.path, 'queue_data'), 'w') as f:
+            f.write(QUEUE_DATA_HEADER)
+        with open(os.path.join(self.path, 'plot_data'), 'w') as f:
+            f.write(PLOT_DATA_HEADER)
+        for file_name in ('introspection.txt', 'plot_det_data'):
+            open(os.path.join(self.path, file_name), 'w').close()
+        self._open_logs()
+
+        total_time = plot_rows * PLOT_INTERVAL
+        # findings slow down over time: entry i is found at total_time * (i / n) ** 2
+        events = [(int(total_time * 1000 * (i / max(1, queue_entries)) ** 2), 'queue')
+                  for i in range(queue_entries)]
+        events += [(self.rng.randrange(total_time * 1000 or 1), kind)
+                   for kind, count in (('crashes', crashes), ('hangs', hangs)) for _ in range(count)]
+        events.sort()
+        event = 0
+        for row in range(1, plot_rows + 1):
+            self.run_time = row * PLOT_INTERVAL
+            while event < len(events) and events[event][0] <= self.run_time * 1000:
+                time_ms, kind = events[event]
+                self.execs = int(time_ms * 0.6)
+                if kind == 'queue':
+                    self.add_queue_entry(time_ms)
+                elif self.queue_size:
+                    self.add_finding(kind, time_ms)
+                event += 1
+            self.execs = int(self.run_time * 600)
+            self._plot_data.write(self.plot_data_row())
+            if self._plot_det_data is not None and row % 10 == 0:
+                self._plot_det_data.write(self.plot_det_data_row())
+        self.pad_introspection(introspection_bytes)
+        self.flush()
+        self.write_fuzzer_stats()
+        self.write_fuzz_bitmap()
+
+    def resume(self):
+        """
+        Restores the state needed to keep appending from an existing output directory.
+        """
+        stats = {}
+        with open(os.path.join(self.path, 'fuzzer_stats')) as f:
+            for line in f:
+                key, _, value = line.partition(':')
+                stats[key.strip()] = value.strip()
+        self.start_time = int(stats['start_time'])
+        self.run_time = int(stats['run_time'])
+        self.execs = int(stats['execs_done'])
+        self.cycles = int(stats['cycles_done'])
+        self.max_depth = int(stats['max_depth'])
+        self.queue_names = sorted(name for name in os.listdir(os.path.join(self.path, 'queue'))
+                                  if name.startswith('id:'))
+        self.queue_size = len(self.queue_names)
+        self.sizes = [os.path.getsize(os.path.join(self.path, 'queue', name)) for name in self.queue_names]
+        self.depths = [1] * self.queue_size
+        self.crashes = sum(name.startswith('id:') for name in os.listdir(os.path.join(self.path, 'crashes')))
+        self.hangs = sum(name.startswith('id:') for name in os.listdir(os.path.join(self.path, 'hangs')))
+        self._open_logs()
+
+    def step(self, seconds: int, crash_rate: float = 0.01):
+        """
+        Appends what the instance would write over the next seconds of fuzzing.
+        """
+        for _ in range(max(1, seconds // PLOT_INTERVAL)):
+            self.run_time += PLOT_INTERVAL
+            self.execs = int(self.run_time * 600)
+            time_ms = self.run_time * 1000
+            # keep finding entries at the average rate so far
+            finds = self.rng.random() * 2 * max(1.0, self.queue_size / max(1, self.run_time / PLOT_INTERVAL))
+            for _ in range(int(finds)):
+                self.add_queue_entry(time_ms)
+            if self.rng.random() < crash_rate:
+                self.add_finding('crashes', time_ms)
+            if self.rng.random() < crash_rate:
+                self.add_finding('hangs', time_ms)
+            self._plot_data.write(self.plot_data_row())
+            if self._plot_det_data is not None:
+                self._plot_det_data.write(self.plot_det_data_row())
+        self.flush()
+        self.write_fuzzer_stats()
+        self.write_fuzz_bitmap()
+
+
+class SyntheticCampaign:
+    """
+    A campaign directory of SyntheticFuzzer instances, the first one being "main".
+
+    Args:
+        directory_path (str): Campaign output directory to write.
+        fuzzers (int): Number of instances.
+        nodes (int): Spread the instances over this many node directories
+            ("node-00/main", "node-01/sec01", ...) if more than 0.
+        seed (int): Random seed; the same parameters and seed write the same tree.
+    """
+
+    def __init__(self, directory_path: str, fuzzers: int = 5, nodes: int = 0, seed: int = 0,
+                 seeds: int = 100, map_size: int = 65536, max_entry_size: int = 4096):
+        self.directory_path = directory_path
+        self.seeds = seeds
+        self.map_size = map_size
+        self.max_entry_size = max_entry_size
+        self.start_time = 1764922820
+        rng = random.Random(seed)
+        self.edge_order = list(range(map_size))
+        rng.shuffle(self.edge_order)
+        names = ['main'] + [f"sec{i:02d}" for i in range(1, fuzzers)]
+        if nodes:
+            names = [f"node-{i % nodes:02d}/{name}" for i, name in enumerate(names)]
+        self.fuzzers = [SyntheticFuzzer(self, name, seed * 1000 + i) for i, name in enumerate(names)]
+        self.main: Optional[SyntheticFuzzer] = None
+
+    def exists(self) -> bool:
+        return all(os.path.exists(os.path.join(fuzzer.path, 'fuzzer_stats')) for fuzzer in self.fuzzers)
+
+    def generate(self, plot_rows: int, queue_entries: int, crashes: int = 10, hangs: int = 5,
+                 introspection_mb: float = 0):
+        """
+        Writes every instance from scratch, replacing existing instance directories.
+        """
+        os.makedirs(self.directory_path, exist_ok=True)
+        for fuzzer in self.fuzzers:
+            shutil.rmtree(fuzzer.path, ignore_errors=True)
+            os.makedirs(fuzzer.path)
+        # main first, secondaries import some of its entries
+        for fuzzer in self.fuzzers:
+            fuzzer.generate(plot_rows, queue_entries, crashes, hangs, int(introspection_mb * 1024 * 1024))
+            if fuzzer.is_main:
+                self.main = fuzzer
+
+    def resume(self):
+        for fuzzer in self.fuzzers:
+            fuzzer.resume()
+            if fuzzer.is_main:
+                self.main = fuzzer
+
+    def step(self, seconds: int, crash_rate: float = 0.01):
+        for fuzzer in self.fuzzers:
+            fuzzer.step(seconds, crash_rate)
+
+    def close(self):
+        for fuzzer in self.fuzzers:
+            fuzzer.close()
+
+    def checkpoint(self) -> Dict[str, Any]:
+        """
+        Returns what rollback() needs to undo the step() calls made after it.
+        """
+        checkpoint = {'sizes': {}, 'entries': {}, 'contents': {}}
+        for fuzzer in self.fuzzers:
+            fuzzer.flush()
+            for f in fuzzer._logs():
+                checkpoint['sizes'][f.name] = os.path.getsize(f.name)
+            for directory in ('queue', 'crashes', 'hangs'):
+                path = os.path.join(fuzzer.path, directory)
+                checkpoint['entries'][path] = set(os.listdir(path))
+            for file_name in ('fuzzer_stats', 'fuzz_bitmap'):
+                path = os.path.join(fuzzer.path, file_name)
+                with open(path, 'rb') as f:
+                    checkpoint['contents'][path] = f.read()
+        return checkpoint
+
+    def rollback(self, checkpoint: Dict[str, Any]):
+        """
+        Restores the files as of checkpoint, so repeated benchmark runs see the same tree.
+        """
+        self.close()
+        for path, size in checkpoint['sizes'].items():
+            os.truncate(path, size)
+        for path, names in checkpoint['entries'].items():
+            for name in set(os.listdir(path)) - names:
+                os.remove(os.path.join(path, name))
+        for path, contents in checkpoint['contents'].items():
+            with open(path, 'wb') as f:
+                f.write(contents)
+        self.resume()
+
+
+def read_manifest(directory_path: str) -> Optional[Dict]:
+    try:
+        with open(os.path.join(directory_path, MANIFEST_NAME)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_manifest(directory_path: str, parameters: Dict):
+    with open(os.path.join(directory_path, MANIFEST_NAME), 'w') as f:
+        json.dump(parameters, f, indent=2, sort_keys=True)
+
+
+def ensure_campaign(directory_path: str, parameters: Dict) -> SyntheticCampaign:
+    """
+    Returns the campaign described by parameters (the keyword arguments of
+    SyntheticCampaign and SyntheticCampaign.generate), generating it unless
+    directory_path already holds one written with the same parameters.
+
+    Raises:
+        FileExistsError: directory_path is not empty and was not written by this module,
+            e.g. a real campaign.
+    """
+    layout = {key: parameters[key] for key in ('fuzzers', 'nodes', 'seed') if key in parameters}
+    campaign = SyntheticCampaign(directory_path, **layout)
+    manifest = read_manifest(directory_path)
+    if manifest == parameters and campaign.exists():
+        campaign.resume()
+        return campaign
+    if manifest is None and os.path.isdir(directory_path) and os.listdir(directory_path):
+        raise FileExistsError(f"{directory_path} is not empty and holds no {MANIFEST_NAME}")
+    shutil.rmtree(directory_path, ignore_errors=True)
+    campaign.generate(**{key: value for key, value in parameters.items() if key not in layout})
+    write_manifest(directory_path, parameters)
+    return campaign
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip(),
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('directory', help="campaign output directory to write")
+    parser.add_argument('--fuzzers', type=int, default=5)
+    parser.add_argument('--nodes', type=int, default=0,
+                        help="spread the instances over this many node directories")
+    parser.add_argument('--plot-rows', type=int, default=10000,
+                        help=f"plot_data rows per instance, one per {PLOT_INTERVAL} s of fuzzing")
+    parser.add_argument('--queue-entries', type=int, default=5000)
+    parser.add_argument('--crashes', type=int, default=10)
+    parser.add_argument('--hangs', type=int, default=5)
+    parser.add_argument('--introspection-mb', type=float, default=0,
+                        help="minimum introspection.txt size per instance")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--live', type=float, metavar='SECONDS',
+                        help="keep appending every SECONDS, resuming the existing tree if there is one")
+    parser.add_argument('--overwrite', action='store_true',
+                        help="regenerate even if the directory already holds this campaign")
+    args = parser.parse_args()
+
+    parameters = {'fuzzers': args.fuzzers, 'nodes': args.nodes, 'seed': args.seed,
+                  'plot_rows': args.plot_rows, 'queue_entries': args.queue_entries,
+                  'crashes': args.crashes, 'hangs': args.hangs,
+                  'introspection_mb': args.introspection_mb}
+    if args.overwrite:
+        shutil.rmtree(args.directory, ignore_errors=True)
+    elif args.live is not None and read_manifest(args.directory) is not None:
+        # keep appending to the existing tree whatever size it was generated with
+        parameters = read_manifest(args.directory)
+    start = time.perf_counter()
+    try:
+        campaign = ensure_campaign(args.directory, parameters)
+    except FileExistsError as e:
+        print(f"[!] {e}, pass --overwrite to replace it")
+        return
+    print(f"{args.directory}: {len(campaign.fuzzers)} instances ready in {time.perf_counter() - start:.1f}s")
+    if args.live is None:
+        campaign.close()
+        return
+    print(f"Appending every {args.live}s, Ctrl-C to stop")
+    try:
+        while True:
+            time.sleep(args.live)
+            campaign.step(max(PLOT_INTERVAL, int(args.live)))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        campaign.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,25 +1,87 @@
-import numpy as np
 import streamlit as st
+from utils import *
+from ingest import start_ingestion
+from coverage_map import *
+from bitmap_history import *
 import plotly.express as px
 
+UPDATE_INTERVAL = 60
+DATA_DIRECTORY_PATH = 'sample-data'
+# DATA_DIRECTORY_PATH = 'out'
+
 st.header("Fuzz Bitmap Coverage Visualization")
 
-with open('out/main/fuzz_bitmap', 'rb') as f:
-    bits = np.unpackbits(np.frombuffer(f.read(), dtype=np.uint8))
-size = int(np.ceil(np.sqrt(len(bits))))
-img = np.zeros((size, size), dtype=np.uint8)
-img.flat[:len(bits)] = bits
-
-fig = px.imshow(
-    img,
-    color_continuous_scale='gray_r',
-    aspect='equal',
-    width=1000,
-    height=1000,
-    labels={'color': 'Coverage'},
-)
-fig.update_xaxes(showticklabels=False)
-fig.update_yaxes(showticklabels=False)
-fig.update_layout(coloraxis_showscale=False)
-
-st.plotly_chart(fig)
+
+@st.fragment(run_every=UPDATE_INTERVAL)
+@profiled('bitmap.generate_bitmap')
+def generate_bitmap():
+    start_ingestion(DATA_DIRECTORY_PATH)
+    maps = get_coverage_maps(DATA_DIRECTORY_PATH)
+    if not maps:
+        st.info("No fuzz_bitmap found yet")
+        return
+
+    summary = get_coverage_summary(DATA_DIRECTORY_PATH)
+    union_bits, map_size = combine_maps(maps, 'union')
+    intersection_bits, _ = combine_maps(maps, 'intersection')
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Union", count_bits(union_bits))
+    col2.metric("Intersection", count_bits(intersection_bits))
+    col3.metric("Map size", map_size)
+    if summary['map_size'].nunique() > 1:
+        st.caption(
+            "Instances use different map sizes (differently instrumented targets), "
+            "so their edge ids only line up where the binaries are the same.")
+    st.dataframe(summary)
+
+    views = {'Union': ('union', None), 'Intersection': ('intersection', None)}
+    for fuzzer_name in maps:
+        views[fuzzer_name] = ('single', fuzzer_name)
+        views[f"Unique to {fuzzer_name}"] = ('unique', fuzzer_name)
+    view = st.selectbox("Map", list(views), key='bitmap_view')
+    bits, map_size = combine_maps(maps, *views[view])
+    density = density_raster(bits, map_size)
+    st.image(raster_image(density), width=RASTER_MAX_SIDE,
+             caption=f"{count_bits(bits)} edges, {map_size / density.size:.0f} edges per pixel")
+
+
+@st.fragment(run_every=UPDATE_INTERVAL)
+@profiled('bitmap.generate_bitmap_history')
+def generate_bitmap_history():
+    maps = get_coverage_maps(DATA_DIRECTORY_PATH)
+    if not maps:
+        return
+    st.subheader("Coverage History")
+    fuzzer_name = st.selectbox("Fuzzer", list(maps), key='history_fuzzer')
+    history = get_bitmap_history(DATA_DIRECTORY_PATH, fuzzer_name)
+    timeline = history.timeline()
+    if timeline.empty:
+        st.info("No snapshot recorded yet")
+        return
+
+    fig = px.line(timeline, x='time', y='edges_covered',
+                  line_shape='hv', markers=True)
+    st.plotly_chart(fig)
+
+    labels = dict(zip(history.times, timeline['time'].dt.strftime('%Y-%m-%d %H:%M:%S')))
+    if len(labels) > 1:
+        start, end = st.select_slider("Between snapshots", options=list(labels), format_func=labels.get,
+                                      value=(history.times[0], history.times[-1]), key='history_range')
+    else:
+        start = end = history.times[0]
+    new_edges = history.edges_set_between(start, end)
+    bits, map_size = history.map_at(end)
+    density = density_raster(bits, map_size)
+    st.image(raster_image(density), width=RASTER_MAX_SIDE,
+             caption=f"{fuzzer_name} at {labels[end]}: {count_bits(bits)} edges")
+    st.metric("Edges newly set", len(new_edges))
+    if len(new_edges):
+        st.dataframe(pd.DataFrame({'edge': new_edges[:1000]}), hide_index=True)
+
+    if len(maps) > 1 and st.toggle("Show which fuzzer covered each edge first", key='history_first'):
+        discoveries = first_discoveries(DATA_DIRECTORY_PATH)
+        st.dataframe(discoveries.groupby('fuzzer').size().rename('edges found first'))
+
+
+generate_bitmap()
+generate_bitmap_history()
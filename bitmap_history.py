@@ -0,0 +1,264 @@
+import bisect
+import struct
+import threading
+import time
+import traceback
+from typing import *
+import numpy as np
+import streamlit as st
+from utils import *
+from coverage_map import get_coverage_maps, refresh_coverage_maps
+
+# seconds between two snapshots of the same fuzzer's map
+HISTORY_INTERVAL = 60
+# a full map is stored every this many records, bounding reconstruction cost
+KEYFRAME_INTERVAL = 256
+HISTORY_FILE_NAME = 'history.bin'
+
+# record header: type, timestamp, map size (edges), covered edges, payload length
+RECORD_HEADER = struct.Struct('<BdIII')
+KEYFRAME = 0
+DELTA = 1
+
+
+class BitmapHistory:
+    """
+    Append-only, delta-compressed history of one fuzzer's coverage map.
+
+    Each record is either a keyframe (the packed map) or a delta (uint32 ids of
+    the edges whose coverage flipped since the previous record). Keyframes are
+    written every KEYFRAME_INTERVAL records and whenever the map size changes,
+    so reconstructing any point in time replays at most KEYFRAME_INTERVAL deltas.
+    Only record headers are kept in memory.
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.lock = threading.Lock()
+        # per record: file offset of the payload, header fields
+        self.offsets: List[int] = []
+        self.types: List[int] = []
+        self.times: List[float] = []
+        self.map_sizes: List[int] = []
+        self.covered: List[int] = []
+        self.counts: List[int] = []
+        self.last_bits = None
+        self._load_index()
+
+    def _load_index(self):
+        if not os.path.exists(self.file_path):
+            return
+        size = os.path.getsize(self.file_path)
+        offset = 0
+        with open(self.file_path, 'rb') as f:
+            while offset + RECORD_HEADER.size <= size:
+                f.seek(offset)
+                record_type, timestamp, map_size, covered, count = RECORD_HEADER.unpack(
+                    f.read(RECORD_HEADER.size))
+                payload_size = count if record_type == KEYFRAME else count * 4
+                if offset + RECORD_HEADER.size + payload_size > size:
+                    break
+                self._append_index(offset + RECORD_HEADER.size,
+                                   record_type, timestamp, map_size, covered, count)
+                offset += RECORD_HEADER.size + payload_size
+        if offset < size:
+            # drop a record left half-written by a crash
+            with open(self.file_path, 'r+b') as f:
+                f.truncate(offset)
+        if self.times:
+            self.last_bits = self.reconstruct(len(self.times) - 1)
+
+    def _append_index(self, offset, record_type, timestamp, map_size, covered, count):
+        self.offsets.append(offset)
+        self.types.append(record_type)
+        self.times.append(timestamp)
+        self.map_sizes.append(map_size)
+        self.covered.append(covered)
+        self.counts.append(count)
+
+    def record(self, bits: np.ndarray, map_size: int, timestamp: Optional[float] = None) -> bool:
+        """
+        Appends a snapshot of the packed map if it differs from the last one.
+
+        Returns:
+            bool: Whether a record was written.
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        with self.lock:
+            keyframe = self.last_bits is None or map_size != self.map_sizes[-1]
+            if not keyframe:
+                flipped = np.flatnonzero(np.unpackbits(
+                    bits ^ self.last_bits, count=map_size)).astype('<u4')
+                if len(flipped) == 0:
+                    return False
+                # a delta larger than the map itself is stored as a keyframe
+                keyframe = len(flipped) * 4 >= len(bits) \
+                    or len(self.times) - self._last_keyframe() >= KEYFRAME_INTERVAL
+
+            covered = int(np.bitwise_count(bits).sum())
+            if keyframe:
+                record_type, payload, count = KEYFRAME, bits.tobytes(), len(bits)
+            else:
+                record_type, payload, count = DELTA, flipped.tobytes(), len(flipped)
+
+            os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
+            with open(self.file_path, 'ab') as f:
+                offset = f.tell()
+                f.write(RECORD_HEADER.pack(record_type, timestamp,
+                        map_size, covered, count) + payload)
+            self._append_index(offset + RECORD_HEADER.size,
+                               record_type, timestamp, map_size, covered, count)
+            self.last_bits = bits.copy()
+            return True
+
+    def _last_keyframe(self, before: Optional[int] = None) -> int:
+        position = len(self.types) - 1 if before is None else before
+        while position > 0 and self.types[position] != KEYFRAME:
+            position -= 1
+        return position
+
+    def reconstruct(self, position: int) -> np.ndarray:
+        """
+        Rebuilds the packed map as of record number position.
+        """
+        start = self._last_keyframe(position)
+        map_size = self.map_sizes[position]
+        with open(self.file_path, 'rb') as f:
+            f.seek(self.offsets[start])
+            covered = np.unpackbits(np.frombuffer(
+                f.read(self.counts[start]), dtype=np.uint8), count=map_size)
+            for i in range(start + 1, position + 1):
+                f.seek(self.offsets[i])
+                flipped = np.frombuffer(
+                    f.read(self.counts[i] * 4), dtype='<u4')
+                covered[flipped] ^= 1
+        return np.packbits(covered)
+
+    def position_at(self, timestamp: float) -> int:
+        """
+        Returns the number of the last record taken at or before timestamp, -1 if none.
+        """
+        return bisect.bisect_right(self.times, timestamp) - 1
+
+    def map_at(self, timestamp: float) -> Optional[Tuple[np.ndarray, int]]:
+        """
+        Returns the packed map and map size as of timestamp, or None before the first record.
+        """
+        with self.lock:
+            position = self.position_at(timestamp)
+            if position < 0:
+                return None
+            return self.reconstruct(position), self.map_sizes[position]
+
+    def edges_set_between(self, start: float, end: float) -> np.ndarray:
+        """
+        Returns the ids of edges covered at end but not at start.
+        """
+        with self.lock:
+            end_position = self.position_at(end)
+            if end_position < 0:
+                return np.empty(0, dtype=np.int64)
+            end_bits = self.reconstruct(end_position)
+            map_size = self.map_sizes[end_position]
+            start_position = self.position_at(start)
+            start_bits = np.zeros_like(end_bits)
+            if start_position >= 0 and self.map_sizes[start_position] == map_size:
+                start_bits = self.reconstruct(start_position)
+        return np.flatnonzero(np.unpackbits(end_bits & ~start_bits, count=map_size))
+
+    def timeline(self) -> pd.DataFrame:
+        """
+        Returns the time, map size and covered edge count of every record.
+        """
+        with self.lock:
+            return pd.DataFrame({
+                'time': pd.to_datetime(self.times, unit='s'),
+                'map_size': self.map_sizes,
+                'edges_covered': self.covered,
+            })
+
+    def first_seen(self) -> pd.Series:
+        """
+        Returns, for every edge covered at some point, the time of the first record covering it.
+        """
+        with self.lock:
+            first = []
+            seen = None
+            for position in range(len(self.times)):
+                map_size = self.map_sizes[position]
+                if self.types[position] == KEYFRAME:
+                    bits = self.reconstruct(position)
+                    covered = np.flatnonzero(
+                        np.unpackbits(bits, count=map_size))
+                else:
+                    with open(self.file_path, 'rb') as f:
+                        f.seek(self.offsets[position])
+                        covered = np.frombuffer(
+                            f.read(self.counts[position] * 4), dtype='<u4')
+                if seen is None or len(seen) != map_size:
+                    seen = np.zeros(map_size, dtype=bool)
+                new_edges = covered[~seen[covered]]
+                seen[new_edges] = True
+                first.append(new_edges)
+            times = pd.to_datetime(self.times, unit='s')
+        edges = np.concatenate(first) if first else np.empty(0, dtype=np.int64)
+        when = times.repeat([len(new_edges) for new_edges in first])
+        return pd.Series(when, index=pd.Index(edges, name='edge'), name='first_seen')
+
+
+def get_bitmap_history(directory_path: str, fuzzer_name: str) -> BitmapHistory:
+    entry = get_data_store().entry(directory_path, fuzzer_name)
+    with entry.lock:
+        if 'bitmap_history' not in entry.cursors:
+            entry.cursors['bitmap_history'] = BitmapHistory(os.path.join(
+                snapshot_path(directory_path, fuzzer_name, 'fuzz_bitmap'), HISTORY_FILE_NAME))
+        return entry.cursors['bitmap_history']
+
+
+@profiled()
+def record_bitmap_history(directory_path: str):
+    """
+    Snapshots every fuzzer's current coverage map into its history.
+    """
+    refresh_coverage_maps(directory_path)
+    for fuzzer_name, (bits, map_size) in get_coverage_maps(directory_path).items():
+        get_bitmap_history(directory_path, fuzzer_name).record(bits, map_size)
+
+
+def first_discoveries(directory_path: str) -> pd.DataFrame:
+    """
+    Returns, per edge id, the fuzzer whose history covered it first and when.
+
+    Edge ids are only comparable between fuzzers running the same instrumented binary.
+    """
+    frames = []
+    for fuzzer_name in get_coverage_maps(directory_path):
+        first_seen = get_bitmap_history(
+            directory_path, fuzzer_name).first_seen().reset_index()
+        first_seen['fuzzer'] = fuzzer_name
+        frames.append(first_seen)
+    if not frames:
+        return pd.DataFrame(columns=['edge', 'first_seen', 'fuzzer'])
+    combined = pd.concat(frames, ignore_index=True).sort_values('first_seen')
+    return combined.drop_duplicates('edge').set_index('edge').sort_index()
+
+
+def _run_recorder(directory_path: str):
+    while True:
+        try:
+            record_bitmap_history(directory_path)
+        except Exception:
+            print(f"[!] Failed to record bitmap history of {directory_path}")
+            traceback.print_exc()
+        time.sleep(HISTORY_INTERVAL)
+
+
+@st.cache_resource
+def start_bitmap_history(directory_path: str) -> threading.Thread:
+    """
+    Starts (once per process) the thread snapshotting a campaign's maps every HISTORY_INTERVAL seconds.
+    """
+    thread = threading.Thread(target=_run_recorder, args=(directory_path,),
+                              name=f"bitmap-history:{directory_path}", daemon=True)
+    thread.start()
+    return thread
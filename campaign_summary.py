@@ -0,0 +1,57 @@
+from typing import *
+import pandas as pd
+from utils import *
+from coverage_map import get_coverage_maps, combine_maps, count_bits
+
+# fuzzer_stats counters summed over the instances of a node
+SUMMED_STATS = ['execs_per_sec', 'execs_done', 'corpus_count', 'saved_crashes', 'saved_hangs']
+
+
+def node_summary(fuzzer_stats: pd.DataFrame,
+                 maps: Dict[str, Tuple[np.ndarray, int]]) -> Tuple[pd.DataFrame, pd.Series]:
+    """
+    Aggregates instances per node, and over every instance of the campaign.
+
+    Args:
+        fuzzer_stats (pd.DataFrame): Campaign fuzzer_stats, indexed by fuzzer name.
+        maps (Dict[str, Tuple[np.ndarray, int]]): Packed coverage maps from get_coverage_maps.
+
+    Returns:
+        Tuple[pd.DataFrame, pd.Series]: Per node ("" for instances directly in the campaign
+        directory), the number of instances, the SUMMED_STATS totals and the edges covered
+        by any instance of the node (union_edges), and the same fields for the whole campaign.
+        The campaign total is kept apart, any name could also be a node directory.
+    """
+    nodes = fuzzer_stats.index.map(fuzzer_node)
+    summary = fuzzer_stats[SUMMED_STATS].groupby(nodes).sum()
+    summary.insert(0, 'fuzzers', fuzzer_stats.groupby(nodes).size())
+    summary.index.name = 'node'
+    # object dtype keeps the integer counters integers next to execs_per_sec
+    total = pd.Series({column: summary[column].sum() for column in summary.columns}, dtype=object)
+
+    union_edges = {}
+    for node in summary.index:
+        node_maps = {fuzzer_name: value for fuzzer_name, value in maps.items()
+                     if fuzzer_node(fuzzer_name) == node}
+        union_edges[node] = count_bits(combine_maps(node_maps, 'union')[0]) if node_maps else 0
+    summary['union_edges'] = pd.Series(union_edges)
+    total['union_edges'] = count_bits(combine_maps(maps, 'union')[0]) if maps else 0
+    return summary, total
+
+
+def get_node_summary(directory_path: str) -> Optional[Tuple[pd.DataFrame, pd.Series]]:
+    """
+    Returns node_summary of the campaign, recomputed only when fuzzer_stats or a map changed.
+    """
+    fuzzer_stats = get_fuzzer_stats(directory_path)
+    if fuzzer_stats is None:
+        return None
+    maps = get_coverage_maps(directory_path)
+    entry = get_data_store().entry(directory_path)
+    with entry.lock:
+        cached_stats, cached_maps, summary = entry.cursors.get(
+            'node_summary', (None, None, None))
+        if cached_stats is not fuzzer_stats or cached_maps is not maps:
+            summary = node_summary(fuzzer_stats, maps)
+            entry.cursors['node_summary'] = (fuzzer_stats, maps, summary)
+    return summary
@@ -0,0 +1,236 @@
+from typing import *
+import numpy as np
+import pandas as pd
+from utils import *
+
+# spacing of the shared time grid, in seconds
+GRID_INTERVAL = 60
+# plot_data counters summed over fuzzers, each fuzzer's value carried forward between rows
+SUMMED_COLUMNS = ['total_execs', 'saved_crashes', 'saved_hangs', 'corpus_count']
+# plot_data columns whose maximum over fuzzers is kept, published as <column>_max
+MAXED_COLUMNS = ['edges_found']
+
+
+def fuzzer_origins(fuzzer_stats: pd.DataFrame) -> pd.Series:
+    """
+    Returns, per fuzzer, the epoch time its plot_data relative_time counts from:
+    start_time, moved back by the run time carried over from the sessions it
+    resumed (run_time includes them, last_update - start_time does not).
+
+    Args:
+        fuzzer_stats (pd.DataFrame): Campaign fuzzer_stats, indexed by fuzzer name.
+
+    Returns:
+        pd.Series: Epoch seconds, NaN for fuzzers without a start_time.
+    """
+    start_time = fuzzer_stats['start_time']
+    seconds = start_time.astype('int64').where(start_time.notna()) / 10 ** 9
+    if 'run_time' not in fuzzer_stats or 'last_update' not in fuzzer_stats:
+        return seconds
+    last_update = fuzzer_stats['last_update']
+    carried = fuzzer_stats['run_time'] - \
+        (last_update.astype('int64').where(last_update.notna()) / 10 ** 9 - seconds)
+    # both are whole seconds written at slightly different times
+    return seconds - carried.where(carried > GRID_INTERVAL, 0).fillna(0)
+
+
+class FuzzerCursor:
+    """
+    Part of a fuzzer's plot_data already merged into the campaign timeline.
+    """
+
+    def __init__(self, start_time: float, origin: float):
+        self.start_time = start_time
+        self.origin = origin
+        self.rows = 0
+        self.last_time = None
+        # number of fuzzers (1) and SUMMED_COLUMNS as of the last merged row
+        self.last = np.zeros(1 + len(SUMMED_COLUMNS))
+
+
+class CampaignTimeline:
+    """
+    Campaign-wide sums and maxima of every fuzzer's plot_data on a shared grid of
+    absolute times, GRID_INTERVAL seconds apart.
+
+    A grid point holds each fuzzer's last row at or before it (an as-of join, rows
+    being moved to absolute time with fuzzer_origins), carried forward until its
+    next row. Sums are extended by adding the differences between a fuzzer's new
+    rows from the grid point of its first new row onward, and maxima by raising
+    that same tail, so merging new rows only touches the recent end of the grid.
+
+    A fuzzer whose plot_data was replaced or whose start_time changed, a removed
+    fuzzer, or rows older than the grid require a rebuild (see refresh_campaign_timeline).
+    """
+
+    def __init__(self):
+        # grid point number (epoch / GRID_INTERVAL) of the first row
+        self.first = None
+        self.size = 0
+        self.sums = np.zeros((0, 1 + len(SUMMED_COLUMNS)))
+        self.maxima = np.full((0, len(MAXED_COLUMNS)), np.nan)
+        self.cursors: Dict[str, FuzzerCursor] = {}
+        self.version = 0
+
+    def _extend(self, size: int):
+        if size <= self.size:
+            return
+        if size > len(self.sums):
+            capacity = max(size, 2 * len(self.sums), 1024)
+            sums = np.zeros((capacity, self.sums.shape[1]))
+            sums[:self.size] = self.sums[:self.size]
+            maxima = np.full((capacity, self.maxima.shape[1]), np.nan)
+            maxima[:self.size] = self.maxima[:self.size]
+            self.sums, self.maxima = sums, maxima
+        # carry every fuzzer's last value forward
+        if self.size:
+            self.sums[self.size:size] = self.sums[self.size - 1]
+            self.maxima[self.size:size] = self.maxima[self.size - 1]
+        else:
+            self.sums[:size] = 0
+            self.maxima[:size] = np.nan
+        self.size = size
+
+    def merge(self, fuzzer_name: str, start_time: float, origin: float, plot_data: pd.DataFrame) -> bool:
+        """
+        Merges the rows of a fuzzer's plot_data not merged yet.
+
+        Returns:
+            bool: False if the timeline must be rebuilt to take the rows in.
+        """
+        cursor = self.cursors.get(fuzzer_name)
+        if cursor is not None and (cursor.start_time != start_time or len(plot_data) < cursor.rows or (
+                cursor.rows and plot_data['relative_time'].iat[cursor.rows - 1] != cursor.last_time)):
+            return False
+        if cursor is None:
+            cursor = FuzzerCursor(start_time, origin)
+        if len(plot_data) == cursor.rows:
+            self.cursors[fuzzer_name] = cursor
+            return True
+        new = plot_data.iloc[cursor.rows:]
+        times = new['relative_time'].to_numpy(dtype=float) + cursor.origin
+        points = np.ceil(times / GRID_INTERVAL).astype(np.int64)
+        if self.first is None:
+            self.first = points[0]
+        if points[0] < self.first:
+            return False
+        positions = points - self.first
+        self._extend(positions[-1] + 1)
+        start = positions[0]
+
+        values = np.nan_to_num(np.column_stack(
+            [np.ones(len(new))] + [new[column].to_numpy(dtype=float) for column in SUMMED_COLUMNS]))
+        deltas = np.zeros((self.size - start, values.shape[1]))
+        np.add.at(deltas, positions - start, np.diff(values, axis=0, prepend=cursor.last[None]))
+        self.sums[start:self.size] += np.cumsum(deltas, axis=0)
+
+        # the row each grid point from start onward takes its value from
+        rows = np.searchsorted(positions, np.arange(start, self.size), side='right') - 1
+        maxed = np.column_stack([new[column].to_numpy(dtype=float) for column in MAXED_COLUMNS])
+        self.maxima[start:self.size] = np.fmax(self.maxima[start:self.size], maxed[rows])
+
+        cursor.rows = len(plot_data)
+        cursor.last_time = plot_data['relative_time'].iat[-1]
+        cursor.last = values[-1]
+        self.cursors[fuzzer_name] = cursor
+        self.version += 1
+        return True
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Returns the grid as a DataFrame: time (epoch seconds), fuzzers (number of
+        fuzzers started), the SUMMED_COLUMNS sums, the <MAXED_COLUMNS>_max maxima
+        and execs_per_sec, the campaign's mean speed since the previous grid point.
+        """
+        df = pd.DataFrame(self.sums[:self.size], columns=['fuzzers'] + SUMMED_COLUMNS)
+        df.insert(0, 'time', (self.first + np.arange(self.size, dtype=float)) * GRID_INTERVAL
+                  if self.size else np.empty(0))
+        for position, column in enumerate(MAXED_COLUMNS):
+            df[f"{column}_max"] = self.maxima[:self.size, position]
+        df['execs_per_sec'] = df['total_execs'].diff() / GRID_INTERVAL
+        return df
+
+
+def plot_data_sources(directory_path: str, fuzzer_stats: pd.DataFrame,
+                      fuzzer_names: Iterable[str]) -> Dict[str, pd.DataFrame]:
+    """
+    Returns the loaded, non-empty plot_data of the given fuzzers that have a start_time.
+    """
+    sources = {}
+    for fuzzer_name in sorted(fuzzer_names):
+        plot_data = get_table(directory_path, fuzzer_name, 'plot_data')
+        if fuzzer_name in fuzzer_stats.index and pd.notna(fuzzer_stats.at[fuzzer_name, 'start_time']) \
+                and plot_data is not None and not plot_data.empty:
+            sources[fuzzer_name] = plot_data
+    return sources
+
+
+@profiled()
+def refresh_campaign_timeline(directory_path: str, fuzzer_names: Optional[Iterable[str]] = None):
+    """
+    Merges the new plot_data rows of some fuzzers (all by default) into the
+    campaign timeline, rebuilding it from every fuzzer's plot_data when needed.
+    """
+    fuzzer_stats = get_fuzzer_stats(directory_path)
+    if fuzzer_stats is None or 'start_time' not in fuzzer_stats:
+        return
+    entry = get_data_store().entry(directory_path)
+    with entry.lock:
+        timeline = entry.cursors.setdefault('campaign_timeline', CampaignTimeline())
+        registered = set(get_fuzzers(directory_path))
+        rebuild = not set(timeline.cursors) <= registered
+        if not rebuild:
+            sources = plot_data_sources(directory_path, fuzzer_stats, registered if fuzzer_names is None
+                                        else registered.intersection(fuzzer_names))
+            origins = fuzzer_origins(fuzzer_stats.loc[list(sources)])
+            for fuzzer_name, plot_data in sources.items():
+                # a resumed fuzzer keeps the origin it was first merged with
+                cursor = timeline.cursors.get(fuzzer_name)
+                origin = cursor.origin if cursor is not None else origins[fuzzer_name]
+                if not timeline.merge(fuzzer_name, fuzzer_stats.at[fuzzer_name, 'start_time'].timestamp(),
+                                      origin, plot_data):
+                    rebuild = True
+                    break
+        if rebuild:
+            sources = plot_data_sources(directory_path, fuzzer_stats, registered)
+            origins = fuzzer_origins(fuzzer_stats.loc[list(sources)])
+            version = timeline.version
+            timeline = CampaignTimeline()
+            timeline.version = version + 1
+            entry.cursors['campaign_timeline'] = timeline
+            # earliest rows first, so the grid never has to grow backwards
+            first_times = {fuzzer_name: origins[fuzzer_name] + plot_data['relative_time'].iat[0]
+                           for fuzzer_name, plot_data in sources.items()}
+            for fuzzer_name in sorted(first_times, key=first_times.get):
+                timeline.merge(fuzzer_name, fuzzer_stats.at[fuzzer_name, 'start_time'].timestamp(),
+                               origins[fuzzer_name], sources[fuzzer_name])
+
+
+def get_campaign_timeline(directory_path: str) -> Optional[pd.DataFrame]:
+    """
+    Returns the campaign timeline (see CampaignTimeline.to_frame), published as the
+    campaign's campaign_timeline table when first read after a change, or None
+    before any plot_data was merged.
+    """
+    store = get_data_store()
+    entry = store.entry(directory_path)
+    with entry.lock:
+        timeline = entry.cursors.get('campaign_timeline')
+        if timeline is None or timeline.size == 0:
+            return None
+        if entry.cursors.get('campaign_timeline_version') != timeline.version:
+            store.publish(entry, 'campaign_timeline', timeline.to_frame())
+            entry.cursors['campaign_timeline_version'] = timeline.version
+        return entry.tables['campaign_timeline']
+
+
+def get_fuzzer_origins(directory_path: str) -> Dict[str, float]:
+    """
+    Returns the origin (see fuzzer_origins) each fuzzer was merged into the campaign timeline with.
+    """
+    entry = get_data_store().entry(directory_path)
+    with entry.lock:
+        timeline = entry.cursors.get('campaign_timeline')
+        if timeline is None:
+            return {}
+        return {fuzzer_name: cursor.origin for fuzzer_name, cursor in timeline.cursors.items()}
@@ -0,0 +1,102 @@
+import os
+from typing import *
+import pandas as pd
+
+# COMPACT_FRAMES=0 keeps pandas' default dtypes, e.g. to compare footprints
+COMPACT_FRAMES = os.environ.get("COMPACT_FRAMES") != "0"
+
+# table -> (columns of few distinct values, stored as categoricals, and columns of
+# mostly distinct text, stored as Arrow strings rather than one Python object per row)
+TABLE_TEXT_COLUMNS = {
+    'queue_data': ([], ['filename']),
+    'corpus': (['orig'], ['filename']),
+    'introspection_queue': (['original'], ['mutation', 'result']),
+    'introspection_unique': (['type', 'original'], ['mutation']),
+}
+
+# time axes stay int64: windows and offsets (e.g. 86400 s, epoch origins) are
+# subtracted from or added to them, which overflows narrow integers
+TIME_COLUMNS = {'relative_time', 'time', 'time_wo_finds'}
+
+
+def compact_frame(df: pd.DataFrame, table: str) -> pd.DataFrame:
+    """
+    Converts a parsed table to compact dtypes: percentage strings (e.g. " 8.92%")
+    to float32, integers other than TIME_COLUMNS to the narrowest signed width
+    holding their values, and text columns to categoricals or Arrow strings (see
+    TABLE_TEXT_COLUMNS).
+
+    Blocks of the same table may end up with different widths or categories,
+    concat_frames combines them without falling back to int64 or objects.
+
+    Args:
+        df (pd.DataFrame): Block of parsed rows, not modified.
+        table (str): Table name the rows belong to, e.g. "queue_data".
+
+    Returns:
+        pd.DataFrame: Same rows and columns, df itself if nothing changed.
+    """
+    if not COMPACT_FRAMES or df.empty:
+        return df
+    categories, strings = TABLE_TEXT_COLUMNS.get(table, ([], []))
+    converted = {}
+    for column in df.columns:
+        values = df[column]
+        if column in categories:
+            if not isinstance(values.dtype, pd.CategoricalDtype):
+                converted[column] = values.astype('category')
+        elif column in strings:
+            if values.dtype != 'string[pyarrow]':
+                converted[column] = values.astype('string[pyarrow]')
+        elif pd.api.types.is_bool_dtype(values):
+            continue
+        elif column in TIME_COLUMNS:
+            # snapshots written before time axes were exempt may hold them narrowed
+            if pd.api.types.is_integer_dtype(values) and values.dtype.itemsize < 8:
+                converted[column] = values.astype('Int64' if pd.api.types.is_extension_array_dtype(values)
+                                                  else 'int64')
+        elif pd.api.types.is_integer_dtype(values):
+            # signed, so differences of two columns can not wrap around
+            converted[column] = pd.to_numeric(values, downcast='integer')
+        elif values.dtype == object:
+            first = values.first_valid_index()
+            if first is None or not str(values[first]).rstrip().endswith('%'):
+                continue
+            numbers = pd.to_numeric(values.str.rstrip(' %'), errors='coerce')
+            # every value must be a percentage, not only the first
+            if numbers.notna().sum() == values.notna().sum():
+                converted[column] = numbers.astype('float32')
+    if not converted:
+        return df
+    df = df.copy(deep=False)
+    for column, values in converted.items():
+        df[column] = values
+    return df
+
+
+def concat_frames(frames: List[pd.DataFrame], ignore_index: bool = True) -> pd.DataFrame:
+    """
+    Concatenates blocks of a table, merging the categories of categorical columns
+    (pd.concat turns categoricals with different categories into objects). The
+    first block's categories keep their codes, new ones are added after them.
+    """
+    frames = [df for df in frames if not df.empty] or frames[:1]
+    if len(frames) == 1:
+        return frames[0]
+    for column in frames[0].columns:
+        dtypes = [df[column].dtype for df in frames if column in df]
+        if all(isinstance(dtype, pd.CategoricalDtype) for dtype in dtypes) and \
+                any(dtype != dtypes[0] for dtype in dtypes):
+            merged = dtypes[0].categories
+            for dtype in dtypes[1:]:
+                merged = merged.append(dtype.categories.difference(merged))
+            frames = [df.assign(**{column: df[column].cat.set_categories(merged)}) if column in df else df
+                      for df in frames]
+    return pd.concat(frames, ignore_index=ignore_index)
+
+
+def frame_bytes(df: pd.DataFrame) -> int:
+    """
+    Returns the memory held by a DataFrame, its index and the Python objects it references.
+    """
+    return int(df.memory_usage(index=True, deep=True).sum())
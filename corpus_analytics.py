@@ -0,0 +1,118 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import *
+import pandas as pd
+from utils import *
+from crash_index import DirectoryIndex, HASH_WORKERS, empty_file_index
+
+# number of entries listed by largest_entries
+LARGEST_ENTRIES = 20
+
+
+@profiled()
+def refresh_corpus_files(directory_path: str):
+    """
+    Updates the index of every fuzzer's queue/ directory and publishes the campaign's
+    corpus_files table (one row per queue entry).
+
+    Only files whose size is shared with another queue entry (of any fuzzer) can
+    have a duplicate, so only those are hashed; the others are distinct by size
+    alone. Digests are cached by (file name, size, mtime) in each DirectoryIndex.
+    Besides fuzzer, file_name, size, mtime_ns and digest, each row has a content
+    key, the number of entries with the same content (copies), whether it was
+    imported from another fuzzer (sync) and whether it is the first copy (the
+    oldest entry not imported, or the oldest import if all are).
+    """
+    store = get_data_store()
+    entry = store.entry(directory_path)
+    with entry.lock:
+        # fuzzer name -> DirectoryIndex
+        indexes = entry.cursors.setdefault('corpus_files', {})
+        # fuzzer name -> its rows of corpus_files, without the campaign-wide columns
+        frames = entry.cursors.setdefault('corpus_frames', {})
+        fuzzer_names = get_fuzzers(directory_path, 'queue')
+        changed = {fuzzer_name for fuzzer_name in fuzzer_names if fuzzer_name not in frames}
+        removed = [name for name in indexes if name not in fuzzer_names]
+        for fuzzer_name in removed:
+            del indexes[fuzzer_name]
+            frames.pop(fuzzer_name, None)
+        with ThreadPoolExecutor(max_workers=HASH_WORKERS) as executor:
+            for fuzzer_name in fuzzer_names:
+                if fuzzer_name not in indexes:
+                    indexes[fuzzer_name] = DirectoryIndex(
+                        os.path.join(directory_path, fuzzer_name, 'queue'),
+                        snapshot_path(directory_path, fuzzer_name, 'queue'), hash_new=False)
+                if indexes[fuzzer_name].refresh(executor):
+                    changed.add(fuzzer_name)
+            if not changed and not removed and 'corpus_files' in entry.tables:
+                return
+
+            # size pre-filter: hash only entries whose size is not unique
+            sizes = [index.files['size'].to_numpy() for index in indexes.values()]
+            size_counts = pd.Series(np.concatenate(sizes) if sizes else [], dtype='int64').value_counts()
+            shared_sizes = set(size_counts.index[size_counts > 1])
+            for fuzzer_name, index in indexes.items():
+                candidates = index.files.loc[index.files['size'].isin(shared_sizes), 'file_name']
+                if index.hash_missing(candidates, executor):
+                    changed.add(fuzzer_name)
+
+        # only the rows of fuzzers whose queue changed are rebuilt
+        for fuzzer_name in changed:
+            files = indexes[fuzzer_name].files.copy()
+            files.insert(0, 'fuzzer', fuzzer_name)
+            frames[fuzzer_name] = files
+        if frames:
+            corpus_files = pd.concat([frames[name] for name in sorted(frames)], ignore_index=True)
+        else:
+            corpus_files = empty_file_index()
+            corpus_files.insert(0, 'fuzzer', pd.Series(dtype=object))
+        # entries with a unique size were never hashed but cannot collide
+        corpus_files['content'] = corpus_files['digest'].where(
+            corpus_files['size'].isin(shared_sizes), 'size:' + corpus_files['size'].astype(str))
+        # removed or renamed between listing and hashing, the next rescan drops or re-adds it
+        corpus_files = corpus_files[corpus_files['content'].notna()].reset_index(drop=True)
+        corpus_files['copies'] = corpus_files.groupby(
+            'content')['content'].transform('size').astype('int64')
+        corpus_files['imported'] = corpus_files['file_name'].str.contains(',sync:', regex=False)
+        # the fuzzer that found an input holds the original, sync imports are the copies
+        first = corpus_files.sort_values(['imported', 'mtime_ns']).drop_duplicates('content').index
+        corpus_files['first_copy'] = corpus_files.index.isin(first)
+        store.publish(entry, 'corpus_files', corpus_files)
+
+
+def get_corpus_files(directory_path: str) -> pd.DataFrame:
+    corpus_files = get_data_store().get(directory_path, None, 'corpus_files')
+    if corpus_files is None:
+        refresh_corpus_files(directory_path)
+        corpus_files = get_data_store().get(directory_path, None, 'corpus_files')
+    return corpus_files
+
+
+def corpus_storage_summary(corpus_files: pd.DataFrame) -> pd.DataFrame:
+    """
+    Returns per fuzzer queue entries and bytes, split into entries found by the
+    fuzzer itself and entries imported from others, the bytes of contents no
+    other queue holds (unique_bytes), the bytes of extra copies of contents
+    stored earlier elsewhere (duplicate_bytes) and their share of the queue
+    (duplication_ratio).
+    """
+    size = corpus_files['size']
+    columns = pd.DataFrame({
+        'fuzzer': corpus_files['fuzzer'],
+        'entries': 1,
+        'bytes': size,
+        'own_bytes': size.where(~corpus_files['imported'], 0),
+        'imported_bytes': size.where(corpus_files['imported'], 0),
+        'unique_bytes': size.where(corpus_files['copies'] == 1, 0),
+        'duplicate_bytes': size.where(~corpus_files['first_copy'], 0),
+    })
+    summary = columns.groupby('fuzzer').sum()
+    summary['duplication_ratio'] = summary['duplicate_bytes'] / \
+        summary['bytes'].where(summary['bytes'] > 0)
+    return summary
+
+
+def largest_entries(corpus_files: pd.DataFrame, n: int = LARGEST_ENTRIES) -> pd.DataFrame:
+    """
+    Returns the n largest queue entries with the number of copies of their content.
+    """
+    return corpus_files.nlargest(n, 'size')[['fuzzer', 'file_name', 'size', 'copies', 'imported']]
@@ -0,0 +1,177 @@
+import numpy as np
+from typing import *
+from utils import *
+
+# largest side, in tiles, of a rendered coverage raster
+RASTER_MAX_SIDE = 512
+
+
+def read_coverage(file_path: str) -> Tuple[np.ndarray, int]:
+    """
+    Reads a fuzz_bitmap into a packed coverage bitmask.
+
+    AFL++ writes its virgin bits map there: one byte per edge, 0xff while the
+    edge has never been hit. The file is truncated and rewritten in place, so it
+    is read with a single read() instead of being memory-mapped, which would
+    fault (SIGBUS) if the file shrank while mapped.
+
+    Args:
+        file_path (str): Path to a fuzz_bitmap file.
+
+    Returns:
+        Tuple[np.ndarray, int]: Packed bits (1 = edge covered) and the map size in edges.
+    """
+    virgin_bits = np.fromfile(file_path, dtype=np.uint8)
+    return np.packbits(virgin_bits != 0xff), len(virgin_bits)
+
+
+@profiled()
+def refresh_coverage_maps(directory_path: str):
+    """
+    Re-reads only the fuzz_bitmap files whose mtime or size changed and publishes
+    the campaign's coverage_maps table (fuzzer name -> (packed bits, map size)).
+    """
+    store = get_data_store()
+    entry = store.entry(directory_path)
+    with entry.lock:
+        # file path -> ((mtime_ns, size), packed bits, map size)
+        cache = entry.cursors.setdefault('fuzz_bitmap', {})
+        file_paths = {os.path.join(directory_path, fuzzer_name, 'fuzz_bitmap'): fuzzer_name
+                      for fuzzer_name in get_fuzzers(directory_path, 'fuzz_bitmap')}
+        changed = set(file_paths) != set(cache)
+        for file_path in set(cache) - set(file_paths):
+            del cache[file_path]
+
+        for file_path in file_paths:
+            try:
+                stat = os.stat(file_path)
+            except FileNotFoundError:
+                continue
+            signature = (stat.st_mtime_ns, stat.st_size)
+            if file_path in cache and cache[file_path][0] == signature:
+                continue
+            cache[file_path] = (signature, *read_coverage(file_path))
+            changed = True
+
+        if changed or 'coverage_maps' not in entry.tables:
+            maps = {file_paths[file_path]: (bits, map_size)
+                    for file_path, (_, bits, map_size) in sorted(cache.items())}
+            store.publish(entry, 'coverage_maps', maps)
+
+
+def get_coverage_maps(directory_path: str) -> Dict[str, Tuple[np.ndarray, int]]:
+    maps = get_data_store().get(directory_path, None, 'coverage_maps')
+    if maps is None:
+        refresh_coverage_maps(directory_path)
+        maps = get_data_store().get(directory_path, None, 'coverage_maps')
+    return maps
+
+
+def align_maps(maps: Dict[str, Tuple[np.ndarray, int]]) -> Tuple[Dict[str, np.ndarray], int]:
+    """
+    Pads every packed map to the largest map size, padding edges counting as not covered.
+    """
+    map_size = max((size for _, size in maps.values()), default=0)
+    n_bytes = -(-map_size // 8)
+    aligned = {}
+    for fuzzer_name, (bits, _) in maps.items():
+        aligned[fuzzer_name] = np.pad(bits, (0, n_bytes - len(bits)))
+    return aligned, map_size
+
+
+def combine_maps(maps: Dict[str, Tuple[np.ndarray, int]], mode: str, fuzzer_name: Optional[str] = None) -> Tuple[np.ndarray, int]:
+    """
+    Combines the coverage of several fuzzers with vectorized bit operations.
+
+    Args:
+        maps (Dict[str, Tuple[np.ndarray, int]]): Packed maps from get_coverage_maps.
+        mode (str): "union", "intersection", "unique" (covered by fuzzer_name only)
+            or "single" (fuzzer_name's own coverage).
+        fuzzer_name (str, optional): Fuzzer for the "unique" and "single" modes.
+
+    Returns:
+        Tuple[np.ndarray, int]: Packed bits of the result and the map size.
+    """
+    aligned, map_size = align_maps(maps)
+    stacked = np.stack(list(aligned.values()))
+    if mode == 'union':
+        return np.bitwise_or.reduce(stacked), map_size
+    if mode == 'intersection':
+        return np.bitwise_and.reduce(stacked), map_size
+    if mode == 'single':
+        return aligned[fuzzer_name], map_size
+    if mode == 'unique':
+        others = [bits for name, bits in aligned.items() if name != fuzzer_name]
+        if not others:
+            return aligned[fuzzer_name], map_size
+        return aligned[fuzzer_name] & ~np.bitwise_or.reduce(np.stack(others)), map_size
+    raise ValueError(f"Unknown mode {mode}")
+
+
+def count_bits(bits: np.ndarray) -> int:
+    return int(np.bitwise_count(bits).sum())
+
+
+def coverage_summary(maps: Dict[str, Tuple[np.ndarray, int]]) -> pd.DataFrame:
+    """
+    Returns per fuzzer map size, covered edges and edges no other fuzzer covers.
+    """
+    aligned, _ = align_maps(maps)
+    stacked = np.stack(list(aligned.values()))
+    # OR of the fuzzers before / after each one, so "everyone else" costs O(fuzzers)
+    empty = np.zeros((1, stacked.shape[1]), dtype=np.uint8)
+    before = np.concatenate(
+        [empty, np.bitwise_or.accumulate(stacked, axis=0)[:-1]])
+    after = np.concatenate(
+        [np.bitwise_or.accumulate(stacked[::-1], axis=0)[::-1][1:], empty])
+    unique = stacked & ~(before | after)
+
+    rows = {}
+    for i, (fuzzer_name, (bits, map_size)) in enumerate(maps.items()):
+        rows[fuzzer_name] = {
+            'map_size': map_size,
+            'edges_covered': count_bits(bits),
+            'unique_edges': count_bits(unique[i]),
+        }
+    return pd.DataFrame.from_dict(rows, orient='index')
+
+
+def get_coverage_summary(directory_path: str) -> pd.DataFrame:
+    """
+    Returns coverage_summary of the campaign's current maps, computed once per map change.
+    """
+    maps = get_coverage_maps(directory_path)
+    entry = get_data_store().entry(directory_path)
+    with entry.lock:
+        cached_maps, summary = entry.cursors.get(
+            'coverage_summary', (None, None))
+        if cached_maps is not maps:
+            summary = coverage_summary(maps)
+            entry.cursors['coverage_summary'] = (maps, summary)
+    return summary
+
+
+def density_raster(bits: np.ndarray, map_size: int, max_side: int = RASTER_MAX_SIDE) -> np.ndarray:
+    """
+    Lays the map out as a square and averages it into at most max_side x max_side tiles.
+
+    Returns:
+        np.ndarray: Fraction of covered edges per tile, as float32 in [0, 1].
+    """
+    covered = np.unpackbits(bits, count=map_size)
+    side = max(1, int(np.ceil(np.sqrt(map_size))))
+    tile = -(-side // max_side)
+    side = -(-side // tile) * tile
+    grid = np.zeros(side * side, dtype=np.float32)
+    grid[:map_size] = covered
+    tiles = side // tile
+    return grid.reshape(tiles, tile, tiles, tile).mean(axis=(1, 3))
+
+
+def raster_image(density: np.ndarray) -> np.ndarray:
+    """
+    Colors a density raster from white (nothing covered) to dark blue (fully covered).
+    """
+    low = np.array([255, 255, 255], dtype=np.float32)
+    high = np.array([8, 48, 107], dtype=np.float32)
+    return (low + density[..., None] * (high - low)).astype(np.uint8)
@@ -0,0 +1,236 @@
+import hashlib
+import json
+import os
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import *
+import pandas as pd
+from utils import *
+from snapshot_cache import SNAPSHOT_INTERVAL
+
+# fuzzer subdirectories holding saved inputs, and the kind recorded for their files
+CRASH_DIRECTORIES = {'crashes': 'crash', 'hangs': 'hang'}
+HASH_WORKERS = 8
+HASH_BLOCK_SIZE = 1 << 20
+INDEX_FILE_NAME = 'index.parquet'
+INDEX_MANIFEST_NAME = 'index.json'
+
+
+def hash_file(file_path: str) -> Optional[str]:
+    digest = hashlib.blake2b(digest_size=16)
+    try:
+        with open(file_path, 'rb') as f:
+            while block := f.read(HASH_BLOCK_SIZE):
+                digest.update(block)
+    except OSError:
+        # removed between listing and hashing
+        return None
+    return digest.hexdigest()
+
+
+def empty_file_index() -> pd.DataFrame:
+    return pd.DataFrame({'file_name': pd.Series(dtype=object), 'size': pd.Series(dtype='int64'),
+                         'mtime_ns': pd.Series(dtype='int64'), 'digest': pd.Series(dtype=object)})
+
+
+class DirectoryIndex:
+    """
+    Index of the inputs saved in one crashes/, hangs/ or queue/ directory.
+
+    The directory is only listed again when its mtime changed (a file was added,
+    removed or renamed), and only files not indexed yet (or whose size or mtime
+    changed) are hashed. With hash_new=False, new files are indexed with no digest
+    until hash_missing() is called for them. The index is persisted next to the
+    parquet snapshots, at most once per SNAPSHOT_INTERVAL, so a restart only
+    re-hashes the files indexed since the last save.
+    """
+
+    def __init__(self, directory_path: str, cache_path: str, hash_new: bool = True):
+        self.directory_path = directory_path
+        self.cache_path = cache_path
+        self.hash_new = hash_new
+        self.mtime_ns = None
+        self.files = empty_file_index()
+        self.last_save = 0
+        self.unsaved = False
+        self._restore()
+
+    def _restore(self):
+        try:
+            with open(os.path.join(self.cache_path, INDEX_MANIFEST_NAME)) as f:
+                mtime_ns = json.load(f)['mtime_ns']
+            self.files = pd.read_parquet(
+                os.path.join(self.cache_path, INDEX_FILE_NAME))
+            self.mtime_ns = mtime_ns
+            self.last_save = time.time()
+        except (OSError, KeyError, ValueError, TypeError):
+            pass
+
+    def _save(self):
+        # unsaved changes are written by a later call once the interval elapsed
+        if time.time() - self.last_save < SNAPSHOT_INTERVAL:
+            self.unsaved = True
+            return
+        self.last_save, self.unsaved = time.time(), False
+        try:
+            os.makedirs(self.cache_path, exist_ok=True)
+            index_path = os.path.join(self.cache_path, INDEX_FILE_NAME)
+            self.files.to_parquet(index_path + '.tmp', index=False)
+            os.replace(index_path + '.tmp', index_path)
+            # written last, so a crash in between only causes a rescan
+            manifest_path = os.path.join(self.cache_path, INDEX_MANIFEST_NAME)
+            with open(manifest_path + '.tmp', 'w') as f:
+                json.dump({'mtime_ns': self.mtime_ns}, f)
+            os.replace(manifest_path + '.tmp', manifest_path)
+        except (OSError, ValueError, TypeError) as e:
+            print(f"[!] Could not save index {self.cache_path}: {e}")
+
+    def refresh(self, executor: ThreadPoolExecutor) -> bool:
+        """
+        Rescans the directory if its mtime changed.
+
+        Returns:
+            bool: Whether the index changed.
+        """
+        try:
+            mtime_ns = os.stat(self.directory_path).st_mtime_ns
+        except FileNotFoundError:
+            changed = not self.files.empty
+            self.files, self.mtime_ns = empty_file_index(), None
+            return changed
+        if mtime_ns == self.mtime_ns:
+            if self.unsaved:
+                self._save()
+            return False
+
+        listed = {}
+        with os.scandir(self.directory_path) as it:
+            for dir_entry in it:
+                # skip README.txt and AFL++'s temporary files
+                if not dir_entry.name.startswith('id:') or not dir_entry.is_file():
+                    continue
+                stat = dir_entry.stat()
+                listed[dir_entry.name] = (stat.st_size, stat.st_mtime_ns)
+
+        known = self.files[self.files['file_name'].isin(listed.keys())]
+        unchanged = [listed[name] == (size, mtime_ns) for name, size, mtime_ns in
+                     zip(known['file_name'], known['size'], known['mtime_ns'])]
+        known = known[unchanged] if len(known) else known
+        new_names = sorted(set(listed) - set(known['file_name']))
+        if self.hash_new:
+            digests = list(executor.map(hash_file, [os.path.join(
+                self.directory_path, name) for name in new_names]))
+        else:
+            digests = [None] * len(new_names)
+
+        new_files = pd.DataFrame({
+            'file_name': pd.Series(new_names, dtype=object),
+            'size': [listed[name][0] for name in new_names],
+            'mtime_ns': [listed[name][1] for name in new_names],
+            'digest': digests,
+        }).astype({'size': 'int64', 'mtime_ns': 'int64'})
+        if self.hash_new:
+            new_files = new_files[new_files['digest'].notna()]
+
+        changed = len(known) != len(self.files) or not new_files.empty
+        if changed:
+            frames = [df for df in (known, new_files) if not df.empty]
+            self.files = pd.concat(frames, ignore_index=True).sort_values(
+                'file_name', ignore_index=True) if frames else empty_file_index()
+        self.mtime_ns = mtime_ns
+        self._save()
+        return changed
+
+    def hash_missing(self, file_names: Iterable[str], executor: ThreadPoolExecutor) -> bool:
+        """
+        Hashes the given indexed files that have no digest yet.
+
+        Returns:
+            bool: Whether any digest was added.
+        """
+        missing = self.files['digest'].isna() & self.files['file_name'].isin(set(file_names))
+        if not missing.any():
+            return False
+        self.files.loc[missing, 'digest'] = list(executor.map(hash_file, [os.path.join(
+            self.directory_path, name) for name in self.files.loc[missing, 'file_name']]))
+        self._save()
+        return True
+
+
+@profiled()
+def refresh_crash_index(directory_path: str):
+    """
+    Updates the index of every fuzzer's crashes/ and hangs/ directories and publishes
+    the campaign's crash_index table (one row per saved input).
+
+    Besides the decoded filename columns, each row has the fuzzer, kind ("crash" or
+    "hang"), size, mtime, content digest, the number of saved inputs across the
+    campaign with the same content (copies) and whether it is the earliest of them
+    (first_copy).
+    """
+    store = get_data_store()
+    entry = store.entry(directory_path)
+    with entry.lock:
+        # (fuzzer name, directory name) -> DirectoryIndex
+        indexes = entry.cursors.setdefault('crash_index', {})
+        changed = 'crash_index' not in entry.tables
+        fuzzer_names = get_fuzzers(directory_path)
+        for key in [key for key in indexes if key[0] not in fuzzer_names]:
+            del indexes[key]
+            changed = True
+        with ThreadPoolExecutor(max_workers=HASH_WORKERS) as executor:
+            for fuzzer_name in fuzzer_names:
+                for directory_name in CRASH_DIRECTORIES:
+                    key = (fuzzer_name, directory_name)
+                    if key not in indexes:
+                        indexes[key] = DirectoryIndex(
+                            os.path.join(directory_path, fuzzer_name, directory_name),
+                            snapshot_path(directory_path, fuzzer_name, directory_name))
+                        changed = True
+                    changed = indexes[key].refresh(executor) or changed
+        if not changed:
+            return
+
+        frames = []
+        for (fuzzer_name, directory_name), index in sorted(indexes.items()):
+            if index.files.empty:
+                continue
+            files = index.files.copy()
+            files.insert(0, 'kind', CRASH_DIRECTORIES[directory_name])
+            files.insert(0, 'fuzzer', fuzzer_name)
+            frames.append(files)
+        if frames:
+            crash_index = pd.concat(frames, ignore_index=True)
+        else:
+            crash_index = empty_file_index()
+            crash_index.insert(0, 'kind', pd.Series(dtype=object))
+            crash_index.insert(0, 'fuzzer', pd.Series(dtype=object))
+        crash_index = pd.concat(
+            [crash_index, decode_queue_filenames(crash_index['file_name'])], axis=1)
+        crash_index['copies'] = crash_index.groupby(
+            'digest')['digest'].transform('size').astype('int64')
+        earliest = crash_index.sort_values('mtime_ns').drop_duplicates('digest').index
+        crash_index['first_copy'] = crash_index.index.isin(earliest)
+        store.publish(entry, 'crash_index', crash_index)
+
+
+def get_crash_index(directory_path: str) -> pd.DataFrame:
+    crash_index = get_data_store().get(directory_path, None, 'crash_index')
+    if crash_index is None:
+        refresh_crash_index(directory_path)
+        crash_index = get_data_store().get(directory_path, None, 'crash_index')
+    return crash_index
+
+
+def crash_summary(crash_index: pd.DataFrame) -> pd.DataFrame:
+    """
+    Returns per fuzzer and kind the saved inputs, distinct contents and contents
+    no earlier input (of any fuzzer) had.
+    """
+    grouped = crash_index.groupby(['fuzzer', 'kind'], observed=True)
+    return pd.DataFrame({
+        'saved': grouped.size(),
+        'distinct': grouped['digest'].nunique(),
+        'first_found': grouped['first_copy'].sum(),
+    })
@@ -1,4 +1,76 @@
-import streamlit as st
 import pandas as pd
+import streamlit as st
+import plotly.express as px
+from utils import *
+from ingest import start_ingestion
+from crash_index import *
+from testcase_viewer import render_testcase, testcase_path
+
+UPDATE_INTERVAL = 5
+# UPDATE_INTERVAL = 60
+DATA_DIRECTORY_PATH = 'sample-data'
+# DATA_DIRECTORY_PATH = 'out'
+PAGE_SIZE = 200
+DISPLAY_COLUMNS = ['fuzzer', 'kind', 'id', 'sig', 'src', 'time', 'execs', 'op', 'size', 'copies', 'file_name']
+
+st.set_page_config(
+    layout="wide"
+)
+
+st.header("Crashes & Hangs")
+
+
+@st.fragment(run_every=UPDATE_INTERVAL)
+@profiled('crashes_hangs.generate_crash_index')
+def generate_crash_index():
+    start_ingestion(DATA_DIRECTORY_PATH)
+    crash_index = get_crash_index(DATA_DIRECTORY_PATH)
+    if crash_index.empty:
+        st.info("No crashes or hangs saved yet")
+        return
+
+    is_crash = crash_index['kind'] == 'crash'
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Crashes", int(is_crash.sum()))
+    col2.metric("Distinct crashes", crash_index.loc[is_crash, 'digest'].nunique())
+    col3.metric("Hangs", int((~is_crash).sum()))
+    col4.metric("Distinct hangs", crash_index.loc[~is_crash, 'digest'].nunique())
+
+    summary = crash_summary(crash_index)
+    bar_fig = px.bar(summary.reset_index(), x='fuzzer', y='first_found', color='kind',
+                     barmode='group', title='Inputs Found First per Fuzzer')
+    st.plotly_chart(bar_fig, width='stretch')
+    st.dataframe(summary)
+
+    col1, col2, col3 = st.columns(3)
+    kinds = col1.multiselect("Kind", ['crash', 'hang'], default=['crash', 'hang'], key='crash_kinds')
+    fuzzers = col2.multiselect("Fuzzer", sorted(crash_index['fuzzer'].unique()), key='crash_fuzzers')
+    distinct_only = col3.toggle("Distinct contents only", value=True, key='crash_distinct')
+
+    mask = crash_index['kind'].isin(kinds)
+    if fuzzers:
+        mask &= crash_index['fuzzer'].isin(fuzzers)
+    if distinct_only:
+        mask &= crash_index['first_copy']
+    rows = crash_index[mask].sort_values('mtime_ns', ascending=False)
+
+    n_pages = max(1, -(-len(rows) // PAGE_SIZE))
+    # a narrower filter may leave fewer pages than the one shown
+    if st.session_state.get('crash_page', 1) > n_pages:
+        st.session_state['crash_page'] = n_pages
+    page = st.number_input(f"Page (of {n_pages})", min_value=1, max_value=n_pages, key='crash_page')
+    shown = rows.iloc[(page - 1) * PAGE_SIZE:page * PAGE_SIZE]
+    selection = st.dataframe(shown[DISPLAY_COLUMNS], hide_index=True, on_select='rerun',
+                             selection_mode='single-row', key='crash_rows')
+    st.caption(f"{len(rows)} matching inputs")
+
+    selected_rows = selection.selection.rows
+    if selected_rows and selected_rows[0] < len(shown):
+        selected = shown.iloc[selected_rows[0]]
+        directory_name = {kind: name for name, kind in CRASH_DIRECTORIES.items()}[selected['kind']]
+        st.subheader(selected['file_name'])
+        render_testcase(DATA_DIRECTORY_PATH, selected['fuzzer'], testcase_path(
+            DATA_DIRECTORY_PATH, selected['fuzzer'], selected['file_name'], directory_name), key='crash_testcase')
+
 
-st.caption("Under construction")
\ No newline at end of file
+generate_crash_index()
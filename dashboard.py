@@ -5,9 +5,14 @@ import plotly.express as px
 import plotly.graph_objects as go
 from typing import *
 from utils import *
-
-UPDATE_INTERVAL = 60
-# UPDATE_INTERVAL = 5
+from ingest import start_ingestion
+from campaign_summary import get_node_summary
+from rolling_metrics import get_window_metrics, METRIC_WINDOWS
+from campaign_timeline import get_campaign_timeline, get_fuzzer_origins
+
+# fragments only read data parsed by the ingestion thread, so ticks are cheap
+UPDATE_INTERVAL = 5
+# UPDATE_INTERVAL = 60
 DATA_DIRECTORY_PATH = 'sample-data'
 # DATA_DIRECTORY_PATH = 'out'
 
@@ -17,50 +22,115 @@ st.set_page_config(
 
 
 @st.fragment(run_every=UPDATE_INTERVAL)
+@profiled('dashboard.generate_campaign_summary')
+def generate_campaign_summary():
+    start_ingestion(DATA_DIRECTORY_PATH)
+    node_summary = get_node_summary(DATA_DIRECTORY_PATH)
+    if node_summary is None or node_summary[0].empty:
+        return
+    summary, campaign = node_summary
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Total execs/s", f"{campaign['execs_per_sec']:,.0f}")
+    col2.metric("Union edges", f"{campaign['union_edges']:,}")
+    col3.metric("Total crashes", f"{campaign['saved_crashes']:,}")
+    col4.metric("Total hangs", f"{campaign['saved_hangs']:,}")
+    # instances directly in the campaign directory have no node
+    if len(summary) > 1 or '' not in summary.index:
+        st.dataframe(summary.rename(index={'': '(root)'}))
+
+
+@st.fragment(run_every=UPDATE_INTERVAL)
+@profiled('dashboard.generate_rates')
+def generate_rates():
+    start_ingestion(DATA_DIRECTORY_PATH)
+    window = st.radio("Rate window", list(METRIC_WINDOWS), index=1, horizontal=True,
+                      key='dashboard_rate_window')
+    metrics = get_window_metrics(DATA_DIRECTORY_PATH, window)
+    if metrics.empty:
+        return
+    st.dataframe(metrics[['execs_per_sec_mean', 'execs_per_sec_std', 'finds', 'finds_per_hour',
+                          'crashes', 'hangs', 'since_last_cov']],
+                 column_config={'since_last_cov': st.column_config.NumberColumn(
+                     "since_last_cov (s)", format="%.0f")})
+
+
+@st.fragment(run_every=UPDATE_INTERVAL)
+@profiled('dashboard.generate_progress_bar')
 def generate_progress_bar():
-    update_session_fuzzer_stats(DATA_DIRECTORY_PATH)
-    for idx, row in st.session_state.fuzzer_stats.iterrows():
-        edges_found = pd.to_numeric(row['edges_found'])
-        total_edges = pd.to_numeric(row['total_edges'])
-        percentage = (edges_found / total_edges) * 100 if total_edges else 0
+    start_ingestion(DATA_DIRECTORY_PATH)
+    fuzzer_stats = get_fuzzer_stats(DATA_DIRECTORY_PATH)
+    edges_found = fuzzer_stats['edges_found']
+    total_edges = fuzzer_stats['total_edges']
+    percentages = (edges_found / total_edges.where(total_edges > 0) * 100).fillna(0)
+    for idx, percentage in percentages.items():
         st.progress(
             percentage / 100,
-            text=f"**{idx}**: {percentage:.2f}% ({edges_found} / {total_edges})"
+            text=f"**{idx}**: {percentage:.2f}% ({edges_found[idx]} / {total_edges[idx]})"
         )
 
 
 @st.fragment(run_every=UPDATE_INTERVAL)
+@profiled('dashboard.generate_chart')
 def generate_chart():
-    update_session_plot_data(DATA_DIRECTORY_PATH)
+    start_ingestion(DATA_DIRECTORY_PATH)
+    timeline = get_campaign_timeline(DATA_DIRECTORY_PATH)
+    if timeline is None:
+        return
+    # every fuzzer is drawn against absolute time, windows count from the campaign's start
+    campaign_start = timeline['time'].iat[0]
+    window = time_window_selector(
+        'edges_found_window', timeline['time'].iat[-1] - campaign_start)
     plot_data_fig = go.Figure()
 
-    for file_path in glob.glob(os.path.join(DATA_DIRECTORY_PATH, "*", "plot_data")):
-        base_name = os.path.basename(os.path.dirname(file_path))
-        session_plot_data = st.session_state[base_name]['plot_data']
-
+    for base_name, origin in get_fuzzer_origins(DATA_DIRECTORY_PATH).items():
+        fuzzer_window = None if window is None else (
+            window[0] + campaign_start - origin, window[1] + campaign_start - origin)
+        session_plot_data = get_series(
+            DATA_DIRECTORY_PATH, base_name, 'plot_data', 'edges_found', window=fuzzer_window)
+        if session_plot_data is None:
+            # discovered, but its plot_data has not been ingested yet
+            continue
         plot_data_fig.add_trace(go.Scatter(
-            x=session_plot_data['relative_time'],
+            x=pd.to_datetime(session_plot_data['relative_time'] + origin, unit='s'),
             y=session_plot_data['edges_found'],
             # mode='lines'
             name=base_name
         ))
 
+    campaign_window = None if window is None else (
+        window[0] + campaign_start, window[1] + campaign_start)
+    best = get_series(DATA_DIRECTORY_PATH, None, 'campaign_timeline', 'edges_found_max',
+                      x_column='time', window=campaign_window)
+    plot_data_fig.add_trace(go.Scatter(
+        x=pd.to_datetime(best['time'], unit='s'),
+        y=best['edges_found_max'],
+        name="best instance",
+        line=dict(dash="dot")
+    ))
+
     plot_data_fig.update_layout(title='Edges Found Over Time')
 
     st.plotly_chart(plot_data_fig)
 
+    execs_per_sec = get_series(DATA_DIRECTORY_PATH, None, 'campaign_timeline', 'execs_per_sec',
+                               x_column='time', window=campaign_window)
+    execs_per_sec_fig = go.Figure()
+    execs_per_sec_fig.add_trace(go.Scatter(
+        x=pd.to_datetime(execs_per_sec['time'], unit='s'),
+        y=execs_per_sec['execs_per_sec'],
+    ))
+    execs_per_sec_fig.update_layout(title='Campaign execs/s')
+    st.plotly_chart(execs_per_sec_fig)
+
 
 @st.fragment(run_every=UPDATE_INTERVAL)
+@profiled('dashboard.generate_crash_hangs_bar')
 def generate_crash_hangs_bar():
     # Show crashes and hangs per fuzzer
     # Prepare data for bar chart
-    update_session_fuzzer_stats(DATA_DIRECTORY_PATH)
-    crash_hang_df = st.session_state.fuzzer_stats.reset_index(
-    )[['index', 'saved_crashes', 'saved_hangs']].copy()
-    crash_hang_df['saved_crashes'] = pd.to_numeric(
-        crash_hang_df['saved_crashes'], errors='coerce').fillna(0).astype(int)
-    crash_hang_df['saved_hangs'] = pd.to_numeric(
-        crash_hang_df['saved_hangs'], errors='coerce').fillna(0).astype(int)
+    start_ingestion(DATA_DIRECTORY_PATH)
+    crash_hang_df = get_fuzzer_stats(DATA_DIRECTORY_PATH).reset_index(
+    )[['index', 'saved_crashes', 'saved_hangs']]
     crash_hang_df = crash_hang_df.melt(id_vars='index', value_vars=['saved_crashes', 'saved_hangs'],
                                        var_name='Type', value_name='Count')
 
@@ -81,6 +151,12 @@ def generate_crash_hangs_bar():
     st.plotly_chart(bar_fig, width='stretch')
 
 
+st.subheader("Campaign")
+generate_campaign_summary()
+
+st.subheader("Rates")
+generate_rates()
+
 st.subheader("Code Coverage")
 generate_progress_bar()
 
@@ -2,62 +2,73 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime
 import plotly.express as px
-import os
+from profiling import PROFILER, PROFILE_LOG
+from utils import *
+from ingest import start_ingestion
+from compact import COMPACT_FRAMES
 
-UPDATE_INTERVAL = 60 
-LOG_FILE_PATH = 'logs/utils.log'
+UPDATE_INTERVAL = 60
+DATA_DIRECTORY_PATH = 'sample-data'
+# DATA_DIRECTORY_PATH = 'out'
 
 st.set_page_config(layout='wide')
 
 
-def load_log_data(file_path, skip_rows=0):
-    # Read only new rows, preserving the header
-    df = pd.read_csv(file_path, skiprows=skip_rows, names=['asctime', 'function', 'elapsed'])
-    df.columns = df.columns.str.strip()
-    return df
-
-
-def update_session_log_data(file_path):
-    if 'log_data' not in st.session_state:
-        log_data = load_log_data(file_path)
-        st.session_state.log_data = log_data
-        st.session_state.log_data_len = len(log_data)
-    else:
-        existing_log_data = st.session_state.log_data
-        existing_log_data_len = st.session_state.log_data_len
-        new_log_data = load_log_data(
-            file_path, skip_rows=existing_log_data_len)
-
-        if not new_log_data.empty:
-            updated_data = pd.concat(
-                [existing_log_data, new_log_data], ignore_index=True)
-
-            st.session_state.log_data = updated_data
-            st.session_state.log_data_len  = len(updated_data)
-            st.session_state.new_log_data = new_log_data
-
 @st.fragment(run_every=UPDATE_INTERVAL)
+@profiled('debug.generate_chart')
 def generate_chart():
-    update_session_log_data(LOG_FILE_PATH)
+    summary = PROFILER.summary()
+    if summary.empty:
+        st.info("Nothing recorded yet")
+        return
+
+    st.dataframe(summary, column_config={
+        column: st.column_config.NumberColumn(format='%.4f s')
+        for column in summary.columns if column.startswith('wall_') or column == 'cpu_mean'})
 
+    samples = PROFILER.samples()
     fig = px.line(
-        st.session_state.log_data,
-        x='asctime',
-        y='elapsed',
-        color='function',  # Different color for each function
+        samples,
+        x='timestamp',
+        y='wall',
+        color='name',  # Different color for each function
         title="Performance by Function",
-        labels={'elapsed': 'Elapsed Time',
-                'asctime': 'Timestamp', 'function': 'Function'}
+        labels={'wall': 'Elapsed Time (s)',
+                'timestamp': 'Timestamp', 'name': 'Function'}
     )
     st.plotly_chart(fig)
+
+    name = st.selectbox("Samples of", summary.index, key='profile_name')
+    st.dataframe(PROFILER.samples(name).iloc[::-1], hide_index=True)
     st.caption(
         f"**Last updated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} (Update interval: {UPDATE_INTERVAL}s)")
 
+
 generate_chart()
 
-if 'new_log_data' in st.session_state:
-    with st.expander("Show latest data"):
-        st.dataframe(st.session_state.new_log_data)
 
-if st.button("Refresh"):
-    update_session_log_data(LOG_FILE_PATH)
\ No newline at end of file
+@st.fragment(run_every=UPDATE_INTERVAL)
+@profiled('debug.generate_footprint')
+def generate_footprint():
+    start_ingestion(DATA_DIRECTORY_PATH)
+    st.subheader("Table Memory")
+    footprint = get_table_footprint(DATA_DIRECTORY_PATH)
+    if footprint.empty:
+        st.info("Nothing loaded yet")
+        return
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Bytes per fuzzer", f"{footprint['total'].mean() / 1024 / 1024:,.2f} MB")
+    col2.metric("All fuzzers", f"{footprint['total'].sum() / 1024 / 1024:,.2f} MB",
+                help=f"{len(get_fuzzers(DATA_DIRECTORY_PATH))} fuzzers")
+    col3.metric("Compact dtypes", "on" if COMPACT_FRAMES else "off", help="Set COMPACT_FRAMES=0 to turn off")
+    st.dataframe(footprint / 1024, column_config={
+        column: st.column_config.NumberColumn(format='%.1f KB') for column in footprint.columns})
+
+
+generate_footprint()
+
+if PROFILE_LOG:
+    st.caption(f"Samples are also exported to {PROFILE_LOG}")
+
+if st.button("Reset"):
+    PROFILER.reset()
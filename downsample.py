@@ -0,0 +1,97 @@
+import numpy as np
+from typing import *
+
+# rows per bucket of each aggregation tier, finest first
+TIER_BUCKET_SIZES = [16, 256, 4096]
+
+
+def minmax_indices(y: np.ndarray, bucket_size: int, offset: int = 0) -> np.ndarray:
+    """
+    Selects the positions of the minimum and maximum of every bucket of y.
+
+    Keeping both extremes of each bucket preserves spikes and drops (e.g. in
+    execs_per_sec) that averaging or plain decimation would hide.
+
+    Args:
+        y (np.ndarray): Values to bucket. NaNs are ignored.
+        bucket_size (int): Values per bucket. The last bucket may be partial.
+        offset (int): Added to the returned positions.
+
+    Returns:
+        np.ndarray: Sorted, unique positions (at most two per bucket).
+    """
+    n = len(y)
+    if n == 0:
+        return np.empty(0, dtype=np.int64)
+    n_buckets = -(-n // bucket_size)
+    pad = n_buckets * bucket_size - n
+    y = np.asarray(y, dtype=float)
+    low = np.where(np.isnan(y), np.inf, y)
+    high = np.where(np.isnan(y), -np.inf, y)
+    if pad:
+        low = np.concatenate([low, np.full(pad, np.inf)])
+        high = np.concatenate([high, np.full(pad, -np.inf)])
+    argmin = low.reshape(n_buckets, bucket_size).argmin(axis=1)
+    argmax = high.reshape(n_buckets, bucket_size).argmax(axis=1)
+    starts = np.arange(n_buckets, dtype=np.int64) * bucket_size
+    indices = np.concatenate([starts + argmin, starts + argmax])
+    return np.unique(np.minimum(indices, n - 1)) + offset
+
+
+class MinMaxTiers:
+    """
+    Min/max aggregates of an append-only series at several bucket sizes.
+
+    Only complete buckets are stored, so update() costs O(new rows). select()
+    picks the finest tier that fits the point budget for the requested row range,
+    computing the trailing partial bucket on the fly.
+    """
+
+    def __init__(self, bucket_sizes: List[int] = TIER_BUCKET_SIZES):
+        self.bucket_sizes = bucket_sizes
+        self.rows = 0
+        self.last_x = None
+        self.tiers = {size: np.empty(0, dtype=np.int64)
+                      for size in bucket_sizes}
+
+    def update(self, x: np.ndarray, y: np.ndarray):
+        """
+        Extends the tiers with the rows of x/y not seen yet. Rebuilds them if the
+        series was replaced rather than appended to.
+        """
+        n = len(y)
+        if n < self.rows or (self.rows and x[self.rows - 1] != self.last_x):
+            self.__init__(self.bucket_sizes)
+        for size in self.bucket_sizes:
+            covered = (self.rows // size) * size
+            complete = (n // size) * size
+            if complete > covered:
+                self.tiers[size] = np.concatenate([
+                    self.tiers[size],
+                    minmax_indices(y[covered:complete], size, offset=covered)])
+        self.rows = n
+        self.last_x = x[n - 1] if n else None
+
+    def select(self, y: np.ndarray, start: int, stop: int, max_points: int) -> np.ndarray:
+        """
+        Returns at most about max_points sorted positions in [start, stop) that keep
+        the shape of y, or every position if the range already fits.
+        """
+        count = stop - start
+        if count <= max_points:
+            return np.arange(start, stop)
+        size = next((size for size in self.bucket_sizes if 2 * count / size <= max_points),
+                    self.bucket_sizes[-1])
+        tier = self.tiers[size]
+        covered = (self.rows // size) * size
+        selected = tier[np.searchsorted(tier, start):np.searchsorted(tier, stop)]
+        if stop > covered:
+            tail_start = max(start, covered)
+            selected = np.concatenate([selected, minmax_indices(
+                y[tail_start:stop], size, offset=tail_start)])
+        if len(selected) > max_points:
+            # range too long even for the coarsest tier, bucket the tier itself
+            bucket = -(-2 * len(selected) // max_points)
+            selected = selected[minmax_indices(y[selected], bucket)]
+        # keep both ends so lines span the whole range
+        return np.unique(np.concatenate([[start, stop - 1], selected]))
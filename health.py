@@ -0,0 +1,330 @@
+import threading
+import time
+import traceback
+from collections import deque
+from typing import *
+import numpy as np
+import pandas as pd
+import streamlit as st
+from utils import *
+from rolling_metrics import get_window_metrics
+
+# seconds between two checks for new fuzzer_stats or rolling metrics
+HEALTH_INTERVAL = 5
+# METRIC_WINDOWS window averaged by the execution speed rule
+SPEED_WINDOW = '1h'
+# state transitions kept for the alert history, oldest dropped first
+MAX_TRANSITIONS = 10000
+
+# fuzzer_stats columns read by the rules, NaN for stats an AFL++ version does not write
+HEALTH_STATS = ['cycles_done', 'cycles_wo_finds', 'pending_total', 'time_wo_finds', 'last_find',
+                'stability', 'var_byte_count']
+
+SEVERITY_ICONS = {
+    'info': ':material/info:',
+    'warning': ':material/warning:',
+    'error': ':material/error:',
+}
+
+
+class HealthRule:
+    """
+    Condition flagging unhealthy fuzzers, evaluated on every fuzzer at once.
+
+    Args:
+        name (str): Unique rule name, used as column and in the alert history.
+        severity (str): "info", "warning" or "error", the st function rendering the alert.
+        message (str): One-line alert text.
+        condition (Callable[[pd.DataFrame], pd.Series]): Maps the health frame (one row per
+            fuzzer, HEALTH_STATS plus the execs_per_sec_window mean) to a boolean Series.
+        details (str): Markdown explaining the alert and what to do about it.
+    """
+
+    def __init__(self, name: str, severity: str, message: str,
+                 condition: Callable[[pd.DataFrame], pd.Series], details: str):
+        self.name = name
+        self.severity = severity
+        self.message = message
+        self.condition = condition
+        self.details = details
+
+
+HEALTH_RULES = [
+    # If first cycle is not completed, info will be triggered.
+    # Reference: https://aflplus.plus/docs/afl-fuzz_approach/#overall-results
+    HealthRule(
+        'first_cycle', 'info', "Allow fuzzer to complete first cycle, sit back and relax",
+        lambda health: (health['cycles_done'] == 0) & (health['time_wo_finds'] < 15 * 60),
+        """
+        It is recommended to allow each fuzzing session to complete at least one full cycle before drawing any conclusions. Ideally, fuzzing should continue well beyond the initial cycle to maximize coverage and effectiveness. Please note that the first cycle may require a day or more to complete.
+
+        Reference: https://aflplus.plus/docs/afl-fuzz_approach/#overall-results
+        """),
+    # If no new paths are found in the first several minutes of starting, error will be triggered.
+    # Reference: https://aflplus.plus/docs/afl-fuzz_approach/#process-timing
+    HealthRule(
+        'no_finds', 'error',
+        "No new paths found within several minutes of starting. Check if the target binary is invoked correctly, memory limits, or input file validity.",
+        lambda health: health['last_find'].isna(),
+        """
+        If the fuzzer is not finding new paths within several minutes of starting, it is likely that the target binary is not being invoked correctly and does not process the input files as expected.
+
+        Other possible causes:
+        - The default memory limit (`-m`) is too restrictive, causing the program to exit early due to allocation failures.
+        - The input files are invalid and always fail basic checks.
+
+        **Recommended Actions:**
+        - Verify the command line, arguments, and input redirection (`@@` for input file).
+        - Increase or disable the memory limit if necessary.
+        - Manually run the target with input files to confirm correct behavior.
+
+        **Example Commands:**
+        - Run the target manually with a sample input:
+          ```
+          ./target_binary < input_file
+          ```
+        - Run with memory limit disabled:
+          ```
+          afl-fuzz -m none -i input_dir -o output_dir -- ./target_binary @@
+          ```
+        - Check input file validity:
+          ```
+          file input_file
+          hexdump -C input_file | head
+          ```
+
+        Reference: https://aflplus.plus/docs/afl-fuzz_approach/#process-timing
+        """),
+    # if no new paths are found after 2h and there are no pending testcases in queue, warning will be triggered
+    # Reference: https://aflplus.plus/docs/fuzzing_in_depth/#h-how-long-to-fuzz-a-target
+    HealthRule(
+        'stagnation', 'warning', "Fuzzer not seeing new action in awhile",
+        lambda health: (health['cycles_wo_finds'] > 1) & (health['pending_total'] == 0) &
+        (health['time_wo_finds'] > 120 * 60),
+        """
+        If no new paths are discovered for an extended period (e.g., a day or a week), it is likely that further fuzzing will yield diminishing returns.
+
+        **Recommended Actions:**
+        - Replace or rotate secondary fuzzers (e.g., try different custom mutator modules).
+        - Synchronize with other fuzzers that use different strategies or seeds.
+        - Review your fuzzing configuration and input corpus for diversity.
+
+        **Example Commands:**
+        - To sync with another fuzzer's output:
+          ```
+          afl-sync -i /path/to/other_fuzzer/out -o /path/to/your_fuzzer/out
+          ```
+        - To use a custom mutator:
+          ```
+          AFL_CUSTOM_MUTATOR_LIBRARY=/path/to/custom_mutator.so afl-fuzz -i input_dir -o output_dir -- ./target_binary @@
+          ```
+
+        Reference: https://aflplus.plus/docs/fuzzing_in_depth/#h-how-long-to-fuzz-a-target
+        """),
+    # if average execution speed in last hour is low, warning will be triggered
+    # Reference:
+    # https://aflplus.plus/docs/afl-fuzz_approach/#stage-progress
+    # https://aflplus.plus/docs/best_practices/#improving-speed
+    HealthRule(
+        'slow', 'warning', "Average execution speed in past hour is lower than ideal",
+        lambda health: health['execs_per_sec_window'] < 500,
+        """
+        Fuzzing speed should be ideally over 500 execs/sec most of the time and if it stays below 100, the job will probably take very long.
+
+        **Tips to improve execs/sec:**
+        - Use llvm_mode: `afl-clang-lto` (llvm >= 11) or `afl-clang-fast` (llvm >= 9 recommended).
+        - Enable persistent mode (can yield x2-x20 speed increase).
+        - Instrument only the code you care about (see `instrumentation/README.instrument_list.md`).
+        - If not using shmem persistent mode, set `AFL_TMPDIR` to a tempfs location for input files.
+        - Improve Linux kernel performance (see documentation for kernel flags; note this reduces system security).
+        - Use an ext2 filesystem with `noatime` for faster I/O.
+        - Utilize multiple CPU cores for fuzzing.
+
+        **Example Commands:**
+        - Build with llvm_mode:
+          ```
+          CC=afl-clang-fast CXX=afl-clang-fast++ ./configure && make
+          ```
+        - Enable persistent mode in your target:
+          ```
+          int main(int argc, char **argv) {
+              while (__AFL_LOOP(10000)) {
+                  // fuzzed code here
+              }
+          }
+          ```
+        - Set AFL_TMPDIR to tmpfs:
+          ```
+          export AFL_TMPDIR=/dev/shm
+          ```
+        - Run fuzzer with multiple cores:
+          ```
+          afl-fuzz -i input_dir -o output_dir -M fuzzer01 -- ./target_binary @@
+          afl-fuzz -i input_dir -o output_dir -S fuzzer02 -- ./target_binary @@
+          ```
+
+        Reference:
+        - https://aflplus.plus/docs/afl-fuzz_approach/#stage-progress
+        - https://aflplus.plus/docs/best_practices/#improving-speed
+        """),
+    # if program is unstable, trigger warning
+    # Reference: https://aflplus.plus/docs/afl-fuzz_approach/#path-geometry
+    HealthRule(
+        'unstable', 'warning',
+        "Low stability detected. This may indicate issues with target determinism or resource handling.",
+        lambda health: (health['stability'] < 85) & (health['var_byte_count'] > 40),
+        """
+        Most targets will show a 100% stability score. Lower figures can be caused by:
+
+        - **Uninitialized memory**: May indicate a security bug, though usually harmless for AFL.
+        - **Manipulation of persistent resources**: Leftover temp files or shared memory objects can cause instability. Ensure the program isn't exiting early due to resource exhaustion (disk space, SHM handles, etc).
+        - **Intentional randomness**: Some code (e.g., `select random();` in sqlite) is designed to behave randomly.
+        - **Multithreading**: Multiple threads running in semi-random order can reduce stability. If stability stays above 90%, it's usually fine. Otherwise, try:
+            - Use `afl-clang-fast` for instrumentation (thread-local tracking is less prone to concurrency issues).
+              ```
+              CC=afl-clang-fast CXX=afl-clang-fast++ ./configure && make
+              ```
+            - Compile or run the target without threads, if possible. Common options:
+              ```
+              ./configure --without-threads
+              ./configure --disable-pthreads
+              ./configure --disable-openmp
+              ```
+            - Replace pthreads with GNU Pth for deterministic scheduling:
+              https://www.gnu.org/software/pth/
+        - **Persistent mode**: Minor drops in stability can be normal, but major dips may mean code inside `__AFL_LOOP()` isn't properly cleaned up or reinitialized between iterations.
+
+        **Recommended Actions:**
+        - Check for uninitialized memory or resource leaks.
+        - Review multithreading usage and try to reduce thread count or use deterministic threading.
+        - Ensure proper cleanup and reinitialization in persistent mode.
+
+        Reference: https://aflplus.plus/docs/afl-fuzz_approach/#path-geometry
+        """),
+]
+
+RULES_BY_NAME = {rule.name: rule for rule in HEALTH_RULES}
+
+
+class HealthState:
+    """
+    Rule states of a campaign, kept between evaluations to detect transitions.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # store version of the evaluated fuzzer_stats and window_metrics tables
+        self.version = None
+        self.active = pd.DataFrame(columns=[rule.name for rule in HEALTH_RULES], dtype=bool)
+        # (fuzzer, rule) -> time the alert was raised
+        self.since = pd.Series(dtype='datetime64[ns]', index=pd.MultiIndex.from_tuples([], names=['fuzzer', 'rule']))
+        self.transitions = deque(maxlen=MAX_TRANSITIONS)
+
+
+def build_health_frame(directory_path: str, fuzzer_stats: pd.DataFrame) -> pd.DataFrame:
+    """
+    Returns the rule inputs of every fuzzer: HEALTH_STATS and the mean
+    execs_per_sec over the SPEED_WINDOW window of its rolling metrics.
+    """
+    health = fuzzer_stats.reindex(columns=HEALTH_STATS)
+    window_metrics = get_window_metrics(directory_path, SPEED_WINDOW)
+    health['execs_per_sec_window'] = window_metrics['execs_per_sec_mean'] \
+        if 'execs_per_sec_mean' in window_metrics else np.nan
+    return health
+
+
+def evaluate_rules(health: pd.DataFrame) -> pd.DataFrame:
+    """
+    Returns one boolean column per rule, indexed like health.
+    """
+    return pd.DataFrame({rule.name: rule.condition(health).fillna(False).astype(bool)
+                         for rule in HEALTH_RULES}, index=health.index)
+
+
+@profiled()
+def refresh_health(directory_path: str):
+    """
+    Re-evaluates every rule on every fuzzer if fuzzer_stats or any rolling metrics changed,
+    and publishes the campaign's active alerts (health_alerts) and the rule state
+    transitions seen so far (health_transitions) when a state changed.
+    """
+    store = get_data_store()
+    entry = store.entry(directory_path)
+    with entry.lock:
+        state = entry.cursors.setdefault('health', HealthState())
+    with state.lock:
+        fuzzer_names = get_fuzzers(directory_path)
+        version = store.published(directory_path, [(None, 'fuzzer_stats')] +
+                                  [(fuzzer_name, 'window_metrics') for fuzzer_name in fuzzer_names])[0]
+        fuzzer_stats = get_fuzzer_stats(directory_path)
+        if fuzzer_stats is None or version == state.version:
+            return
+        state.version = version
+
+        active = evaluate_rules(build_health_frame(directory_path, fuzzer_stats))
+        # alerts of removed fuzzers are cleared
+        index = active.index.union(state.active.index)
+        previous = state.active.reindex(index=index, fill_value=False).astype(bool)
+        active = active.reindex(index=index, fill_value=False)
+        changed = (active != previous).stack()
+        changed = changed[changed].index
+        state.active = active.loc[active.index.isin(fuzzer_stats.index)]
+        if len(changed) == 0 and 'health_alerts' in entry.tables:
+            return
+
+        timestamp = pd.Timestamp(time.time(), unit='s')
+        raised = active.stack()[changed]
+        for (fuzzer_name, rule_name), value in raised.items():
+            state.transitions.append((timestamp, fuzzer_name, rule_name, bool(value)))
+        state.since = pd.concat([
+            state.since.drop(raised.index[~raised.to_numpy()]),
+            pd.Series(timestamp, index=raised.index[raised.to_numpy()], dtype='datetime64[ns]'),
+        ])
+
+        alerts = state.since.rename('since').reset_index()
+        alerts.columns = ['fuzzer', 'rule', 'since']
+        order = alerts['rule'].map({rule.name: position for position, rule in enumerate(HEALTH_RULES)})
+        alerts = alerts.iloc[np.lexsort((alerts['fuzzer'], order))].reset_index(drop=True)
+        alerts.insert(2, 'severity', alerts['rule'].map(lambda name: RULES_BY_NAME[name].severity))
+        store.publish(entry, 'health_alerts', alerts)
+        store.publish(entry, 'health_transitions', pd.DataFrame(
+            list(state.transitions), columns=['time', 'fuzzer', 'rule', 'active']))
+
+
+def get_health_alerts(directory_path: str) -> Optional[pd.DataFrame]:
+    """
+    Returns the active alerts of a campaign (fuzzer, rule, severity, since), in
+    HEALTH_RULES order, or None before the first evaluation.
+    """
+    return get_data_store().get(directory_path, None, 'health_alerts')
+
+
+def get_health_transitions(directory_path: str) -> Optional[pd.DataFrame]:
+    """
+    Returns the rule state transitions (time, fuzzer, rule, active) seen since
+    the monitor started, oldest first.
+    """
+    return get_data_store().get(directory_path, None, 'health_transitions')
+
+
+def _run_monitor(directory_path: str):
+    while True:
+        time.sleep(HEALTH_INTERVAL)
+        try:
+            refresh_health(directory_path)
+        except Exception:
+            print(f"[!] Failed to evaluate health rules of {directory_path}")
+            traceback.print_exc()
+
+
+@st.cache_resource
+def start_health_monitor(directory_path: str) -> threading.Thread:
+    """
+    Starts (once per process) the thread re-evaluating a campaign's health rules
+    whenever its fuzzer_stats or rolling metrics change.
+    """
+    refresh_health(directory_path)
+    thread = threading.Thread(target=_run_monitor, args=(directory_path,),
+                              name=f"health:{directory_path}", daemon=True)
+    thread.start()
+    return thread
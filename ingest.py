@@ -0,0 +1,342 @@
+import multiprocessing
+import os
+import threading
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from typing import *
+import streamlit as st
+from watchdog.events import FileSystemEventHandler
+from watchdog.observers import Observer
+from watchdog.observers.polling import PollingObserver
+from utils import *
+from coverage_map import refresh_coverage_maps
+from bitmap_history import start_bitmap_history
+from health import start_health_monitor
+from crash_index import refresh_crash_index
+from corpus_analytics import refresh_corpus_files
+from rolling_metrics import refresh_rolling_metrics
+from campaign_timeline import refresh_campaign_timeline
+from mutation_index import refresh_mutation_index
+from lineage import refresh_lineage
+from snapshot_cache import MANIFEST_NAME, SnapshotCache, snapshots_writable
+
+# how long to keep collecting events after the first one before parsing
+COALESCE_SECONDS = 0.5
+# worker processes parsing the files of newly seen instances
+INGEST_WORKERS = min(8, os.cpu_count() or 1)
+
+
+def ingest_fuzzer_stats(directory_path: str, fuzzer_name: str):
+    refresh_fuzzer_stats(directory_path)
+    # start times may have changed, or become known
+    refresh_campaign_timeline(directory_path)
+
+
+def ingest_plot_data(directory_path: str, fuzzer_name: str):
+    refresh_plot_data(directory_path, fuzzer_name)
+    refresh_rolling_metrics(directory_path, fuzzer_name)
+    refresh_campaign_timeline(directory_path, [fuzzer_name])
+
+
+def ingest_queue_data(directory_path: str, fuzzer_name: str):
+    refresh_queue_data(directory_path, fuzzer_name)
+    refresh_rolling_metrics(directory_path, fuzzer_name)
+    refresh_lineage(directory_path, fuzzer_name)
+
+
+def ingest_introspection(directory_path: str, fuzzer_name: str):
+    refresh_introspection(directory_path, fuzzer_name)
+    refresh_mutation_index(directory_path, fuzzer_name)
+
+
+def ingest_fuzz_bitmap(directory_path: str, fuzzer_name: str):
+    refresh_coverage_maps(directory_path)
+
+
+def ingest_crash_index(directory_path: str, fuzzer_name: str):
+    refresh_crash_index(directory_path)
+
+
+def ingest_corpus_files(directory_path: str, fuzzer_name: str):
+    refresh_corpus_files(directory_path)
+    # drops the lineage of removed instances
+    refresh_lineage(directory_path)
+
+
+# artifact name (file or directory directly under a fuzzer directory) -> parser
+INGESTERS: Dict[str, Callable[[str, str], None]] = {
+    'fuzzer_stats': ingest_fuzzer_stats,
+    'plot_data': ingest_plot_data,
+    'queue_data': ingest_queue_data,
+    'introspection.txt': ingest_introspection,
+    'plot_det_data': refresh_plot_det_data,
+    'fuzz_bitmap': ingest_fuzz_bitmap,
+    'crashes': ingest_crash_index,
+    'hangs': ingest_crash_index,
+    'queue': ingest_corpus_files,
+}
+
+# artifacts whose ingester refreshes every fuzzer at once, run once per batch
+CAMPAIGN_ARTIFACTS = {'fuzzer_stats', 'fuzz_bitmap', 'crashes', 'hangs', 'queue'}
+
+# artifacts that publish new data when changed, even if nothing parses them yet
+WATCHED_ARTIFACTS = {'fuzzer_stats', 'plot_data', 'queue_data', 'plot_det_data', 'fuzz_bitmap',
+                     'introspection.txt', 'queue', 'crashes', 'hangs'}
+
+
+def register_ingester(artifact: str, ingester: Callable[[str, str], None]):
+    """
+    Registers the parser run when an artifact of any fuzzer changes.
+
+    Args:
+        artifact (str): File or directory name under the fuzzer directory, e.g. "introspection.txt".
+        ingester (Callable[[str, str], None]): Called with (directory_path, fuzzer_name).
+    """
+    WATCHED_ARTIFACTS.add(artifact)
+    INGESTERS[artifact] = ingester
+
+
+def prefetch_snapshots(directory_path: str, fuzzer_names: List[str]):
+    """
+    Runs in a worker process: parses the tailed files of some instances and
+    flushes their snapshot caches.
+    """
+    for fuzzer_name in fuzzer_names:
+        for source in SNAPSHOT_SOURCES:
+            if os.path.exists(os.path.join(directory_path, fuzzer_name, source)):
+                INGESTERS[source](directory_path, fuzzer_name)
+        flush_snapshots(directory_path, fuzzer_name)
+
+
+class _EventHandler(FileSystemEventHandler):
+    def __init__(self, service: 'IngestionService'):
+        self.service = service
+
+    def on_any_event(self, event):
+        if event.event_type not in ('created', 'modified', 'moved', 'closed', 'deleted'):
+            return
+        if event.event_type == 'moved':
+            self.service.notify(event.src_path, 'deleted', event.is_directory)
+        # AFL++ rewrites fuzzer_stats through a temporary file and rename
+        path = getattr(event, 'dest_path', '') or event.src_path
+        self.service.notify(path, event.event_type, event.is_directory)
+
+
+class IngestionService:
+    """
+    Watches a campaign directory and parses changed artifacts on a background thread.
+
+    The first full pass runs on that thread too, so pages render whatever is
+    already published (nothing, or tables restored from snapshots) meanwhile.
+    Events are coalesced for COALESCE_SECONDS, so a burst of writes to the same
+    file results in a single parse. Parsed data is published to the shared
+    DataStore, so page fragments only read already-parsed tables.
+    """
+
+    def __init__(self, directory_path: str):
+        self.directory_path = directory_path
+        self._pending: Set[Tuple[str, str]] = set()
+        # fuzzer directories to rescan for the registry
+        self._discover: Set[str] = set()
+        self._pending_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        # set once the first full pass is done
+        self.ready = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name=f"ingest:{directory_path}", daemon=True)
+        self._observer = None
+
+    def start(self):
+        # only the registry is built here, the first parse runs on the service thread
+        # so pages render the empty (or restored) state meanwhile
+        refresh_fuzzer_registry(self.directory_path)
+        handler = _EventHandler(self)
+        try:
+            self._observer = Observer()
+            self._observer.schedule(
+                handler, self.directory_path, recursive=True)
+            self._observer.start()
+        except OSError:
+            # e.g. inotify watch limit reached
+            print(f"[!] Falling back to polling for {self.directory_path}")
+            self._observer = PollingObserver()
+            self._observer.schedule(
+                handler, self.directory_path, recursive=True)
+            self._observer.start()
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._wakeup.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+
+    def notify(self, path: str, event_type: str = 'modified', is_directory: bool = False):
+        relative_path = os.path.relpath(path, self.directory_path)
+        parts = relative_path.split(os.sep)
+        if parts[0].startswith('.'):
+            return
+        fuzzers = get_data_store().get(self.directory_path, None, 'fuzzers') or {}
+        nodes = {fuzzer_node(fuzzer_name) for fuzzer_name in fuzzers}
+        depth = 2 if parts[0] in nodes else 1
+        fuzzer_name = '/'.join(parts[:depth])
+        if fuzzer_name not in fuzzers or len(parts) == depth:
+            # an instance or node directory appearing, disappearing or being filled in
+            if event_type != 'modified' and len(parts) <= depth + 1:
+                with self._pending_lock:
+                    self._discover.add(fuzzer_name if fuzzer_name in fuzzers else parts[0])
+                self._wakeup.set()
+            return
+        artifact = parts[depth]
+        if artifact not in WATCHED_ARTIFACTS:
+            return
+        # rescan the instance only when an entry directly under it appeared or disappeared
+        discover = len(parts) == depth + 1 and (
+            event_type == 'deleted' or artifact not in fuzzers[fuzzer_name])
+        with self._pending_lock:
+            self._pending.add((fuzzer_name, artifact))
+            if discover:
+                self._discover.add(fuzzer_name)
+        self._wakeup.set()
+
+    def ingest_all(self):
+        refresh_fuzzer_registry(self.directory_path)
+        fuzzers = get_data_store().get(self.directory_path, None, 'fuzzers')
+        self._prefetch(list(fuzzers))
+        pending = {(fuzzer_name, artifact) for fuzzer_name, artifacts in fuzzers.items()
+                   for artifact in INGESTERS if artifact in artifacts}
+        self._ingest_batch(pending)
+
+    def _prefetch(self, fuzzer_names: List[str]):
+        """
+        Parses the tailed files of several instances in worker processes, one task
+        per node, so a cold start or a newly added node does not parse every
+        instance one after the other on this thread. Workers hand their tables back
+        through the snapshot caches, which the following ingestion restores.
+        """
+        if INGEST_WORKERS < 2 or not self._snapshots_usable():
+            return
+        # instances with snapshots are restored quickly enough in-process
+        fuzzer_names = [fuzzer_name for fuzzer_name in fuzzer_names if any(
+            os.path.exists(os.path.join(self.directory_path, fuzzer_name, source)) and
+            not os.path.exists(os.path.join(snapshot_path(self.directory_path, fuzzer_name, source), MANIFEST_NAME))
+            for source in SNAPSHOT_SOURCES)]
+        nodes = {}
+        for fuzzer_name in fuzzer_names:
+            nodes.setdefault(fuzzer_node(fuzzer_name), []).append(fuzzer_name)
+        tasks = list(nodes.values())
+        if len(tasks) < INGEST_WORKERS:
+            # too few nodes to keep the workers busy, split them by instance
+            tasks = [[fuzzer_name] for fuzzer_name in fuzzer_names]
+        if len(tasks) < 2:
+            return
+        with profile_span('prefetch') as span:
+            span.rows = len(fuzzer_names)
+            self._run_prefetch(tasks)
+
+    def _snapshots_usable(self) -> bool:
+        """
+        Returns whether workers could hand tables back, that is whether the snapshot
+        directory is writable and no snapshot cache of this process disabled itself.
+        """
+        if not snapshots_writable(self.directory_path):
+            return False
+        store = get_data_store()
+        return not any(isinstance(cursor, SnapshotCache) and cursor.disabled
+                       for fuzzer_name in get_fuzzers(self.directory_path)
+                       for cursor in list(store.entry(self.directory_path, fuzzer_name).cursors.values()))
+
+    def _run_prefetch(self, tasks: List[List[str]]):
+        try:
+            # spawn rather than fork, this process runs threads
+            with ProcessPoolExecutor(max_workers=min(INGEST_WORKERS, len(tasks)),
+                                     mp_context=multiprocessing.get_context('spawn')) as executor:
+                list(executor.map(prefetch_snapshots, [self.directory_path] * len(tasks), tasks))
+        except Exception:
+            # the ingestion that follows parses whatever is missing in-process
+            print(f"[!] Parallel ingestion of {self.directory_path} failed")
+            traceback.print_exc()
+
+    def _ingest_batch(self, pending: Set[Tuple[str, str]]):
+        if not pending:
+            return
+        with profile_span('ingest') as span:
+            span.rows = len(pending)
+            # by ingester, crashes and hangs share one
+            seen_campaign_ingesters = set()
+            for fuzzer_name, artifact in sorted(pending):
+                if artifact in CAMPAIGN_ARTIFACTS:
+                    if INGESTERS.get(artifact) in seen_campaign_ingesters:
+                        continue
+                    seen_campaign_ingesters.add(INGESTERS.get(artifact))
+                self._ingest(fuzzer_name, artifact)
+
+    def _ingest(self, fuzzer_name: str, artifact: str):
+        ingester = INGESTERS.get(artifact)
+        if ingester is None:
+            return
+        # campaign-wide ingesters also drop the data of removed instances
+        if artifact not in CAMPAIGN_ARTIFACTS and \
+                not os.path.exists(os.path.join(self.directory_path, fuzzer_name, artifact)):
+            return
+        try:
+            ingester(self.directory_path, fuzzer_name)
+        except Exception:
+            # keep the service alive, the next event retries
+            print(f"[!] Failed to ingest {fuzzer_name}/{artifact}")
+            traceback.print_exc()
+
+    def _run(self):
+        try:
+            self.ingest_all()
+        except Exception:
+            # events retry whatever the first pass missed
+            print(f"[!] Failed to ingest {self.directory_path}")
+            traceback.print_exc()
+        self.ready.set()
+        while not self._stopped.is_set():
+            self._wakeup.wait()
+            # let bursts of events settle before parsing
+            time.sleep(COALESCE_SECONDS)
+            self._wakeup.clear()
+            with self._pending_lock:
+                pending, self._pending = self._pending, set()
+                discover, self._discover = self._discover, set()
+            if discover:
+                known = set(get_fuzzers(self.directory_path))
+                try:
+                    refresh_fuzzer_registry(self.directory_path, discover)
+                except OSError:
+                    print(f"[!] Failed to rescan {', '.join(sorted(discover))}")
+                    traceback.print_exc()
+                # new instances are ingested from scratch, removed ones refresh campaign tables
+                fuzzer_names = set(get_fuzzers(self.directory_path))
+                added = sorted(fuzzer_names - known)
+                self._prefetch(added)
+                pending.update((fuzzer_name, artifact) for fuzzer_name in added
+                               for artifact in INGESTERS)
+                if known - fuzzer_names:
+                    pending.update((fuzzer_name, artifact) for fuzzer_name in known - fuzzer_names
+                                   for artifact in CAMPAIGN_ARTIFACTS)
+            self._ingest_batch(pending)
+
+
+@st.cache_resource
+def start_ingestion(directory_path: str) -> IngestionService:
+    """
+    Starts (once per process) the background ingestion service of a campaign directory.
+
+    Args:
+        directory_path (str): Campaign output directory, e.g. "out".
+
+    Returns:
+        IngestionService: The running service.
+    """
+    service = IngestionService(directory_path)
+    service.start()
+    start_bitmap_history(directory_path)
+    start_health_monitor(directory_path)
+    return service
@@ -0,0 +1,319 @@
+import threading
+from typing import *
+import numpy as np
+import pandas as pd
+from utils import *
+from rolling_metrics import AppendBuffer
+
+
+def sync_source(fuzzer_name: str, sync_name: str, fuzzer_names: Collection[str]) -> str:
+    """
+    Returns the fuzzer a sync:<sync_name> import of fuzzer_name was copied from.
+    """
+    # afl-fuzz names imports after the instance directory, which shares the importer's node
+    node = fuzzer_node(fuzzer_name)
+    candidates = [f"{node}/{sync_name}" if node else sync_name, sync_name]
+    return next((name for name in candidates if name in fuzzer_names), candidates[0])
+
+
+class LineageFuzzer:
+    """
+    Part of a fuzzer's corpus table already added to the Lineage.
+    """
+
+    def __init__(self, code: int):
+        self.code = code
+        self.rows = 0
+        self.max_id = -1
+        # queue id -> node, -1 where unknown
+        self.by_id = np.full(0, -1, dtype=np.int64)
+
+
+class Lineage:
+    """
+    Lineage graph of the queue entries of every fuzzer of a campaign.
+
+    Every entry is a node, numbered in the order entries are added, pointing to its
+    parent: the src: entry it was mutated from (the first one for a splice, the
+    second being kept as splice_parent), or for a sync: import the entry of the
+    other fuzzer it copies, so following parents leads back to an orig: seed.
+    Children are kept as linked lists (first_child, next_sibling), and every node
+    counts the entries of its subtree and those with new coverage, which adding
+    entries updates along their ancestor chains, level by level for a whole batch.
+
+    Entries whose parent is not added yet (e.g. imported before the other
+    fuzzer's corpus was read) wait in pending until it is.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.version = 0
+        self.fuzzers: Dict[str, LineageFuzzer] = {}
+        self.fuzzer_names: List[str] = []
+        self.ops: Dict[str, int] = {}
+        self.fuzzer_codes = AppendBuffer(dtype=np.int32)
+        self.ids = AppendBuffer(dtype=np.int64)
+        self.op_codes = AppendBuffer(dtype=np.int32)
+        self.seed = AppendBuffer(dtype=bool)
+        self.cov = AppendBuffer(dtype=bool)
+        self.parents = AppendBuffer(dtype=np.int64)
+        self.splice_parents = AppendBuffer(dtype=np.int64)
+        self.first_child = AppendBuffer(dtype=np.int64)
+        self.next_sibling = AppendBuffer(dtype=np.int64)
+        self.descendants = AppendBuffer(dtype=np.int64)
+        self.cov_descendants = AppendBuffer(dtype=np.int64)
+        # (fuzzer name, queue id) of a missing parent -> [(node, whether it is the splice parent)]
+        self.pending: Dict[Tuple[str, int], List[Tuple[int, bool]]] = {}
+
+    def node(self, fuzzer_name: str, queue_id: int) -> int:
+        """
+        Returns the node of a fuzzer's queue entry, -1 if unknown.
+        """
+        fuzzer = self.fuzzers.get(fuzzer_name)
+        if fuzzer is None or not 0 <= queue_id < len(fuzzer.by_id):
+            return -1
+        return int(fuzzer.by_id[queue_id])
+
+    def _nodes(self, fuzzer_name: str, queue_ids: np.ndarray) -> np.ndarray:
+        nodes = np.full(len(queue_ids), -1, dtype=np.int64)
+        fuzzer = self.fuzzers.get(fuzzer_name)
+        if fuzzer is not None:
+            known = (queue_ids >= 0) & (queue_ids < len(fuzzer.by_id))
+            nodes[known] = fuzzer.by_id[queue_ids[known]]
+        return nodes
+
+    def _link(self, child: int, parent: int):
+        self.parents.data[child] = parent
+        self.next_sibling.data[child] = self.first_child.data[parent]
+        self.first_child.data[parent] = child
+
+    def _propagate(self, nodes: np.ndarray, counts: np.ndarray, covs: np.ndarray):
+        """
+        Adds counts and covs to the subtree totals of the given nodes and all their ancestors.
+        """
+        # a node can not be its own ancestor, so no chain is longer than the graph
+        for _ in range(self.ids.size):
+            if not len(nodes):
+                break
+            np.add.at(self.descendants.data, nodes, counts)
+            np.add.at(self.cov_descendants.data, nodes, covs)
+            nodes = self.parents.data[nodes]
+            known = nodes >= 0
+            nodes, counts, covs = nodes[known], counts[known], covs[known]
+
+    def update(self, fuzzer_name: str, corpus: pd.DataFrame, fuzzer_names: Collection[str]) -> bool:
+        """
+        Adds the entries of a fuzzer's corpus table not added yet.
+
+        Returns:
+            bool: False if the corpus was replaced and the lineage must be rebuilt.
+        """
+        fuzzer = self.fuzzers.get(fuzzer_name)
+        if fuzzer is None:
+            fuzzer = self.fuzzers[fuzzer_name] = LineageFuzzer(len(self.fuzzer_names))
+            self.fuzzer_names.append(fuzzer_name)
+        if len(corpus) < fuzzer.rows or (fuzzer.rows and corpus.index[fuzzer.rows - 1] != fuzzer.max_id):
+            return False
+        if len(corpus) == fuzzer.rows:
+            return True
+        new = corpus.iloc[fuzzer.rows:]
+        ids = new.index.to_numpy(dtype=np.int64)
+        count = len(new)
+        first = self.ids.size
+        nodes = np.arange(first, first + count)
+        # imports have no op, told apart as sync like in the mutation index
+        ops = new['op'].astype(object).where(new['sync'].isna(), 'sync').fillna('')
+        unique_ops = ops.unique()
+        op_codes = np.array([self.ops.setdefault(op, len(self.ops)) for op in unique_ops])
+        self.fuzzer_codes.extend(np.full(count, fuzzer.code))
+        self.ids.extend(ids)
+        self.op_codes.extend(op_codes[pd.Index(unique_ops).get_indexer(ops)])
+        self.seed.extend(new['orig'].notna().to_numpy())
+        self.cov.extend(new['cov'].to_numpy(dtype=bool))
+        for buffer in (self.parents, self.splice_parents, self.first_child, self.next_sibling):
+            buffer.extend(np.full(count, -1))
+        for buffer in (self.descendants, self.cov_descendants):
+            buffer.extend(np.zeros(count, dtype=np.int64))
+
+        size = ids.max() + 1
+        if size > len(fuzzer.by_id):
+            by_id = np.full(max(size, 2 * len(fuzzer.by_id)), -1, dtype=np.int64)
+            by_id[:len(fuzzer.by_id)] = fuzzer.by_id
+            fuzzer.by_id = by_id
+        fuzzer.by_id[ids] = nodes
+        fuzzer.rows = len(corpus)
+        fuzzer.max_id = int(ids[-1])
+
+        # (child, parent fuzzer, parent id, splice) references of the new entries
+        sources = new['src'].to_numpy(dtype=np.float64, na_value=np.nan)
+        splices = new['src_splice'].to_numpy(dtype=np.float64, na_value=np.nan)
+        syncs = new['sync'].astype(object)
+        references = []
+        for sync_name, positions in syncs.groupby(syncs.fillna(''), sort=False).indices.items():
+            source = sync_source(fuzzer_name, sync_name, fuzzer_names) if sync_name else fuzzer_name
+            for values, splice in ((sources, False), (splices, True)):
+                valid = positions[~np.isnan(values[positions])]
+                references.append((nodes[valid], source, values[valid].astype(np.int64), splice))
+        # children waiting for the new entries come after them, keeping both in order
+        for queue_id in ids if self.pending else ():
+            for child, splice in self.pending.pop((fuzzer_name, int(queue_id)), ()):
+                references.append((np.array([child]), fuzzer_name, np.array([queue_id]), splice))
+
+        linked, linked_parents = [], []
+        for children, source, parent_ids, splice in references:
+            parents = self._nodes(source, parent_ids)
+            for child, parent, parent_id in zip(children, parents, parent_ids):
+                if parent < 0:
+                    self.pending.setdefault((source, int(parent_id)), []).append((int(child), splice))
+                elif splice:
+                    self.splice_parents.data[child] = parent
+                else:
+                    self._link(child, parent)
+                    linked.append(child)
+                    linked_parents.append(parent)
+        # a newly linked child brings its whole subtree to its new ancestors
+        linked = np.array(linked, dtype=np.int64)
+        self._propagate(np.array(linked_parents, dtype=np.int64),
+                        self.descendants.data[linked] + 1,
+                        self.cov_descendants.data[linked] + self.cov.data[linked])
+        self.version += 1
+        return True
+
+    def describe(self, nodes: np.ndarray) -> pd.DataFrame:
+        """
+        Returns the fuzzer, queue id, op, seed and +cov flags and subtree totals of nodes.
+        """
+        nodes = np.asarray(nodes, dtype=np.int64)
+        splice_parents = self.splice_parents.data[nodes]
+        return pd.DataFrame({
+            'fuzzer': np.array(self.fuzzer_names, dtype=object)[self.fuzzer_codes.data[nodes]],
+            'id': self.ids.data[nodes],
+            'op': np.array(list(self.ops), dtype=object)[self.op_codes.data[nodes]]
+            if len(nodes) else np.empty(0, dtype=object),
+            'seed': self.seed.data[nodes],
+            'cov': self.cov.data[nodes],
+            'splice_parent': [None if parent < 0 else
+                              f"{self.fuzzer_names[self.fuzzer_codes.data[parent]]}:{self.ids.data[parent]}"
+                              for parent in splice_parents],
+            'descendants': self.descendants.data[nodes],
+            'cov_descendants': self.cov_descendants.data[nodes],
+        })
+
+    def ancestors(self, node: int) -> List[int]:
+        """
+        Returns a node followed by its parent, grandparent... up to its seed, in O(depth).
+        """
+        chain = []
+        while node >= 0 and len(chain) <= self.ids.size:
+            chain.append(node)
+            node = int(self.parents.data[node])
+        return chain
+
+    def subtree(self, node: int, limit: Optional[int] = None) -> Tuple[List[int], List[int]]:
+        """
+        Returns a node and its descendants depth first, with their depth below it, in
+        O(subtree), stopping after limit nodes.
+        """
+        nodes, depths = [], []
+        stack = [(node, 0)]
+        first_child, next_sibling = self.first_child.data, self.next_sibling.data
+        while stack and (limit is None or len(nodes) < limit):
+            node, depth = stack.pop()
+            nodes.append(node)
+            depths.append(depth)
+            child = first_child[node]
+            while child >= 0:
+                stack.append((int(child), depth + 1))
+                child = next_sibling[child]
+        return nodes, depths
+
+    def seeds(self) -> pd.DataFrame:
+        """
+        Returns the orig: seeds of every fuzzer with the size and +cov yield of their subtree.
+        """
+        df = self.describe(np.flatnonzero(self.seed.view()))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            df['cov_yield'] = df['cov_descendants'] / df['descendants']
+        return df.drop(columns=['seed', 'splice_parent'])
+
+
+def get_lineage(directory_path: str) -> Lineage:
+    entry = get_data_store().entry(directory_path)
+    with entry.lock:
+        return entry.cursors.setdefault('lineage', Lineage())
+
+
+@profiled()
+def refresh_lineage(directory_path: str, fuzzer_name: Optional[str] = None):
+    """
+    Adds a fuzzer's new corpus entries to the campaign's Lineage (with no fuzzer_name,
+    only drops removed fuzzers), rebuilding it from every fuzzer's corpus when one
+    was replaced or removed.
+    """
+    fuzzer_names = get_fuzzers(directory_path)
+    lineage = get_lineage(directory_path)
+    with lineage.lock:
+        rebuild = not set(lineage.fuzzers) <= set(fuzzer_names)
+        corpus = None if fuzzer_name is None else get_table(directory_path, fuzzer_name, 'corpus')
+        if not rebuild and corpus is not None:
+            rebuild = not lineage.update(fuzzer_name, corpus, fuzzer_names)
+        if not rebuild:
+            return
+        rebuilt = Lineage()
+        rebuilt.version = lineage.version + 1
+        for name in fuzzer_names:
+            corpus = get_table(directory_path, name, 'corpus')
+            if corpus is not None:
+                rebuilt.update(name, corpus, fuzzer_names)
+    entry = get_data_store().entry(directory_path)
+    with entry.lock:
+        entry.cursors['lineage'] = rebuilt
+
+
+def get_ancestry(directory_path: str, fuzzer_name: str, queue_id: int) -> Optional[pd.DataFrame]:
+    """
+    Returns the chain of entries a queue entry derives from, itself first and its
+    seed last (see Lineage.describe for the columns), or None if unknown.
+    """
+    lineage = get_lineage(directory_path)
+    with lineage.lock:
+        node = lineage.node(fuzzer_name, queue_id)
+        if node < 0:
+            return None
+        return lineage.describe(lineage.ancestors(node))
+
+
+def get_descendants(directory_path: str, fuzzer_name: str, queue_id: int,
+                    limit: Optional[int] = None) -> Optional[pd.DataFrame]:
+    """
+    Returns a queue entry and the entries derived from it, depth first with their
+    depth below it (see Lineage.describe for the other columns), or None if unknown.
+    """
+    lineage = get_lineage(directory_path)
+    with lineage.lock:
+        node = lineage.node(fuzzer_name, queue_id)
+        if node < 0:
+            return None
+        nodes, depths = lineage.subtree(node, limit)
+        df = lineage.describe(nodes)
+    df.insert(0, 'depth', depths)
+    return df
+
+
+def get_seed_lineage(directory_path: str) -> pd.DataFrame:
+    """
+    Returns every seed's descendants and +cov yield (see Lineage.seeds), published as
+    the campaign's lineage_seeds table when first read after a change.
+    """
+    store = get_data_store()
+    entry = store.entry(directory_path)
+    lineage = get_lineage(directory_path)
+    with lineage.lock:
+        version = lineage.version
+        if entry.cursors.get('lineage_seeds_version') == version and 'lineage_seeds' in entry.tables:
+            return entry.tables['lineage_seeds']
+        seeds = lineage.seeds()
+    with entry.lock:
+        store.publish(entry, 'lineage_seeds', seeds)
+        entry.cursors['lineage_seeds_version'] = version
+    return seeds
@@ -1,48 +1,53 @@
 import streamlit as st
 from datetime import datetime
 import pandas as pd
+from utils import *
+from ingest import start_ingestion
+from mutation_index import search_mutations, get_mutation_record, PAGE_SIZE, QUERY_HELP
+from lineage import get_ancestry, get_descendants
+from testcase_viewer import render_testcase, testcase_path
 
 st.set_page_config(layout='wide')
 
 UPDATE_INTERVAL = 60
+# descendants listed for the selected entry
+DESCENDANTS_SHOWN = 1000
+DATA_DIRECTORY_PATH = 'sample-data'
+# DATA_DIRECTORY_PATH = 'out'
 
-rows = []
-with open('sample-data/main/introspection.txt') as f:
-    for line in f:
-        line = line.strip()
-        if not line.startswith("QUEUE "):
-            continue
-        # Remove "QUEUE " prefix
-        line = line[len("QUEUE "):]
-        # print('line:', line)
-        # Split at the first '='
-        if '=' in line:
-            left, right = line.split('=', 1)
-            left = left.strip()
-            right = right.strip()
-            # print('left:', left)
-            # print('right:', right)
-            # Split left at the first space to get mutation history
-            if ' ' in left:
-                orig_info, mutation = left.split(' ', 1)
-            else:
-                orig_info, mutation = left, ''
-            # print('orig info:', orig_info)
-            # print('mutation:', mutation)
-            rows.append({
-                'original': orig_info,
-                'mutation': mutation,
-                'result': right
-            })
-
-df = pd.DataFrame(rows)
-
-selected_result = st.selectbox(
-    "Select resulting file to view mutation history:",
-    df['result']
-)
-
-selected_row = df[df['result'] == selected_result].iloc[0]
+
+def reset_page():
+    st.session_state['mutation_history_page'] = 1
+
+
+start_ingestion(DATA_DIRECTORY_PATH)
+
+query = st.text_input("Search mutation history:", key='mutation_history_query', on_change=reset_page,
+                      placeholder="e.g. fuzzer:main op:havoc splice", help=QUERY_HELP)
+
+# only one page of records is read and sent to the browser
+page = st.session_state.get('mutation_history_page', 1)
+total, results = search_mutations(DATA_DIRECTORY_PATH, query, page - 1)
+pages = max(1, -(-total // PAGE_SIZE))
+if page > pages:
+    page = st.session_state['mutation_history_page'] = pages
+    total, results = search_mutations(DATA_DIRECTORY_PATH, query, page - 1)
+
+col1, col2 = st.columns([1, 4], vertical_alignment='bottom')
+col1.number_input("Page", min_value=1, max_value=pages, key='mutation_history_page')
+col2.caption(f"{total:,} records, page {page} of {pages:,}")
+
+selection = st.dataframe(results, hide_index=True, on_select='rerun', selection_mode='single-row',
+                         key='mutation_history_results')
+
+selected_rows = selection.selection.rows
+if results.empty:
+    st.stop()
+selected = results.iloc[selected_rows[0] if selected_rows and selected_rows[0] < len(results) else 0]
+selected_row = get_mutation_record(
+    DATA_DIRECTORY_PATH, selected['fuzzer'], int(selected['id']))
+if selected_row is None:
+    st.stop()
 
 st.divider()
 
@@ -53,9 +58,26 @@ st.subheader('Resulting Seed')
 st.code(selected_row['result'], language=None)
 
 st.subheader('Mutation History')
-print(selected_row['mutation'])
 st.json(selected_row['mutation'].split())
 
+st.subheader('Resulting Bytes')
+render_testcase(DATA_DIRECTORY_PATH, selected['fuzzer'], testcase_path(
+    DATA_DIRECTORY_PATH, selected['fuzzer'], selected_row['result']), key='mutation_history_testcase')
+
+ancestry = get_ancestry(DATA_DIRECTORY_PATH, selected['fuzzer'], int(selected['id']))
+if ancestry is not None:
+    st.subheader('Lineage')
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Depth", len(ancestry) - 1, help="Entries between this one and its seed")
+    col2.metric("Descendants", f"{ancestry['descendants'].iat[0]:,}")
+    col3.metric("+cov descendants", f"{ancestry['cov_descendants'].iat[0]:,}")
+    st.caption("Ancestry, back to the seed")
+    st.dataframe(ancestry, hide_index=True)
+    with st.expander("Descendants"):
+        descendants = get_descendants(DATA_DIRECTORY_PATH, selected['fuzzer'], int(selected['id']),
+                                      DESCENDANTS_SHOWN + 1)
+        st.dataframe(descendants.iloc[1:], hide_index=True)
+
 
 st.caption(
-    f"**Last updated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} (Update interval: {UPDATE_INTERVAL}s)")
\ No newline at end of file
+    f"**Last updated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} (Update interval: {UPDATE_INTERVAL}s)")
@@ -0,0 +1,264 @@
+import re
+import threading
+from typing import *
+import numpy as np
+import pandas as pd
+from utils import *
+from rolling_metrics import AppendBuffer
+
+# rows of search results returned per page
+PAGE_SIZE = 50
+# a postings list is concatenated once it was extended this many times
+MAX_POSTING_CHUNKS = 32
+# arguments of a mutation token: offsets, lengths and values, and spliced-in paths
+TOKEN_ARGUMENTS = re.compile(r'_*(?:[-_]\d|_/).*$|_+$')
+# queue id and op (sync for entries imported from another fuzzer) of the entry a
+# record produced, from its file name
+RESULT_FIELDS = re.compile(r'(?:^|/)id:(\d+)(?:[^/]*,(?:op:([^,/]+)|(sync):))?[^/]*$')
+QUERY_FIELDS = {'fuzzer', 'id', 'op'}
+QUERY_HELP = """
+Space separated terms, all of which must match:
+- `fuzzer:<prefix>` - fuzzer name starting with prefix, e.g. `fuzzer:main`
+- `op:<prefix>` - stage that saved the entry, e.g. `op:havoc`, `op:flip`, `op:sync`
+- `id:<number>` or `<number>` - queue id of the resulting entry
+- any other text - a mutation applied, matched as a case-insensitive substring, e.g. `splice` or `ARITH8+`
+"""
+
+
+def mutation_names(mutations: pd.Series) -> pd.Series:
+    """
+    Splits the mutation column of introspection_queue records into mutation names,
+    dropping their arguments (FLIP_BIT1-74 -> FLIP_BIT1, SPLICE-OVERWRITE_11_3582_13_/path ->
+    SPLICE-OVERWRITE).
+
+    Returns:
+        pd.Series: Names, indexed by the position of their record in mutations.
+    """
+    tokens = mutations.reset_index(drop=True).str.split().explode().dropna()
+    # most tokens repeat, normalize each distinct one once
+    codes, uniques = pd.factorize(tokens)
+    names = pd.Index(uniques).str.replace(TOKEN_ARGUMENTS, '', regex=True)
+    return pd.Series(np.asarray(names, dtype=object)[codes], index=tokens.index)
+
+
+class FuzzerRecords:
+    """
+    Part of a fuzzer's introspection_queue table already added to the MutationIndex.
+    """
+
+    def __init__(self, code: int):
+        self.code = code
+        self.rows = 0
+        self.last_result = None
+        # queue id -> record number, -1 where unknown
+        self.by_id = np.full(0, -1, dtype=np.int64)
+
+
+class MutationIndex:
+    """
+    Search index over the QUEUE introspection records of every fuzzer of a campaign.
+
+    Records are numbered in the order they are added, and described by column
+    arrays (fuzzer, row of its introspection_queue table, queue id and op of the
+    resulting entry) and by postings lists of the record numbers holding each
+    mutation name. Records of a fuzzer whose introspection.txt was replaced are
+    marked dead rather than removed. New rows are added as they are ingested, so
+    a query only scans the short name vocabularies and the column arrays, never
+    the records' strings.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.fuzzers: Dict[str, FuzzerRecords] = {}
+        self.fuzzer_names: List[str] = []
+        self.fuzzer_codes = AppendBuffer(dtype=np.int32)
+        self.rows = AppendBuffer(dtype=np.int64)
+        self.ids = AppendBuffer(dtype=np.int64)
+        self.op_codes = AppendBuffer(dtype=np.int32)
+        self.live = AppendBuffer(dtype=bool)
+        self.ops: Dict[str, int] = {}
+        self.postings: Dict[str, List[np.ndarray]] = {}
+
+    def update(self, fuzzer_name: str, queue: pd.DataFrame) -> bool:
+        """
+        Adds the rows of a fuzzer's introspection_queue table not added yet. A table
+        that was replaced rather than appended to is added again from the start.
+
+        Returns:
+            bool: Whether anything changed.
+        """
+        records = self.fuzzers.get(fuzzer_name)
+        if records is None:
+            records = self.fuzzers[fuzzer_name] = FuzzerRecords(len(self.fuzzer_names))
+            self.fuzzer_names.append(fuzzer_name)
+        if len(queue) < records.rows or (records.rows and queue['result'].iat[records.rows - 1] != records.last_result):
+            live = self.live.view()
+            live[self.fuzzer_codes.view() == records.code] = False
+            records.rows = 0
+            records.by_id[:] = -1
+        if len(queue) == records.rows:
+            return False
+        new = queue.iloc[records.rows:]
+        first = self.live.size
+        numbers = np.arange(first, first + len(new))
+
+        fields = new['result'].str.extract(RESULT_FIELDS)
+        ids = pd.to_numeric(fields[0]).fillna(-1).to_numpy(dtype=np.int64)
+        ops = fields[1].fillna(fields[2]).fillna('')
+        op_codes = np.array([self.ops.setdefault(op, len(self.ops)) for op in ops.unique()])
+        self.op_codes.extend(op_codes[pd.Index(ops.unique()).get_indexer(ops)])
+        self.fuzzer_codes.extend(np.full(len(new), records.code))
+        self.rows.extend(np.arange(records.rows, len(queue)))
+        self.ids.extend(ids)
+        self.live.extend(np.ones(len(new), dtype=bool))
+
+        known = ids >= 0
+        if known.any():
+            size = ids.max() + 1
+            if size > len(records.by_id):
+                by_id = np.full(max(size, 2 * len(records.by_id)), -1, dtype=np.int64)
+                by_id[:len(records.by_id)] = records.by_id
+                records.by_id = by_id
+            records.by_id[ids[known]] = numbers[known]
+
+        names = mutation_names(new['mutation'])
+        codes, uniques = pd.factorize(names)
+        order = np.argsort(codes, kind='stable')
+        holders = numbers[names.index.to_numpy()[order]]
+        for name, chunk in zip(uniques, np.split(holders, np.cumsum(np.bincount(codes, minlength=len(uniques)))[:-1])):
+            chunks = self.postings.setdefault(name, [])
+            chunks.append(chunk)
+            if len(chunks) > MAX_POSTING_CHUNKS:
+                self.postings[name] = [np.concatenate(chunks)]
+
+        records.rows = len(queue)
+        records.last_result = queue['result'].iat[-1]
+        return True
+
+    def _matching(self, names: Iterable[str], value: str, prefix: bool) -> List[str]:
+        value = value.lower()
+        return [name for name in names if (name.lower().startswith(value) if prefix else value in name.lower())]
+
+    def _holders(self, names: List[str]) -> np.ndarray:
+        mask = np.zeros(self.live.size, dtype=bool)
+        for name in names:
+            for chunk in self.postings[name]:
+                mask[chunk] = True
+        return mask
+
+    def search(self, query: str, fuzzer_names: Iterable[str]) -> np.ndarray:
+        """
+        Returns the numbers of the live records of the given fuzzers matching a
+        query (see QUERY_HELP), ordered by fuzzer name and queue id.
+        """
+        fuzzer_names = set(fuzzer_names)
+        allowed = [records.code for fuzzer_name, records in self.fuzzers.items() if fuzzer_name in fuzzer_names]
+        fuzzer_codes = self.fuzzer_codes.view()
+        mask = self.live.view() & np.isin(fuzzer_codes, allowed)
+        for term in query.split():
+            field, _, value = term.partition(':')
+            if field not in QUERY_FIELDS or not value:
+                field, value = ('id', term) if term.isdigit() else (None, term)
+            if field == 'fuzzer':
+                codes = [self.fuzzers[name].code for name in self._matching(self.fuzzers, value, prefix=True)]
+                mask &= np.isin(fuzzer_codes, codes)
+            elif field == 'op':
+                codes = [self.ops[op] for op in self._matching(self.ops, value, prefix=True)]
+                mask &= np.isin(self.op_codes.view(), codes)
+            elif field == 'id':
+                mask &= self.ids.view() == (int(value) if value.isdigit() else -2)
+            else:
+                mask &= self._holders(self._matching(self.postings, value, prefix=False))
+        numbers = np.flatnonzero(mask)
+        ranks = np.argsort(np.argsort(self.fuzzer_names))
+        return numbers[np.lexsort((self.ids.data[numbers], ranks[fuzzer_codes[numbers]]))]
+
+    def find(self, fuzzer_name: str, queue_id: int) -> Optional[int]:
+        """
+        Returns the row of a fuzzer's introspection_queue table that produced a queue entry, or None.
+        """
+        records = self.fuzzers.get(fuzzer_name)
+        if records is None or not 0 <= queue_id < len(records.by_id) or records.by_id[queue_id] < 0:
+            return None
+        return int(self.rows.data[records.by_id[queue_id]])
+
+
+def get_mutation_index(directory_path: str) -> MutationIndex:
+    entry = get_data_store().entry(directory_path)
+    with entry.lock:
+        return entry.cursors.setdefault('mutation_index', MutationIndex())
+
+
+@profiled()
+def refresh_mutation_index(directory_path: str, fuzzer_name: str):
+    """
+    Adds a fuzzer's new introspection_queue rows to the campaign's MutationIndex.
+    """
+    queue = get_table(directory_path, fuzzer_name, 'introspection_queue')
+    if queue is None:
+        return
+    index = get_mutation_index(directory_path)
+    with index.lock:
+        index.update(fuzzer_name, queue)
+
+
+def read_record(directory_path: str, fuzzer_name: str, row: Optional[int]) -> Optional[pd.Series]:
+    queue = get_table(directory_path, fuzzer_name, 'introspection_queue')
+    # the index may already hold rows of a table published after queue was fetched
+    if row is None or queue is None or row >= len(queue):
+        return None
+    return queue.iloc[row]
+
+
+def search_mutations(directory_path: str, query: str, page: int = 0,
+                     page_size: int = PAGE_SIZE) -> Tuple[int, pd.DataFrame]:
+    """
+    Searches the QUEUE introspection records of every fuzzer.
+
+    Args:
+        directory_path (str): Campaign output directory.
+        query (str): Search terms, see QUERY_HELP. An empty query matches every record.
+        page (int): Page of results to return, from 0.
+        page_size (int): Results per page.
+
+    Returns:
+        Tuple[int, pd.DataFrame]: Number of matching records, and the page of them with
+        their fuzzer, queue id, op, number of mutations and original and result file names
+        (missing for records that can no longer be read).
+    """
+    index = get_mutation_index(directory_path)
+    with index.lock:
+        numbers = index.search(query, get_fuzzers(directory_path))
+        selected = numbers[page * page_size:(page + 1) * page_size]
+        fuzzer_names = [index.fuzzer_names[code] for code in index.fuzzer_codes.data[selected]]
+        rows = index.rows.data[selected]
+        ids = index.ids.data[selected]
+        ops = np.array(list(index.ops), dtype=object)[index.op_codes.data[selected]] \
+            if len(selected) else np.empty(0, dtype=object)
+    records = [read_record(directory_path, fuzzer_name, row) for fuzzer_name, row in zip(fuzzer_names, rows)]
+    # records no longer readable (e.g. introspection.txt was truncated) stay listed with
+    # empty fields, so the page size and total count still agree
+    return len(numbers), pd.DataFrame({
+        'fuzzer': fuzzer_names,
+        'id': ids,
+        'op': ops,
+        'mutations': pd.array([len(record['mutation'].split()) if record is not None else None
+                               for record in records], dtype='Int64'),
+        'original': [record['original'].rsplit('/', 1)[-1] if record is not None else None
+                     for record in records],
+        'result': [record['result'].rsplit('/', 1)[-1] if record is not None else None
+                   for record in records],
+    })
+
+
+def get_mutation_record(directory_path: str, fuzzer_name: str, queue_id: int) -> Optional[pd.Series]:
+    """
+    Looks up the QUEUE introspection record that produced a fuzzer's queue entry.
+
+    Returns:
+        Optional[pd.Series]: Record with original, mutation and result, or None if unknown.
+    """
+    index = get_mutation_index(directory_path)
+    with index.lock:
+        row = index.find(fuzzer_name, queue_id)
+    return read_record(directory_path, fuzzer_name, row)
@@ -0,0 +1,185 @@
+import functools
+import logging
+import logging.handlers
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import *
+import numpy as np
+import pandas as pd
+
+# samples kept per instrumented name; older samples are overwritten
+RING_SIZE = 1024
+SAMPLE_FIELDS = ['timestamp', 'wall', 'cpu', 'rows', 'bytes', 'peak']
+PERCENTILES = [50, 95, 99]
+
+# PROFILE_MEMORY=1 traces allocations to record peak memory per span. Tracing slows
+# every allocation down, so it is off by default and peak is then left empty.
+if os.environ.get("PROFILE_MEMORY") == "1":
+    tracemalloc.start()
+
+# PROFILE_LOG=<path> also appends every sample as a CSV line to a rotated file,
+# bounded to PROFILE_LOG_MAX_BYTES * (PROFILE_LOG_BACKUPS + 1)
+PROFILE_LOG = os.environ.get("PROFILE_LOG")
+PROFILE_LOG_MAX_BYTES = 1024 * 1024
+PROFILE_LOG_BACKUPS = 3
+
+
+class RingBuffer:
+    """
+    Fixed-size buffer of the latest samples of one instrumented name.
+    """
+
+    def __init__(self, size: int = RING_SIZE):
+        self.samples = np.full((size, len(SAMPLE_FIELDS)), np.nan)
+        # samples ever recorded, the buffer holding the last min(count, size)
+        self.count = 0
+
+    def append(self, values: Sequence[float]):
+        self.samples[self.count % len(self.samples)] = values
+        self.count += 1
+
+    def to_frame(self) -> pd.DataFrame:
+        size = len(self.samples)
+        order = np.arange(max(0, self.count - size), self.count) % size
+        return pd.DataFrame(self.samples[order], columns=SAMPLE_FIELDS)
+
+
+class Span:
+    """
+    Measurement in progress. Instrumented code sets rows and bytes when it knows them.
+    """
+    __slots__ = ('name', 'rows', 'bytes')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.rows = np.nan
+        self.bytes = np.nan
+
+
+class Profiler:
+    """
+    Process-wide store of profiling samples, one ring buffer per instrumented name.
+
+    Memory use and the cost of record() do not grow with the run time, so it can
+    stay enabled for campaigns lasting weeks.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buffers: Dict[str, RingBuffer] = {}
+        self._export = None
+        if PROFILE_LOG:
+            os.makedirs(os.path.dirname(PROFILE_LOG) or '.', exist_ok=True)
+            handler = logging.handlers.RotatingFileHandler(
+                PROFILE_LOG, maxBytes=PROFILE_LOG_MAX_BYTES, backupCount=PROFILE_LOG_BACKUPS)
+            handler.setFormatter(logging.Formatter(
+                '%(asctime)s,%(message)s', datefmt='%Y-%m-%d %H:%M:%S'))
+            self._export = logging.getLogger('profiling')
+            self._export.setLevel(logging.INFO)
+            self._export.propagate = False
+            self._export.addHandler(handler)
+
+    def record(self, name: str, wall: float, cpu: float, rows: float = np.nan,
+               nbytes: float = np.nan, peak: float = np.nan):
+        with self._lock:
+            buffer = self._buffers.get(name)
+            if buffer is None:
+                buffer = self._buffers[name] = RingBuffer()
+            buffer.append((time.time(), wall, cpu, rows, nbytes, peak))
+        if self._export is not None:
+            self._export.info(f"{name},{wall},{cpu},{rows},{nbytes},{peak}")
+
+    def samples(self, name: Optional[str] = None) -> pd.DataFrame:
+        """
+        Returns the buffered samples, of one name or all of them, oldest first.
+        """
+        with self._lock:
+            frames = {buffer_name: buffer.to_frame() for buffer_name, buffer in self._buffers.items()
+                      if name is None or buffer_name == name}
+        if not frames:
+            return pd.DataFrame(columns=['name'] + SAMPLE_FIELDS)
+        df = pd.concat(frames, names=['name']).reset_index(level=0)
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='s')
+        return df.reset_index(drop=True)
+
+    def summary(self) -> pd.DataFrame:
+        """
+        Returns per name the number of calls, wall time percentiles (over the buffered
+        samples, in seconds), mean CPU time and totals/maxima of rows, bytes and peak.
+        """
+        with self._lock:
+            buffers = {name: (buffer.count, buffer.to_frame())
+                       for name, buffer in self._buffers.items()}
+        rows = {}
+        for name, (count, samples) in sorted(buffers.items()):
+            wall = samples['wall'].to_numpy()
+            row = {'calls': count}
+            row.update({f"wall_p{p}": value for p, value in zip(
+                PERCENTILES, np.percentile(wall, PERCENTILES))})
+            row['cpu_mean'] = samples['cpu'].mean()
+            row['rows'] = samples['rows'].sum(min_count=1)
+            row['bytes'] = samples['bytes'].sum(min_count=1)
+            row['peak_max'] = samples['peak'].max()
+            rows[name] = row
+        summary = pd.DataFrame.from_dict(rows, orient='index')
+        summary.index.name = 'name'
+        return summary
+
+    def reset(self):
+        with self._lock:
+            self._buffers.clear()
+
+
+# module-level rather than st.cache_resource: it is used on every hot path and
+# by the ingestion worker processes, which run outside Streamlit
+PROFILER = Profiler()
+
+
+@contextmanager
+def profile_span(name: str) -> Iterator[Span]:
+    """
+    Records the wall time, CPU time (of the calling thread), rows and bytes set on the
+    yielded Span, and peak allocation (if PROFILE_MEMORY=1) of a block of code.
+
+    Peak allocation is measured process-wide, so it is approximate for nested spans
+    and spans running concurrently on other threads.
+    """
+    span = Span(name)
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        start_memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+    start_time = time.perf_counter()
+    start_cpu = time.thread_time()
+    try:
+        yield span
+    finally:
+        wall = time.perf_counter() - start_time
+        cpu = time.thread_time() - start_cpu
+        peak = tracemalloc.get_traced_memory()[1] - start_memory if tracing else np.nan
+        PROFILER.record(name, wall, cpu, span.rows, span.bytes, peak)
+
+
+def profiled(name: Optional[str] = None, rows: Optional[Callable[[Any], int]] = None):
+    """
+    Decorator recording every call of a function with profile_span.
+
+    Args:
+        name (str, optional): Name to record under, defaults to the function name.
+        rows (Callable[[Any], int], optional): Computes the rows processed from the return value.
+    """
+    def decorator(func):
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with profile_span(span_name) as span:
+                result = func(*args, **kwargs)
+                if rows is not None:
+                    span.rows = rows(result)
+                return result
+        return wrapper
+    return decorator
@@ -1,85 +0,0 @@
-import streamlit as st
-import pandas as pd
-# import plotly.express as px
-import plotly.graph_objects as go
-from datetime import datetime
-import glob
-import os
-from utils import *
-
-
-UPDATE_INTERVAL = 60
-# UPDATE_INTERVAL = 5
-DATA_DIRECTORY_PATH = 'sample-data'
-# DATA_DIRECTORY_PATH = 'out'
-
-st.set_page_config(layout='wide')
-
-
-@st.fragment(run_every=UPDATE_INTERVAL)
-def generate_plot_data_chart():
-    update_session_plot_data(DATA_DIRECTORY_PATH)
-    update_session_fuzzer_stats(DATA_DIRECTORY_PATH)
-    metrics = ['corpus_count', 'pending_total', 'pending_favs']
-    metric_titles = {
-        'corpus_count': 'Corpus Count Over Time',
-        'pending_total': 'Pending Total Over Time',
-        'pending_favs': 'Pending Favs Over Time'
-    }
-    cols = st.columns(3, border=True)
-    for idx, metric in enumerate(metrics):
-        fig = go.Figure()
-        for file_path in glob.glob(os.path.join(DATA_DIRECTORY_PATH, "*", "plot_data")):
-            base_name = os.path.basename(os.path.dirname(file_path))
-            session_plot_data = st.session_state[base_name]['plot_data']
-            fig.add_trace(go.Scatter(
-                x=session_plot_data['relative_time'],
-                y=session_plot_data[metric],
-                name=base_name,
-            ))
-        fig.update_layout(title=metric_titles[metric])
-        with cols[idx]:
-            st.plotly_chart(fig)
-
-
-@st.fragment(run_every=UPDATE_INTERVAL)
-def generate_queue_data_chart():
-    update_session_fuzzer_stats(DATA_DIRECTORY_PATH)
-    update_session_queue_data(DATA_DIRECTORY_PATH)
-    queue_data_dfs = []
-    for idx, row in st.session_state.fuzzer_stats.iterrows():
-        try:
-            cur_item = row['cur_item']
-            # st.text(f"{idx}:{cur_item}")
-            queue_data = st.session_state[idx]['queue_data']
-            regex_pattern = rf'id:0*{cur_item}\b'
-            queue_data_df = queue_data[queue_data['filename'].str.contains(
-                regex_pattern)]
-            # st.dataframe(queue_data_df)
-            queue_data_df = queue_data_df.copy()
-            queue_data_df.loc[:, 'fuzzer'] = idx
-            queue_data_df = queue_data_df.set_index('fuzzer')
-            queue_data_dfs.append(queue_data_df)
-        except:
-            st.warning(f"Queue information for item {cur_item} not loaded (item has not been executed yet) ({idx})")
-
-    result = pd.concat(queue_data_dfs)
-    st.dataframe(result)
-
-
-generate_plot_data_chart()
-
-st.space()
-
-st.subheader("Current Queue")
-generate_queue_data_chart()
-
-st.space()
-
-st.caption(
-    f"**Last updated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} (Update interval: {UPDATE_INTERVAL}s)")
-
-if st.button("Refresh"):
-    update_session_fuzzer_stats(DATA_DIRECTORY_PATH)
-    update_session_queue_data(DATA_DIRECTORY_PATH)
-    update_session_plot_data(DATA_DIRECTORY_PATH)
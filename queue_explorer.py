@@ -0,0 +1,162 @@
+import re
+from typing import *
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from utils import *
+
+# rows of the queue explorer returned per page
+EXPLORER_PAGE_SIZE = 50
+# corpus columns not copied into the explorer table, the long strings would dominate its size
+EXCLUDED_COLUMNS = ['filename', 'orig', 'val']
+# e.g. "bitmap_size > 500"
+FILTER_PATTERN = re.compile(r'^\s*(\w+)\s*(==|!=|>=|<=|>|<)\s*(.+?)\s*$')
+FILTER_OPERATORS = {
+    '==': lambda field, value: field == value,
+    '!=': lambda field, value: field != value,
+    '>=': lambda field, value: field >= value,
+    '<=': lambda field, value: field <= value,
+    '>': lambda field, value: field > value,
+    '<': lambda field, value: field < value,
+}
+FILTER_HELP = """
+Conditions joined by `and`, each `<column> <operator> <value>` with operators
+`==`, `!=`, `>`, `>=`, `<` and `<=`, e.g. `favored == 1 and bitmap_size > 500 and finds == 0`.
+Text values (op, sync) may be quoted.
+"""
+# integer columns come back as nullable pandas integers, whatever width each fuzzer's table has
+INTEGER_DTYPES = {pa.int8(): pd.Int8Dtype(), pa.int16(): pd.Int16Dtype(),
+                  pa.int32(): pd.Int32Dtype(), pa.int64(): pd.Int64Dtype()}
+
+
+def fuzzer_queue_table(fuzzer_name: str, corpus: pd.DataFrame) -> pa.Table:
+    """
+    Converts a fuzzer's corpus table to Arrow, with its fuzzer name and queue id as the first columns.
+    """
+    df = corpus.drop(columns=[column for column in EXCLUDED_COLUMNS if column in corpus])
+    # the pandas metadata would pin each column to this fuzzer's dtype, narrower than the
+    # combined column may be
+    table = pa.Table.from_pandas(df.reset_index(), preserve_index=False).replace_schema_metadata()
+    fuzzer = pa.DictionaryArray.from_arrays(pa.array([0] * len(df), type=pa.int32()), pa.array([fuzzer_name]))
+    return table.add_column(0, 'fuzzer', fuzzer)
+
+
+def get_queue_table(directory_path: str) -> Optional[pa.Table]:
+    """
+    Returns the corpus tables of every fuzzer as a single Arrow table (see
+    fuzzer_queue_table), ordered by fuzzer and queue id, with the row's position in
+    that order, or None before any queue_data was read.
+
+    A fuzzer's corpus is only converted again when it changed, and the combined
+    table references the per-fuzzer tables' columns rather than copying them.
+    """
+    tables = get_tables(directory_path, 'corpus')
+    entry = get_data_store().entry(directory_path)
+    with entry.lock:
+        converted, combined = entry.cursors.get('queue_table', ({}, None))
+        if combined is not None and converted.keys() == tables.keys() and \
+                all(converted[fuzzer_name][0] is corpus for fuzzer_name, corpus in tables.items()):
+            return combined
+        converted = {fuzzer_name: converted[fuzzer_name] if fuzzer_name in converted and
+                     converted[fuzzer_name][0] is corpus else (corpus, fuzzer_queue_table(fuzzer_name, corpus))
+                     for fuzzer_name, corpus in sorted(tables.items())}
+        combined = None
+        if converted:
+            combined = pa.concat_tables([table for _, table in converted.values()], promote_options='permissive') \
+                .unify_dictionaries()
+            combined = combined.append_column('position', pa.array(np.arange(combined.num_rows)))
+        entry.cursors['queue_table'] = (converted, combined)
+        return combined
+
+
+def parse_filter(table: pa.Table, filters: str) -> Tuple[Optional[pc.Expression], Set[str]]:
+    """
+    Parses filter conditions (see FILTER_HELP) into an Arrow expression over table.
+
+    Returns:
+        Tuple[Optional[pc.Expression], Set[str]]: The expression (None without
+        conditions), and the columns it reads.
+
+    Raises:
+        ValueError: If a condition is malformed or names an unknown column.
+    """
+    expression = None
+    columns = set()
+    for condition in re.split(r'\s+and\s+', filters.strip(), flags=re.IGNORECASE) if filters.strip() else []:
+        match = FILTER_PATTERN.match(condition)
+        if match is None:
+            raise ValueError(f"Malformed condition: {condition}")
+        column, operator, value = match.groups()
+        if column not in table.column_names:
+            raise ValueError(f"Unknown column: {column}")
+        field_type = table.schema.field(column).type
+        value = value.strip('"\'')
+        if pa.types.is_boolean(field_type):
+            value = value.lower() in ('1', 'true')
+        elif pa.types.is_integer(field_type) or pa.types.is_floating(field_type):
+            try:
+                value = float(value)
+            except ValueError:
+                raise ValueError(f"{column} is numeric, not {value}") from None
+        condition = FILTER_OPERATORS[operator](pc.field(column), value)
+        expression = condition if expression is None else expression & condition
+        columns.add(column)
+    return expression, columns
+
+
+def explore_queue(directory_path: str, filters: str = '', sort_by: Optional[str] = None,
+                  descending: bool = False, fuzzer_names: Optional[List[str]] = None,
+                  page: int = 0, page_size: int = EXPLORER_PAGE_SIZE) -> Tuple[int, pd.DataFrame]:
+    """
+    Filters, sorts and pages the queue entries of every fuzzer with vectorized Arrow kernels.
+
+    Args:
+        directory_path (str): Campaign output directory.
+        filters (str): Conditions every returned entry meets, see FILTER_HELP.
+        sort_by (str, optional): Column to order by, ties broken by fuzzer and id.
+        descending (bool): Order by sort_by from the largest value.
+        fuzzer_names (List[str], optional): Only return entries of these fuzzers.
+        page (int): Page of results to return, from 0.
+        page_size (int): Results per page.
+
+    Returns:
+        Tuple[int, pd.DataFrame]: Number of matching entries, and the page of them.
+
+    Raises:
+        ValueError: If filters or sort_by are invalid.
+    """
+    table = get_queue_table(directory_path)
+    if table is None:
+        return 0, pd.DataFrame()
+    if sort_by is not None and sort_by not in table.column_names:
+        raise ValueError(f"Unknown column: {sort_by}")
+    expression, columns = parse_filter(table, filters)
+    if fuzzer_names is not None:
+        selected = pc.field('fuzzer').isin(fuzzer_names)
+        expression = selected if expression is None else expression & selected
+        columns.add('fuzzer')
+    # filter and order only the columns involved, then read the page's rows by position
+    matching = table.select(list(columns | {sort_by or 'position', 'position'}))
+    if expression is not None:
+        matching = matching.filter(expression)
+    start, end = page * page_size, min((page + 1) * page_size, matching.num_rows)
+    if sort_by is None:
+        # rows are kept ordered by fuzzer and id
+        positions = matching['position'][start:max(start, end)]
+    else:
+        # Arrow does not order dictionary columns, compare their values instead. The
+        # position breaks ties, keeping equal rows ordered by fuzzer and id.
+        key = matching[sort_by]
+        if pa.types.is_dictionary(key.type):
+            key = pc.cast(key, key.type.value_type)
+        keys = pa.table({'key': key, 'position': matching['position']})
+        sort_keys = [('key', 'descending' if descending else 'ascending'), ('position', 'ascending')]
+        # only the rows up to the end of the page need to be ordered
+        if end < matching.num_rows // 2:
+            indices = pc.select_k_unstable(keys, end, sort_keys)
+        else:
+            indices = pc.sort_indices(keys, sort_keys)
+        positions = matching['position'].take(indices[start:max(start, end)])
+    return matching.num_rows, table.take(positions).drop_columns(['position']).to_pandas(
+        types_mapper=INTEGER_DTYPES.get)
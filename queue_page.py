@@ -0,0 +1,184 @@
+import streamlit as st
+import pandas as pd
+# import plotly.express as px
+import plotly.graph_objects as go
+from datetime import datetime
+import glob
+import os
+from utils import *
+from ingest import start_ingestion
+from corpus_analytics import *
+from lineage import get_seed_lineage
+from queue_explorer import explore_queue, get_queue_table, EXPLORER_PAGE_SIZE, FILTER_HELP
+
+
+# fragments only read data parsed by the ingestion thread, so ticks are cheap
+UPDATE_INTERVAL = 5
+# UPDATE_INTERVAL = 60
+DATA_DIRECTORY_PATH = 'sample-data'
+# DATA_DIRECTORY_PATH = 'out'
+
+st.set_page_config(layout='wide')
+
+
+@st.fragment(run_every=UPDATE_INTERVAL)
+@profiled('queue.generate_plot_data_chart')
+def generate_plot_data_chart():
+    start_ingestion(DATA_DIRECTORY_PATH)
+    metrics = ['corpus_count', 'pending_total', 'pending_favs']
+    metric_titles = {
+        'corpus_count': 'Corpus Count Over Time',
+        'pending_total': 'Pending Total Over Time',
+        'pending_favs': 'Pending Favs Over Time'
+    }
+    window = time_window_selector(
+        'queue_window', get_latest_time(DATA_DIRECTORY_PATH))
+    cols = st.columns(3, border=True)
+    for idx, metric in enumerate(metrics):
+        fig = go.Figure()
+        for base_name in get_tables(DATA_DIRECTORY_PATH, 'plot_data'):
+            session_plot_data = get_series(
+                DATA_DIRECTORY_PATH, base_name, 'plot_data', metric, window=window)
+            if session_plot_data is None:
+                continue
+            fig.add_trace(go.Scatter(
+                x=session_plot_data['relative_time'],
+                y=session_plot_data[metric],
+                name=base_name,
+            ))
+        fig.update_layout(title=metric_titles[metric])
+        with cols[idx]:
+            st.plotly_chart(fig)
+
+
+@st.fragment(run_every=UPDATE_INTERVAL)
+@profiled('queue.generate_queue_data_chart')
+def generate_queue_data_chart():
+    start_ingestion(DATA_DIRECTORY_PATH)
+    current_items = {}
+    for idx, cur_item in get_fuzzer_stats(DATA_DIRECTORY_PATH)['cur_item'].items():
+        queue_entry = get_queue_entry(DATA_DIRECTORY_PATH, idx, cur_item)
+        if queue_entry is None:
+            st.warning(f"Queue information for item {cur_item} not loaded (item has not been executed yet) ({idx})")
+            continue
+        current_items[idx] = queue_entry
+
+    result = pd.DataFrame.from_dict(current_items, orient='index')
+    result.index.name = 'fuzzer'
+    st.dataframe(result)
+
+
+def reset_queue_explorer_page():
+    st.session_state['queue_explorer_page'] = 1
+
+
+@st.fragment(run_every=UPDATE_INTERVAL)
+@profiled('queue.generate_queue_explorer')
+def generate_queue_explorer():
+    start_ingestion(DATA_DIRECTORY_PATH)
+    table = get_queue_table(DATA_DIRECTORY_PATH)
+    if table is None:
+        st.info("No queue entries found yet")
+        return
+    fuzzer_names = get_fuzzers(DATA_DIRECTORY_PATH, 'queue_data')
+    col1, col2, col3, col4 = st.columns([2, 3, 2, 1], vertical_alignment='bottom')
+    selected_fuzzers = col1.multiselect("Fuzzers", fuzzer_names, placeholder="All fuzzers",
+                                        key='queue_explorer_fuzzers', on_change=reset_queue_explorer_page)
+    filters = col2.text_input("Filter", placeholder="favored == 1 and bitmap_size > 500 and finds == 0",
+                              help=FILTER_HELP, key='queue_explorer_filter', on_change=reset_queue_explorer_page)
+    columns = [column for column in table.column_names if column not in ('fuzzer', 'position')]
+    sort_by = col3.selectbox("Sort by", columns, index=None, placeholder="fuzzer, id",
+                             key='queue_explorer_sort', on_change=reset_queue_explorer_page)
+    descending = col4.toggle("Descending", key='queue_explorer_descending', on_change=reset_queue_explorer_page)
+    page = st.session_state.get('queue_explorer_page', 1)
+    try:
+        # only the visible page leaves the server
+        total, rows = explore_queue(DATA_DIRECTORY_PATH, filters, sort_by, descending,
+                                    selected_fuzzers or None, page - 1)
+    except ValueError as e:
+        st.warning(str(e))
+        return
+    pages = max(1, -(-total // EXPLORER_PAGE_SIZE))
+    if page > pages:
+        # entries of the page were removed
+        page = st.session_state['queue_explorer_page'] = pages
+        total, rows = explore_queue(DATA_DIRECTORY_PATH, filters, sort_by, descending,
+                                    selected_fuzzers or None, page - 1)
+    col1, col2 = st.columns([1, 4], vertical_alignment='bottom')
+    col1.number_input("Page", min_value=1, max_value=pages, key='queue_explorer_page')
+    col2.caption(f"{total:,} entries, page {page} of {pages:,}")
+    st.dataframe(rows, hide_index=True)
+
+
+@st.fragment(run_every=UPDATE_INTERVAL)
+@profiled('queue.generate_corpus_storage')
+def generate_corpus_storage():
+    start_ingestion(DATA_DIRECTORY_PATH)
+    corpus_files = get_corpus_files(DATA_DIRECTORY_PATH)
+    if corpus_files.empty:
+        st.info("No queue entries found yet")
+        return
+
+    total_bytes = int(corpus_files['size'].sum())
+    distinct_bytes = int(corpus_files.loc[corpus_files['first_copy'], 'size'].sum())
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Queue size", f"{total_bytes / 2**20:.1f} MiB")
+    col2.metric("Distinct contents", f"{distinct_bytes / 2**20:.1f} MiB")
+    col3.metric("Duplicated", f"{(total_bytes - distinct_bytes) / 2**20:.1f} MiB",
+                f"{(total_bytes - distinct_bytes) / total_bytes:.1%}", delta_color='off')
+
+    summary = corpus_storage_summary(corpus_files)
+    fig = go.Figure()
+    for column, name in [('own_bytes', 'Found'), ('imported_bytes', 'Imported')]:
+        fig.add_trace(go.Bar(x=summary.index, y=summary[column], name=name))
+    fig.update_layout(title='Queue Bytes per Fuzzer', barmode='stack')
+    st.plotly_chart(fig)
+    st.dataframe(summary, column_config={
+        'duplication_ratio': st.column_config.NumberColumn(format='percent')})
+    st.caption("Largest entries")
+    st.dataframe(largest_entries(corpus_files), hide_index=True)
+
+
+@st.fragment(run_every=UPDATE_INTERVAL)
+@profiled('queue.generate_seed_lineage')
+def generate_seed_lineage():
+    start_ingestion(DATA_DIRECTORY_PATH)
+    seeds = get_seed_lineage(DATA_DIRECTORY_PATH)
+    if seeds.empty:
+        st.info("No queue entries found yet")
+        return
+    st.dataframe(seeds.sort_values('descendants', ascending=False), hide_index=True,
+                 column_config={'cov_yield': st.column_config.NumberColumn(format='percent')})
+
+
+generate_plot_data_chart()
+
+st.space()
+
+st.subheader("Current Queue")
+generate_queue_data_chart()
+
+st.space()
+
+st.subheader("Queue Explorer")
+generate_queue_explorer()
+
+st.space()
+
+st.subheader("Corpus Storage")
+generate_corpus_storage()
+
+st.space()
+
+st.subheader("Seed Lineage")
+generate_seed_lineage()
+
+st.space()
+
+st.caption(
+    f"**Last updated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} (Update interval: {UPDATE_INTERVAL}s)")
+
+if st.button("Refresh"):
+    update_session_fuzzer_stats(DATA_DIRECTORY_PATH)
+    update_session_queue_data(DATA_DIRECTORY_PATH)
+    update_session_plot_data(DATA_DIRECTORY_PATH)
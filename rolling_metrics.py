@@ -0,0 +1,259 @@
+from typing import *
+import numpy as np
+import pandas as pd
+from utils import *
+
+# trailing windows aggregated for every fuzzer as its data grows, in seconds
+METRIC_WINDOWS = {'10m': 600, '1h': 3600, '24h': 86400}
+# bucket sizes of the rollup tables, in seconds
+ROLLUPS = {'minute': 60, 'hour': 3600}
+# plot_data counters whose increase over a window or bucket is reported
+COUNTERS = {'execs': 'total_execs', 'crashes': 'saved_crashes', 'hangs': 'saved_hangs'}
+
+
+class AppendBuffer:
+    """
+    Array grown by doubling, so appending n values costs O(n) amortized.
+    """
+
+    def __init__(self, capacity: int = 1024, dtype: type = float):
+        self.data = np.empty(capacity, dtype=dtype)
+        self.size = 0
+
+    def extend(self, values: np.ndarray):
+        if self.size + len(values) > len(self.data):
+            data = np.empty(max(2 * len(self.data), self.size + len(values)), dtype=self.data.dtype)
+            data[:self.size] = self.data[:self.size]
+            self.data = data
+        self.data[self.size:self.size + len(values)] = values
+        self.size += len(values)
+
+    def view(self) -> np.ndarray:
+        return self.data[:self.size]
+
+
+class FuzzerMetrics:
+    """
+    Rolling aggregates of one fuzzer's plot_data and queue finds.
+
+    Keeps running sums of execs_per_sec and of its square over plot_data rows, and
+    the sorted times of the fuzzer's own finds, extended only with the rows added
+    since the previous update. The mean and variance of execs_per_sec, the number
+    of finds and the increase of a counter over any time range then take a few
+    binary searches. Counters are read from the consumed plot_data table itself.
+
+    Rollups are rebuilt from the first bucket touched by new rows onward, which
+    also covers finds that are read after the plot_data rows of the same minute.
+    """
+
+    def __init__(self):
+        # last tables consumed, and the number of their rows
+        self.plot_data = None
+        self.corpus = None
+        self.corpus_rows = 0
+        self.times = AppendBuffer()
+        # running sums of execs_per_sec - shift (and its square) before each row, keeping
+        # the sums small enough for the variance not to lose precision
+        self.shift = None
+        self.sums = AppendBuffer()
+        self.sums.extend([0.0])
+        self.squares = AppendBuffer()
+        self.squares.extend([0.0])
+        self.find_times = AppendBuffer()
+        self.last_cov = np.nan
+        # earliest time with new data since the rollups were built
+        self.dirty = 0.0
+        self.rollups: Dict[str, pd.DataFrame] = {}
+
+    def update(self, plot_data: Optional[pd.DataFrame], corpus: Optional[pd.DataFrame]) -> bool:
+        """
+        Consumes the rows of plot_data and corpus not seen yet. A table that was
+        replaced rather than appended to is consumed from the start.
+
+        Returns:
+            bool: Whether anything changed.
+        """
+        changed = False
+        if plot_data is not None and plot_data is not self.plot_data:
+            self._update_plot_data(plot_data)
+            changed = True
+        if corpus is not None and corpus is not self.corpus:
+            self._update_finds(corpus)
+            changed = True
+        if changed:
+            self._update_rollups()
+        return changed
+
+    def _update_plot_data(self, plot_data: pd.DataFrame):
+        rows = self.times.size
+        if len(plot_data) < rows or (rows and plot_data['relative_time'].iat[rows - 1] != self.times.data[rows - 1]):
+            corpus, corpus_rows, find_times, last_cov = self.corpus, self.corpus_rows, self.find_times, self.last_cov
+            self.__init__()
+            self.corpus, self.corpus_rows, self.find_times, self.last_cov = corpus, corpus_rows, find_times, last_cov
+            rows = 0
+        self.plot_data = plot_data
+        if len(plot_data) == rows:
+            return
+        times = plot_data['relative_time'].iloc[rows:].to_numpy(dtype=float)
+        values = plot_data['execs_per_sec'].iloc[rows:].to_numpy(dtype=float)
+        if self.shift is None:
+            self.shift = float(np.nan_to_num(values[0]))
+        # an unparsable sample counts as the shift rather than poisoning every later sum
+        values = np.nan_to_num(values - self.shift)
+        self.times.extend(times)
+        self.sums.extend(self.sums.data[self.sums.size - 1] + np.cumsum(values))
+        self.squares.extend(self.squares.data[self.squares.size - 1] + np.cumsum(values * values))
+        self.dirty = min(self.dirty, times[0])
+
+    def _update_finds(self, corpus: pd.DataFrame):
+        rows = self.corpus_rows
+        if len(corpus) < rows or (rows and corpus.index[rows - 1] != self.corpus.index[rows - 1]):
+            self.find_times = AppendBuffer()
+            self.last_cov = np.nan
+            self.dirty = 0.0
+            rows = 0
+        self.corpus = corpus
+        self.corpus_rows = len(corpus)
+        new = corpus.iloc[rows:]
+        # the fuzzer's own finds, not seeds or entries imported from other fuzzers
+        local = new['sync'].isna().to_numpy() & new['orig'].isna().to_numpy()
+        times = new['time'].to_numpy(dtype=float, na_value=np.nan)[local] / 1000
+        covs = times[new['cov'].to_numpy()[local]]
+        times = times[~np.isnan(times)]
+        if len(times) == 0:
+            return
+        if len(covs):
+            self.last_cov = np.nanmax(np.append(covs, self.last_cov))
+        self.dirty = min(self.dirty, times.min())
+        find_times = self.find_times.view()
+        if not np.all(times[1:] >= times[:-1]) or (len(find_times) and times[0] < find_times[-1]):
+            # rare out of order entries, merge them in
+            times = np.sort(np.concatenate([find_times, times]))
+            self.find_times = AppendBuffer(len(times))
+        self.find_times.extend(times)
+
+    def now(self) -> float:
+        """
+        Returns the latest relative time (seconds) seen in either table, 0 if none.
+        """
+        latest = [buffer.data[buffer.size - 1] for buffer in (self.times, self.find_times) if buffer.size]
+        return max(latest, default=0.0)
+
+    def _counter_before(self, column: str, positions: np.ndarray) -> np.ndarray:
+        """
+        Returns a counter as of the rows before the given positions, 0 before the first row.
+        """
+        # picked before converting, the column itself is not copied
+        values = self.plot_data[column].to_numpy()[np.maximum(positions - 1, 0)].astype(float)
+        return np.where(positions > 0, values, 0.0)
+
+    def aggregate(self, starts: np.ndarray, ends: np.ndarray) -> pd.DataFrame:
+        """
+        Aggregates the time ranges [starts, ends) in seconds, vectorized.
+
+        Returns:
+            pd.DataFrame: One row per range with the plot_data samples it holds, their
+            execs_per_sec mean and standard deviation, the increase of every COUNTERS
+            column and the number of finds.
+        """
+        times = self.times.view()
+        low = np.searchsorted(times, starts, side='left')
+        high = np.searchsorted(times, ends, side='left')
+        samples = high - low
+        sums = self.sums.data[high] - self.sums.data[low]
+        squares = self.squares.data[high] - self.squares.data[low]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = sums / samples
+            std = np.sqrt(np.maximum(squares / samples - mean * mean, 0))
+        df = pd.DataFrame({
+            'samples': samples,
+            'execs_per_sec_mean': mean + (self.shift or 0.0),
+            'execs_per_sec_std': std,
+        })
+        for name, column in COUNTERS.items():
+            if self.plot_data is None or self.plot_data.empty:
+                df[name] = np.nan
+            else:
+                df[name] = self._counter_before(column, high) - self._counter_before(column, low)
+        find_times = self.find_times.view()
+        df['finds'] = np.searchsorted(find_times, ends, side='left') - \
+            np.searchsorted(find_times, starts, side='left')
+        return df
+
+    def windows(self) -> pd.DataFrame:
+        """
+        Returns the aggregates of every METRIC_WINDOWS window ending now, indexed by
+        window name, with the finds per hour and the seconds since the last find
+        with new coverage.
+        """
+        now = self.now()
+        # ends are exclusive, include rows taken exactly now
+        ends = np.full(len(METRIC_WINDOWS), np.nextafter(now, np.inf))
+        df = self.aggregate(ends - np.array(list(METRIC_WINDOWS.values()), dtype=float), ends)
+        df.index = pd.Index(list(METRIC_WINDOWS), name='window')
+        spans = np.minimum(list(METRIC_WINDOWS.values()), now)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            df['finds_per_hour'] = np.where(spans > 0, df['finds'] * 3600 / spans, np.nan)
+        df['since_last_cov'] = now - self.last_cov
+        return df
+
+    def _update_rollups(self):
+        if self.dirty == np.inf:
+            return
+        now = self.now()
+        for name, size in ROLLUPS.items():
+            first = int(self.dirty // size) * size
+            starts = np.arange(first, now + 1, size, dtype=float)
+            new = self.aggregate(starts, starts + size)
+            new.insert(0, 'time', starts)
+            existing = self.rollups.get(name)
+            if existing is not None and first > 0:
+                new = pd.concat([existing.iloc[:int(np.searchsorted(existing['time'].to_numpy(), first))], new],
+                                ignore_index=True)
+            self.rollups[name] = new
+        self.dirty = np.inf
+
+
+@profiled()
+def refresh_rolling_metrics(directory_path: str, fuzzer_name: str):
+    """
+    Extends a fuzzer's rolling aggregates with its new plot_data and queue_data rows,
+    and publishes its window_metrics table (see FuzzerMetrics.windows) and its
+    rollup_minute and rollup_hour tables (see FuzzerMetrics.aggregate, time being
+    the start of the bucket in seconds since the fuzzer started).
+    """
+    store = get_data_store()
+    entry = store.entry(directory_path, fuzzer_name)
+    with entry.lock:
+        metrics = entry.cursors.setdefault('rolling_metrics', FuzzerMetrics())
+        if not metrics.update(entry.tables.get('plot_data'), entry.tables.get('corpus')):
+            return
+        store.publish(entry, 'window_metrics', metrics.windows())
+        for name, rollup in metrics.rollups.items():
+            store.publish(entry, f'rollup_{name}', rollup)
+
+
+def get_window_metrics(directory_path: str, window: str) -> pd.DataFrame:
+    """
+    Returns one METRIC_WINDOWS window of every fuzzer's rolling aggregates, indexed by
+    fuzzer name. Combined only when some fuzzer's aggregates changed.
+    """
+    tables = get_tables(directory_path, 'window_metrics')
+    entry = get_data_store().entry(directory_path)
+    with entry.lock:
+        cached_tables, combined = entry.cursors.get('window_metrics', ({}, None))
+        if combined is None or cached_tables.keys() != tables.keys() or \
+                any(cached_tables[fuzzer_name] is not df for fuzzer_name, df in tables.items()):
+            combined = pd.concat(tables, names=['fuzzer']) if tables else \
+                pd.DataFrame(index=pd.MultiIndex.from_tuples([], names=['fuzzer', 'window']))
+            entry.cursors['window_metrics'] = (tables, combined)
+    if combined.empty:
+        return combined.droplevel('window')
+    return combined.xs(window, level='window')
+
+
+def get_rollup(directory_path: str, fuzzer_name: str, resolution: str) -> Optional[pd.DataFrame]:
+    """
+    Returns a fuzzer's rollup table for one of ROLLUPS, or None if not computed yet.
+    """
+    return get_table(directory_path, fuzzer_name, f'rollup_{resolution}')
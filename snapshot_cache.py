@@ -0,0 +1,158 @@
+import json
+import os
+import shutil
+import time
+from typing import *
+import pandas as pd
+from compact import concat_frames
+
+# Snapshots are kept in <campaign>/.dashboard-cache/<fuzzer>/<source file>/ unless
+# SNAPSHOT_DIR is set, in which case they go to SNAPSHOT_DIR/<campaign path>/<fuzzer>/...
+SNAPSHOT_DIRECTORY = os.environ.get("SNAPSHOT_DIR")
+# minimum seconds between two flushes of the same source file
+SNAPSHOT_INTERVAL = 60
+# parts written before the snapshot is compacted into a single part
+SNAPSHOT_MAX_PARTS = 32
+# bytes before the saved offset used to detect a file rewritten in place
+FINGERPRINT_SIZE = 64
+MANIFEST_NAME = 'manifest.json'
+
+
+def snapshot_path(directory_path: str, fuzzer_name: str, source: str) -> str:
+    if SNAPSHOT_DIRECTORY:
+        campaign = os.path.abspath(directory_path).strip(
+            os.sep).replace(os.sep, '_')
+        return os.path.join(SNAPSHOT_DIRECTORY, campaign, fuzzer_name, source)
+    return os.path.join(directory_path, '.dashboard-cache', fuzzer_name, source)
+
+
+def snapshots_writable(directory_path: str) -> bool:
+    """
+    Returns whether snapshots of a campaign can be saved, creating their root directory.
+    """
+    root = snapshot_path(directory_path, '', '')
+    try:
+        os.makedirs(root, exist_ok=True)
+    except OSError:
+        return False
+    return os.access(root, os.W_OK)
+
+
+def file_fingerprint(file_path: str, offset: int) -> str:
+    with open(file_path, 'rb') as f:
+        f.seek(max(0, offset - FINGERPRINT_SIZE))
+        return f.read(min(offset, FINGERPRINT_SIZE)).hex()
+
+
+class SnapshotCache:
+    """
+    Append-only Parquet snapshot of the tables parsed from one source file.
+
+    The manifest records the source file's inode, the byte offset the tables were
+    parsed up to, the header line and a fingerprint of the bytes before the offset.
+    On a cold start, restore() returns the tables and cursor state when they still
+    match the source file, so it only needs to be tailed past the cached offset.
+    Each save() writes only the rows added since the previous one as a new part.
+    """
+
+    def __init__(self, cache_path: str, source_path: str):
+        self.cache_path = cache_path
+        self.source_path = source_path
+        self.parts: Dict[str, List[str]] = {}
+        self.saved_rows: Dict[str, int] = {}
+        self.last_save = 0.0
+        self.pending_reset = False
+        self.disabled = False
+
+    def _read_manifest(self) -> Optional[Dict]:
+        try:
+            with open(os.path.join(self.cache_path, MANIFEST_NAME)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def restore(self) -> Optional[Tuple[Dict, Dict[str, pd.DataFrame]]]:
+        """
+        Loads the snapshot if it still describes a prefix of the source file.
+
+        Returns:
+            Optional[Tuple[Dict, Dict[str, pd.DataFrame]]]: Cursor state (inode, offset,
+            header) and tables, or None if there is no usable snapshot.
+        """
+        manifest = self._read_manifest()
+        if manifest is None:
+            return None
+        try:
+            stat = os.stat(self.source_path)
+            if stat.st_ino != manifest['inode'] or stat.st_size < manifest['offset'] \
+                    or file_fingerprint(self.source_path, manifest['offset']) != manifest['fingerprint']:
+                return None
+            tables = {}
+            for table, parts in manifest['tables'].items():
+                frames = [pd.read_parquet(os.path.join(self.cache_path, part))
+                          for part in parts]
+                tables[table] = concat_frames(frames)
+        except (OSError, KeyError, ValueError, TypeError, IndexError):
+            return None
+
+        self.parts = {table: list(parts)
+                      for table, parts in manifest['tables'].items()}
+        self.saved_rows = {table: len(df) for table, df in tables.items()}
+        self.last_save = time.time()
+        state = {key: manifest[key] for key in ('inode', 'offset')}
+        state['header'] = bytes.fromhex(manifest['header'])
+        return state, tables
+
+    def save(self, state: Dict, tables: Dict[str, pd.DataFrame], reset: bool = False, force: bool = False):
+        """
+        Appends the rows added since the last save as new parts and updates the manifest.
+
+        Args:
+            state (Dict): Cursor state (inode, offset, header) the tables were parsed up to.
+            tables (Dict[str, pd.DataFrame]): Full tables parsed from the source file.
+            reset (bool): The tables were re-read from the start of the source file.
+            force (bool): Save even if SNAPSHOT_INTERVAL has not elapsed.
+        """
+        self.pending_reset = self.pending_reset or reset
+        if self.disabled or (not force and time.time() - self.last_save < SNAPSHOT_INTERVAL):
+            return
+        if not self.pending_reset and all(self.saved_rows.get(table) == len(df) for table, df in tables.items()):
+            return
+        try:
+            rewrite = self.pending_reset \
+                or max((len(parts) for parts in self.parts.values()), default=0) >= SNAPSHOT_MAX_PARTS
+            if rewrite:
+                # source was truncated/replaced, or too many parts: start over with one part each
+                shutil.rmtree(self.cache_path, ignore_errors=True)
+                self.parts, self.saved_rows = {}, {}
+                self.pending_reset = False
+            os.makedirs(self.cache_path, exist_ok=True)
+
+            for table, df in tables.items():
+                parts = self.parts.setdefault(table, [])
+                new_rows = df.iloc[self.saved_rows.get(table, 0):]
+                if parts and new_rows.empty:
+                    continue
+                part = f"{table}-{time.time_ns()}.parquet"
+                new_rows.to_parquet(os.path.join(
+                    self.cache_path, part), index=False)
+                parts.append(part)
+                self.saved_rows[table] = len(df)
+
+            manifest = {
+                'inode': state['inode'],
+                'offset': state['offset'],
+                'header': state['header'].hex(),
+                'fingerprint': file_fingerprint(self.source_path, state['offset']),
+                'tables': self.parts,
+            }
+            # write then rename so a crash never leaves a half-written manifest
+            manifest_path = os.path.join(self.cache_path, MANIFEST_NAME)
+            with open(manifest_path + '.tmp', 'w') as f:
+                json.dump(manifest, f)
+            os.replace(manifest_path + '.tmp', manifest_path)
+            self.last_save = time.time()
+        except (OSError, ValueError, TypeError) as e:
+            # read-only output directory, unsupported column types, ...
+            print(f"[!] Disabling snapshot cache {self.cache_path}: {e}")
+            self.disabled = True
@@ -0,0 +1,88 @@
+import threading
+import time
+from typing import *
+import pandas as pd
+
+
+class StoreEntry:
+    """
+    Parsed data for one fuzzer instance (or a whole campaign when fuzzer_name is None).
+
+    Tables are replaced, never modified in place, so a reader holding a reference
+    always sees a consistent DataFrame. Writers must hold lock while refreshing so
+    concurrent sessions do not parse the same bytes twice.
+    """
+
+    def __init__(self, directory_path: str, fuzzer_name: Optional[str]):
+        self.directory_path = directory_path
+        self.fuzzer_name = fuzzer_name
+        self.lock = threading.RLock()
+        self.version = 0
+        self.tables: Dict[str, Any] = {}
+        # table -> (store version, time) of its last publish, for conditional requests
+        self.published: Dict[str, Tuple[int, float]] = {}
+        # loader state such as FileTail cursors, kept alongside the tables they feed
+        self.cursors: Dict[str, Any] = {}
+
+
+class DataStore:
+    """
+    Process-wide, versioned cache of parsed AFL++ output shared by every browser session.
+
+    Entries are keyed by campaign directory and fuzzer name. Each publish bumps a
+    global counter, so a session only needs to remember the last version it saw.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[str, Optional[str]], StoreEntry] = {}
+        self._version = 0
+
+    def entry(self, directory_path: str, fuzzer_name: Optional[str] = None) -> StoreEntry:
+        key = (directory_path, fuzzer_name)
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = StoreEntry(directory_path, fuzzer_name)
+            return self._entries[key]
+
+    def publish(self, entry: StoreEntry, table: str, value: Any):
+        with self._lock:
+            self._version += 1
+            entry.tables[table] = value
+            entry.version = self._version
+            entry.published[table] = (self._version, time.time())
+
+    def get(self, directory_path: str, fuzzer_name: Optional[str], table: str) -> Any:
+        entry = self._entries.get((directory_path, fuzzer_name))
+        if entry is None:
+            return None
+        return entry.tables.get(table)
+
+    def tables(self, directory_path: str, table: str) -> Dict[str, Any]:
+        """
+        Returns the given table of every fuzzer in a campaign, sorted by fuzzer name.
+        """
+        with self._lock:
+            entries = [e for (d, f), e in self._entries.items()
+                       if d == directory_path and f is not None and table in e.tables]
+        return {e.fuzzer_name: e.tables[table] for e in sorted(entries, key=lambda e: e.fuzzer_name)}
+
+    def published(self, directory_path: str, sources: Iterable[Tuple[Optional[str], str]]) -> Tuple[int, float]:
+        """
+        Returns the latest store version and time at which any of the given
+        (fuzzer name, table) pairs was published, (0, 0.0) if none was.
+
+        As every publish takes a new version, the result changes whenever one of
+        the tables is replaced.
+        """
+        latest = (0, 0.0)
+        with self._lock:
+            for fuzzer_name, table in sources:
+                entry = self._entries.get((directory_path, fuzzer_name))
+                if entry is not None:
+                    latest = max(latest, entry.published.get(table, latest))
+        return latest
+
+    def version(self, directory_path: str) -> int:
+        with self._lock:
+            return max((e.version for (d, _), e in self._entries.items() if d == directory_path), default=0)
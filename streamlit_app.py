@@ -2,20 +2,25 @@ import os
 import streamlit as st
 
 debug_mode = os.environ.get("DEBUG") == "1"
+# serve the JSON/Prometheus API from this process, sharing its parsed data
+api_port = os.environ.get("API_PORT")
 
 development = st.Page("development.py", title="Development", default=True)
 dashboard = st.Page("dashboard.py", title="Dashboard")
-queue = st.Page("queue.py", title="Queue")
+queue = st.Page("queue_page.py", title="Queue", url_path="queue")
 mutation_history = st.Page(
     "mutation_history.py", title="Mutation History")
 crashes_hangs = st.Page("crashes_hangs.py", title="Crashes & Hangs")
 debug = st.Page("debug.py", title="Debug")
-# bitmap = st.Page("bitmap.py", title="Bitmap")
+bitmap = st.Page("bitmap.py", title="Bitmap")
 if debug_mode:
     print("[*] Debug mode")
     pg = st.navigation([dashboard, queue, mutation_history,
-                       crashes_hangs, debug], position="top")
+                       crashes_hangs, bitmap, debug], position="top")
 else:
     pg = st.navigation([development, dashboard, queue, mutation_history,
-                       crashes_hangs], position="top")
+                       crashes_hangs, bitmap], position="top")
+if api_port:
+    from api import start_api
+    start_api(os.environ.get("API_DATA_DIRECTORY", "sample-data"), int(api_port))
 pg.run()
@@ -0,0 +1,257 @@
+import difflib
+import mmap
+import os
+from typing import *
+import numpy as np
+import pandas as pd
+import streamlit as st
+from utils import *
+from lineage import sync_source
+
+BYTES_PER_ROW = 16
+# rows of the hex view rendered at once
+VIEW_ROWS = 32
+# block compared at a time while looking for the common prefix and suffix
+COMPARE_BLOCK_SIZE = 1 << 16
+# differing middles up to this size (in both files) are aligned byte by byte
+ALIGN_LIMIT = 4096
+# bytes a deterministic stage changes from pos: onward
+OP_WIDTHS = {'flip1': 1, 'flip2': 2, 'flip4': 2, 'flip8': 1, 'flip16': 2, 'flip32': 4,
+             'arith8': 1, 'arith16': 2, 'arith32': 4, 'int8': 1, 'int16': 2, 'int32': 4}
+HIGHLIGHT_STYLE = 'background-color: rgba(255, 193, 7, 0.4)'
+
+
+class Testcase:
+    """
+    Read-only memory map of a queue entry, crash or hang. Only the pages read are
+    loaded from disk, and bytes are viewed (as a numpy array) rather than copied.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        self.size = os.fstat(self._file.fileno()).st_size
+        # empty files can not be mapped
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else None
+        self.data = np.frombuffer(self._map, dtype=np.uint8) if self._map is not None else np.empty(0, np.uint8)
+
+    def close(self):
+        # the map can only be closed once no array views it
+        self.data = None
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> 'Testcase':
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def testcase_path(directory_path: str, fuzzer_name: str, file_name: str, kind: str = 'queue') -> str:
+    """
+    Returns the local path of a fuzzer's queue, crashes or hangs entry, given its
+    file name or the path afl-fuzz wrote (e.g. in introspection.txt).
+    """
+    return os.path.join(directory_path, fuzzer_name, kind, os.path.basename(file_name))
+
+
+def parent_testcase(directory_path: str, fuzzer_name: str, file_name: str) -> Optional[Tuple[str, int, str]]:
+    """
+    Returns the fuzzer, queue id and local path of the src: parent of a queue entry,
+    crash or hang (for a sync: import, the entry it copies), or None without one.
+    """
+    decoded = decode_queue_filenames(pd.Series([os.path.basename(file_name)])).iloc[0]
+    if pd.isna(decoded['src']):
+        return None
+    source, queue_id = fuzzer_name, int(decoded['src'])
+    if pd.notna(decoded['sync']):
+        source = sync_source(fuzzer_name, decoded['sync'], get_fuzzers(directory_path))
+    corpus = get_table(directory_path, source, 'corpus')
+    if corpus is not None and queue_id in corpus.index:
+        parent_name = corpus.at[queue_id, 'filename']
+    else:
+        # not in queue_data yet, look the entry up by its id prefix
+        prefix = f"id:{queue_id:06d},"
+        try:
+            with os.scandir(os.path.join(directory_path, source, 'queue')) as entries:
+                parent_name = next((entry.name for entry in entries if entry.name.startswith(prefix)), None)
+        except OSError:
+            return None
+        if parent_name is None:
+            return None
+    return source, queue_id, testcase_path(directory_path, source, parent_name)
+
+
+def _common_prefix(a: np.ndarray, b: np.ndarray) -> int:
+    length = min(len(a), len(b))
+    for start in range(0, length, COMPARE_BLOCK_SIZE):
+        end = min(start + COMPARE_BLOCK_SIZE, length)
+        mismatches = np.flatnonzero(a[start:end] != b[start:end])
+        if len(mismatches):
+            return start + int(mismatches[0])
+    return length
+
+
+def diff_ranges(parent: np.ndarray, child: np.ndarray) -> pd.DataFrame:
+    """
+    Returns the byte ranges where child differs from parent.
+
+    Bytes are compared block by block from both ends, so only the differing middle
+    and the blocks around it are read. A same-sized middle is compared position by
+    position. Otherwise it is aligned (difflib) when small, or reported as one
+    replaced range.
+
+    Returns:
+        pd.DataFrame: One row per range with its kind (replace, insert or delete)
+        and start and end offsets in child and in parent (ends exclusive).
+    """
+    prefix = _common_prefix(parent, child)
+    limit = min(len(parent), len(child)) - prefix
+    suffix = min(_common_prefix(parent[::-1], child[::-1]), limit)
+    parent_end, child_end = len(parent) - suffix, len(child) - suffix
+    ranges = []
+    if parent_end - prefix == child_end - prefix:
+        changed = np.flatnonzero(parent[prefix:parent_end] != child[prefix:child_end])
+        if len(changed):
+            # runs of consecutive changed offsets
+            breaks = np.flatnonzero(np.diff(changed) > 1)
+            starts = changed[np.concatenate([[0], breaks + 1])] + prefix
+            ends = changed[np.concatenate([breaks, [len(changed) - 1]])] + prefix + 1
+            ranges = [('replace', start, end, start, end) for start, end in zip(starts, ends)]
+    elif max(parent_end, child_end) - prefix <= ALIGN_LIMIT:
+        matcher = difflib.SequenceMatcher(None, parent[prefix:parent_end].tobytes(),
+                                          child[prefix:child_end].tobytes(), autojunk=False)
+        ranges = [(tag, prefix + child_start, prefix + child_stop, prefix + parent_start, prefix + parent_stop)
+                  for tag, parent_start, parent_stop, child_start, child_stop in matcher.get_opcodes()
+                  if tag != 'equal']
+    else:
+        kind = 'insert' if parent_end == prefix else 'delete' if child_end == prefix else 'replace'
+        ranges = [(kind, prefix, child_end, prefix, parent_end)]
+    return pd.DataFrame(ranges, columns=['kind', 'start', 'end', 'parent_start', 'parent_end'])
+
+
+def check_mutation(file_name: str, ranges: pd.DataFrame) -> Tuple[Optional[bool], str]:
+    """
+    Cross-checks a diff against the op:, pos: and rep: fields of the entry's name.
+
+    Returns:
+        Tuple[Optional[bool], str]: Whether the diff matches (None when the name
+        does not say where the mutation is) and an explanation.
+    """
+    decoded = decode_queue_filenames(pd.Series([os.path.basename(file_name)])).iloc[0]
+    op, pos, rep = decoded['op'], decoded['pos'], decoded['rep']
+    if ranges.empty:
+        return (None if pd.isna(op) else False), "Identical to its parent"
+    if pd.notna(op) and pd.notna(pos):
+        width = OP_WIDTHS.get(op)
+        if width is None:
+            # dictionary and other stages write tokens of varying length at pos
+            consistent = bool(ranges['start'].min() >= pos)
+            return consistent, f"{op} at byte {pos}, changes start at byte {ranges['start'].min()}"
+        consistent = bool(ranges['start'].min() >= pos and ranges['end'].max() <= pos + width)
+        return consistent, (f"{op} changes bytes {pos}-{pos + width - 1}, the diff spans bytes "
+                            f"{ranges['start'].min()}-{ranges['end'].max() - 1}")
+    if pd.notna(rep):
+        return None, f"{op} stacked {rep} mutations, {len(ranges)} changed ranges"
+    return None, f"{len(ranges)} changed ranges"
+
+
+def hex_rows(data: np.ndarray, offset: int) -> pd.DataFrame:
+    """
+    Formats bytes as hex view rows of BYTES_PER_ROW bytes, starting at offset.
+    """
+    rows = -(-len(data) // BYTES_PER_ROW)
+    padded = np.full(rows * BYTES_PER_ROW, -1, dtype=np.int16)
+    padded[:len(data)] = data
+    grid = padded.reshape(rows, BYTES_PER_ROW)
+    table = {'offset': [f"{offset + row * BYTES_PER_ROW:08x}" for row in range(rows)]}
+    for column in range(BYTES_PER_ROW):
+        table[f"{column:x}"] = [f"{value:02x}" if value >= 0 else '' for value in grid[:, column]]
+    printable = np.where((grid >= 0x20) & (grid < 0x7f), grid, ord('.'))
+    table['ascii'] = [''.join(map(chr, row[row_values >= 0]))
+                      for row, row_values in zip(printable, grid)]
+    return pd.DataFrame(table)
+
+
+def highlight_ranges(rows: pd.DataFrame, offset: int, starts: Iterable[int], ends: Iterable[int]):
+    """
+    Returns a Styler of hex view rows highlighting the bytes within [starts, ends).
+    """
+    positions = offset + np.arange(len(rows) * BYTES_PER_ROW)
+    changed = np.zeros(len(positions), dtype=bool)
+    for start, end in zip(starts, ends):
+        changed |= (positions >= start) & (positions < end)
+    styles = pd.DataFrame('', index=rows.index, columns=rows.columns)
+    styles.iloc[:, 1:1 + BYTES_PER_ROW] = np.where(
+        changed.reshape(len(rows), BYTES_PER_ROW), HIGHLIGHT_STYLE, '')
+    return rows.style.apply(lambda _: styles, axis=None)
+
+
+def render_testcase(directory_path: str, fuzzer_name: str, path: str, key: str):
+    """
+    Renders a paged hex/ASCII view of a testcase, highlighting the bytes differing
+    from its src: parent, next to the same window of the parent.
+
+    Args:
+        directory_path (str): Campaign output directory.
+        fuzzer_name (str): Fuzzer owning the testcase.
+        path (str): Local path of the queue entry, crash or hang.
+        key (str): Unique widget key prefix.
+    """
+    parent = parent_testcase(directory_path, fuzzer_name, path)
+    try:
+        testcase = Testcase(path)
+    except OSError as e:
+        st.warning(f"Can not open {os.path.basename(path)}: {e.strerror}")
+        return
+    parent_case = None
+    if parent is not None:
+        try:
+            parent_case = Testcase(parent[2])
+        except OSError:
+            parent = None
+    try:
+        ranges = diff_ranges(parent_case.data, testcase.data) if parent_case is not None else None
+
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Size", f"{testcase.size:,} B")
+        if parent is not None:
+            col2.metric("Parent", f"{parent[0]}:{parent[1]}", help=os.path.basename(parent[2]),
+                        delta=f"{testcase.size - parent_case.size:+,} B", delta_color='off')
+            col3.metric("Changed ranges", len(ranges))
+            consistent, explanation = check_mutation(path, ranges)
+            if consistent is None:
+                st.info(explanation)
+            elif consistent:
+                st.success(explanation)
+            else:
+                st.warning(explanation)
+
+        window = VIEW_ROWS * BYTES_PER_ROW
+        pages = max(1, -(-max(testcase.size, parent_case.size if parent_case else 0) // window))
+        first_change = int(ranges['start'].iat[0]) if ranges is not None and not ranges.empty else 0
+        page = st.number_input(f"Page (of {pages:,}, {window} bytes each)", min_value=1, max_value=pages,
+                               value=min(first_change // window + 1, pages), key=f"{key}_{path}")
+        offset = (page - 1) * window
+
+        # only the visible window is read from either file
+        view = hex_rows(testcase.data[offset:offset + window], offset)
+        if ranges is None:
+            st.dataframe(view, hide_index=True)
+            return
+        col1, col2 = st.columns(2)
+        col1.caption("Testcase")
+        col1.dataframe(highlight_ranges(view, offset, ranges['start'], ranges['end']), hide_index=True)
+        parent_view = hex_rows(parent_case.data[offset:offset + window], offset)
+        col2.caption("Parent")
+        col2.dataframe(highlight_ranges(parent_view, offset, ranges['parent_start'], ranges['parent_end']),
+                       hide_index=True)
+        if not ranges.empty:
+            with st.expander("Changed ranges"):
+                st.dataframe(ranges, hide_index=True)
+    finally:
+        testcase.close()
+        if parent_case is not None:
+            parent_case.close()
@@ -0,0 +1,76 @@
+import os
+import sys
+
+REPOSITORY_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPOSITORY_PATH)
+
+import numpy as np
+import pandas as pd
+
+from bitmap_history import DELTA, KEYFRAME, BitmapHistory
+
+MAP_SIZE = 1024
+
+
+def packed(edges, map_size: int = MAP_SIZE) -> np.ndarray:
+    covered = np.zeros(map_size, dtype=np.uint8)
+    covered[list(edges)] = 1
+    return np.packbits(covered)
+
+
+def covered_edges(bits: np.ndarray, map_size: int = MAP_SIZE):
+    return np.flatnonzero(np.unpackbits(bits, count=map_size)).tolist()
+
+
+def record_history(file_path: str) -> BitmapHistory:
+    history = BitmapHistory(file_path)
+    assert history.record(packed([0, 5]), MAP_SIZE, timestamp=1.0)
+    assert history.record(packed([0, 5, 9]), MAP_SIZE, timestamp=2.0)
+    # unchanged maps are not recorded
+    assert not history.record(packed([0, 5, 9]), MAP_SIZE, timestamp=3.0)
+    assert history.record(packed([0, 9, 12]), MAP_SIZE, timestamp=4.0)
+    return history
+
+
+def test_history_round_trip(tmp_path):
+    file_path = os.path.join(str(tmp_path), 'fuzz_bitmap', 'history.bin')
+    recorded = record_history(file_path)
+    assert recorded.types == [KEYFRAME, DELTA, DELTA]
+
+    history = BitmapHistory(file_path)
+    assert history.times == [1.0, 2.0, 4.0]
+    assert history.covered == [2, 3, 3]
+    assert history.map_at(0.5) is None
+    bits, map_size = history.map_at(3.0)
+    assert map_size == MAP_SIZE and covered_edges(bits) == [0, 5, 9]
+    assert covered_edges(history.map_at(4.0)[0]) == [0, 9, 12]
+    assert history.edges_set_between(1.0, 4.0).tolist() == [9, 12]
+
+    first_seen = history.first_seen()
+    assert first_seen.to_dict() == {0: pd.Timestamp(1, unit='s'), 5: pd.Timestamp(1, unit='s'),
+                                    9: pd.Timestamp(2, unit='s'), 12: pd.Timestamp(4, unit='s')}
+    assert first_seen.to_dict() == recorded.first_seen().to_dict()
+
+    # recording continues from the reloaded map
+    assert not history.record(packed([0, 9, 12]), MAP_SIZE, timestamp=5.0)
+
+
+def test_history_drops_a_half_written_record(tmp_path):
+    file_path = os.path.join(str(tmp_path), 'history.bin')
+    record_history(file_path)
+    size = os.path.getsize(file_path)
+    with open(file_path, 'ab') as f:
+        f.write(b'\x01\x00\x00')
+
+    history = BitmapHistory(file_path)
+    assert os.path.getsize(file_path) == size
+    assert history.times == [1.0, 2.0, 4.0]
+
+
+def test_map_size_change_starts_a_keyframe(tmp_path):
+    history = BitmapHistory(os.path.join(str(tmp_path), 'history.bin'))
+    history.record(packed([1]), MAP_SIZE, timestamp=1.0)
+    history.record(packed([1, 100], 2048), 2048, timestamp=2.0)
+    assert history.types == [KEYFRAME, KEYFRAME]
+    assert covered_edges(*history.map_at(2.0)) == [1, 100]
+    assert history.first_seen().index.tolist() == [1, 1, 100]
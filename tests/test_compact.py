@@ -0,0 +1,48 @@
+import os
+import sys
+
+REPOSITORY_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPOSITORY_PATH)
+
+import pandas as pd
+import pytest
+
+import utils
+from compact import compact_frame
+from utils import TIME_WINDOWS, time_window_selector
+
+
+class NumberInput:
+    def number_input(self, label, min_value=None, value=None, key=None):
+        return value
+
+
+def compacted_plot_data() -> pd.DataFrame:
+    # a campaign shorter than 128 s, small enough for int8 counters
+    return compact_frame(pd.DataFrame({'relative_time': [0, 60, 100], 'edges_found': [1, 2, 3]}),
+                         'plot_data')
+
+
+def test_compact_frame_keeps_time_axes_wide():
+    plot_data = compacted_plot_data()
+    assert plot_data['relative_time'].dtype == 'int64'
+    assert plot_data['edges_found'].dtype == 'int8'
+
+
+def test_compact_frame_widens_narrowed_time_axes():
+    restored = pd.DataFrame({'relative_time': pd.Series([0, 60, 100], dtype='int8')})
+    assert compact_frame(restored, 'plot_data')['relative_time'].dtype == 'int64'
+
+
+@pytest.mark.parametrize('choice', list(TIME_WINDOWS))
+def test_time_window_of_a_compacted_table(monkeypatch, choice):
+    monkeypatch.setattr(utils.st, 'radio', lambda *args, **kwargs: choice)
+    monkeypatch.setattr(utils.st, 'columns', lambda count: [NumberInput() for _ in range(count)])
+    latest_time = compacted_plot_data()['relative_time'].iloc[-1]
+    window = time_window_selector('window', latest_time)
+    if TIME_WINDOWS[choice]:
+        assert window == (100.0 - TIME_WINDOWS[choice], 100.0)
+    elif choice == 'Custom':
+        assert window == (0.0, 100.0)
+    else:
+        assert window is None
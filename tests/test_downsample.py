@@ -0,0 +1,81 @@
+import os
+import sys
+
+REPOSITORY_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPOSITORY_PATH)
+
+import numpy as np
+
+from downsample import MinMaxTiers, minmax_indices
+
+BUCKET_SIZES = [4, 16]
+
+
+def series(n: int, start: int = 0):
+    x = np.arange(start, start + n, dtype=np.int64)
+    y = np.sin(x / 3.0)
+    return x, y
+
+
+def expected_tiers(y: np.ndarray):
+    return {size: minmax_indices(y[:(len(y) // size) * size], size) for size in BUCKET_SIZES}
+
+
+def assert_tiers(tiers: MinMaxTiers, y: np.ndarray):
+    for size, indices in expected_tiers(y).items():
+        assert np.array_equal(tiers.tiers[size], indices), size
+
+
+def test_minmax_indices_keep_each_bucket_extremes():
+    y = np.array([1.0, 9.0, 5.0, -3.0, 2.0, np.nan, 7.0])
+    # buckets [1, 9, 5, -3] and [2, nan, 7]
+    assert minmax_indices(y, 4).tolist() == [1, 3, 4, 6]
+    assert minmax_indices(y, 4, offset=10).tolist() == [11, 13, 14, 16]
+
+
+def test_update_appends_only_new_buckets():
+    tiers = MinMaxTiers(BUCKET_SIZES)
+    x, y = series(10)
+    tiers.update(x, y)
+    assert_tiers(tiers, y)
+    first_buckets = tiers.tiers[4].copy()
+
+    # rows appended to the same series extend the tiers
+    x, y = series(37)
+    tiers.update(x, y)
+    assert tiers.rows == 37
+    assert np.array_equal(tiers.tiers[4][:len(first_buckets)], first_buckets)
+    assert_tiers(tiers, y)
+
+
+def test_update_rebuilds_a_replaced_series():
+    tiers = MinMaxTiers(BUCKET_SIZES)
+    x, y = series(40)
+    tiers.update(x, y)
+
+    # shorter, e.g. plot_data truncated by a restarted fuzzer
+    x, y = series(20)
+    y = -y
+    tiers.update(x, y)
+    assert tiers.rows == 20
+    assert_tiers(tiers, y)
+
+    # as long or longer, but with different rows where the old series ended
+    x, y = series(30, start=100)
+    tiers.update(x, y)
+    assert tiers.rows == 30
+    assert_tiers(tiers, y)
+
+
+def test_select_keeps_the_extremes():
+    tiers = MinMaxTiers(BUCKET_SIZES)
+    x, y = series(1000)
+    y[123], y[777] = 50.0, -50.0
+    tiers.update(x, y)
+    selected = tiers.select(y, 0, len(y), max_points=200)
+    assert len(selected) <= 200 + 2
+    assert {0, 123, 777, 999} <= set(selected.tolist())
+    assert np.all(np.diff(selected) > 0)
+
+    # a range that fits the budget is returned at full resolution
+    assert tiers.select(y, 100, 150, max_points=200).tolist() == list(range(100, 150))
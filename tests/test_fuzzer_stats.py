@@ -0,0 +1,48 @@
+import os
+import sys
+
+REPOSITORY_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPOSITORY_PATH)
+
+import pandas as pd
+
+from utils import build_fuzzer_stats_frame, parse_fuzzer_stats
+
+FUZZER_STATS = """start_time        : 1764922820
+last_update       : 1764926440
+last_crash        : 0
+execs_done        : 1273964
+execs_per_sec     : 351.89
+bitmap_cvg        : 8.92%
+stability         : 100.00%
+afl_banner        : target
+command_line      : afl-fuzz -i in -o out -M main -- ./target -opt a:b @@
+"""
+
+
+def write_fuzzer_stats(tmp_path, content: str = FUZZER_STATS) -> str:
+    file_path = os.path.join(str(tmp_path), 'fuzzer_stats')
+    with open(file_path, 'w') as f:
+        f.write(content)
+    return file_path
+
+
+def test_parse_fuzzer_stats_keeps_colons_in_values(tmp_path):
+    stats = parse_fuzzer_stats(write_fuzzer_stats(tmp_path))
+    assert stats['command_line'] == 'afl-fuzz -i in -o out -M main -- ./target -opt a:b @@'
+    assert stats['execs_done'] == '1273964'
+    assert stats['bitmap_cvg'] == '8.92%'
+
+
+def test_fuzzer_stats_frame_types(tmp_path):
+    stats = {'main': parse_fuzzer_stats(write_fuzzer_stats(tmp_path))}
+    row = build_fuzzer_stats_frame(stats).loc['main']
+    assert row['execs_done'] == 1273964
+    assert row['execs_per_sec'] == 351.89
+    assert row['bitmap_cvg'] == 8.92
+    assert row['stability'] == 100.0
+    assert row['start_time'] == pd.Timestamp(1764922820, unit='s')
+    # 0 means the event never happened
+    assert pd.isna(row['last_crash'])
+    assert row['afl_banner'] == 'target'
+    assert row['command_line'].endswith('-opt a:b @@')
@@ -0,0 +1,34 @@
+import os
+import shutil
+import sys
+
+# the repository comes first on sys.path, as under `streamlit run`, so spawned
+# workers would import any of its modules named like a standard library one
+REPOSITORY_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPOSITORY_PATH)
+
+from ingest import IngestionService
+from snapshot_cache import MANIFEST_NAME, snapshot_path
+
+SAMPLE_FUZZERS = ['asan', 'main']
+
+
+def copy_sample_campaign(directory_path: str):
+    for fuzzer_name in SAMPLE_FUZZERS:
+        shutil.copytree(os.path.join(REPOSITORY_PATH, 'sample-data', fuzzer_name),
+                        os.path.join(directory_path, fuzzer_name),
+                        ignore=shutil.ignore_patterns('.dashboard-cache'))
+
+
+def test_run_prefetch_with_repository_first_on_path(tmp_path, capsys):
+    directory_path = str(tmp_path)
+    copy_sample_campaign(directory_path)
+
+    IngestionService(directory_path)._run_prefetch([[fuzzer_name] for fuzzer_name in SAMPLE_FUZZERS])
+
+    assert "[!]" not in capsys.readouterr().out
+    for fuzzer_name in SAMPLE_FUZZERS:
+        for source in ('plot_data', 'queue_data', 'introspection.txt'):
+            assert os.path.exists(os.path.join(snapshot_path(directory_path, fuzzer_name, source), MANIFEST_NAME))
+        # workers only parse, they must not run page code
+        assert not os.path.exists(os.path.join(directory_path, fuzzer_name, 'queue', 'index.parquet'))
@@ -0,0 +1,78 @@
+import os
+import sys
+
+REPOSITORY_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPOSITORY_PATH)
+
+import pandas as pd
+
+from lineage import Lineage
+from utils import decode_queue_filenames
+
+FUZZER_NAMES = ['asan', 'main']
+CORPORA = {
+    'main': [
+        'id:000000,time:0,execs:0,orig:a',
+        'id:000001,src:000000,time:1,execs:1,op:havoc,rep:2,+cov',
+        'id:000002,src:000001,time:2,execs:2,op:flip1,pos:0',
+        'id:000003,src:000001,time:3,execs:3,op:havoc,rep:4,+cov',
+        'id:000004,src:000000+000002,time:4,execs:4,op:splice,rep:2',
+    ],
+    'asan': [
+        'id:000000,time:0,execs:0,orig:b',
+        # copy of main:3
+        'id:000001,sync:main,src:000003',
+        'id:000002,src:000001,time:5,execs:5,op:havoc,rep:2,+cov',
+    ],
+}
+# (fuzzer, id) -> (descendants, cov_descendants)
+EXPECTED = {
+    ('main', 0): (6, 3),
+    ('main', 1): (4, 2),
+    ('main', 2): (0, 0),
+    ('main', 3): (2, 1),
+    ('main', 4): (0, 0),
+    ('asan', 0): (0, 0),
+    ('asan', 1): (1, 1),
+    ('asan', 2): (0, 0),
+}
+
+
+def corpus(fuzzer_name: str, rows: slice = slice(None)) -> pd.DataFrame:
+    return decode_queue_filenames(pd.Series(CORPORA[fuzzer_name][rows])).set_index('id')
+
+
+def descendant_counts(lineage: Lineage) -> dict:
+    nodes = [lineage.node(fuzzer_name, queue_id) for fuzzer_name, queue_id in EXPECTED]
+    described = lineage.describe(nodes)
+    return {(row.fuzzer, row.id): (row.descendants, row.cov_descendants)
+            for row in described.itertuples(index=False)}
+
+
+def test_descendant_counts():
+    lineage = Lineage()
+    for fuzzer_name in ['main', 'asan']:
+        assert lineage.update(fuzzer_name, corpus(fuzzer_name), FUZZER_NAMES)
+    assert descendant_counts(lineage) == EXPECTED
+    splice = lineage.describe([lineage.node('main', 4)]).iloc[0]
+    assert splice['splice_parent'] == 'main:2'
+    ancestry = lineage.describe(lineage.ancestors(lineage.node('asan', 2)))
+    assert list(zip(ancestry['fuzzer'], ancestry['id'])) == [
+        ('asan', 2), ('asan', 1), ('main', 3), ('main', 1), ('main', 0)]
+
+
+def test_descendant_counts_with_imports_and_rows_added_out_of_order():
+    lineage = Lineage()
+    # the import arrives before the entry it copies, and main's rows in two batches
+    assert lineage.update('asan', corpus('asan'), FUZZER_NAMES)
+    assert lineage.update('main', corpus('main', slice(0, 2)), FUZZER_NAMES)
+    assert lineage.update('main', corpus('main'), FUZZER_NAMES)
+    assert descendant_counts(lineage) == EXPECTED
+    nodes, depths = lineage.subtree(lineage.node('main', 1))
+    assert sorted(zip(depths, lineage.describe(nodes)['id'])) == [(0, 1), (1, 2), (1, 3), (2, 1), (3, 2)]
+
+
+def test_replaced_corpus_asks_for_a_rebuild():
+    lineage = Lineage()
+    assert lineage.update('main', corpus('main'), FUZZER_NAMES)
+    assert not lineage.update('main', corpus('main', slice(0, 2)), FUZZER_NAMES)
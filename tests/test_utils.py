@@ -0,0 +1,121 @@
+import os
+import shutil
+import sys
+
+REPOSITORY_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPOSITORY_PATH)
+
+import pandas as pd
+
+from utils import decode_queue_filenames, get_queue_entry, get_table, refresh_plot_data, refresh_queue_data
+
+PLOT_DATA_HEADER = (b"# relative_time, cycles_done, cur_item, corpus_count, pending_total, pending_favs, "
+                    b"map_size, saved_crashes, saved_hangs, max_depth, execs_per_sec, total_execs, "
+                    b"edges_found, total_crosshits\n")
+PLOT_DATA_LINE = b"1, 0, 0, 1, 1, 1, 0.01%, 0, 0, 1, 100.00, 100, 10, 0\n"
+QUEUE_DATA_HEADER = (b"# filename, length, exec_us, selected, skipped, mutations, finds, crashes, timeouts, "
+                     b"bitmap_size, perf_score, weight, colorized, favored, disabled\n")
+
+
+def write_plot_data(directory_path: str, content: bytes):
+    os.makedirs(os.path.join(directory_path, 'main'), exist_ok=True)
+    with open(os.path.join(directory_path, 'main', 'plot_data'), 'ab') as f:
+        f.write(content)
+
+
+def test_plot_data_with_only_a_partial_line_keeps_the_header_columns(tmp_path):
+    directory_path = str(tmp_path)
+    # afl-fuzz is still writing the first data line
+    write_plot_data(directory_path, PLOT_DATA_HEADER + PLOT_DATA_LINE[:5])
+    refresh_plot_data(directory_path, 'main')
+    plot_data = get_table(directory_path, 'main', 'plot_data')
+    assert plot_data.empty
+    assert {'relative_time', 'edges_found'} <= set(plot_data.columns)
+
+    write_plot_data(directory_path, PLOT_DATA_LINE[5:])
+    refresh_plot_data(directory_path, 'main')
+    plot_data = get_table(directory_path, 'main', 'plot_data')
+    assert plot_data['edges_found'].tolist() == [10]
+
+
+def test_plot_data_with_a_partial_header_is_not_published(tmp_path):
+    directory_path = str(tmp_path)
+    write_plot_data(directory_path, PLOT_DATA_HEADER[:20])
+    refresh_plot_data(directory_path, 'main')
+    assert get_table(directory_path, 'main', 'plot_data') is None
+
+
+def test_empty_queue_data_is_not_published(tmp_path):
+    directory_path = str(tmp_path)
+    os.makedirs(os.path.join(directory_path, 'main'))
+    open(os.path.join(directory_path, 'main', 'queue_data'), 'wb').close()
+    refresh_queue_data(directory_path, 'main')
+    assert get_table(directory_path, 'main', 'queue_data') is None
+    assert get_table(directory_path, 'main', 'corpus') is None
+
+
+def test_rewritten_queue_data_with_a_partial_header_empties_the_corpus(tmp_path):
+    directory_path = str(tmp_path)
+    shutil.copytree(os.path.join(REPOSITORY_PATH, 'sample-data', 'main'), os.path.join(directory_path, 'main'),
+                    ignore=shutil.ignore_patterns('.dashboard-cache'))
+    queue_data_path = os.path.join(directory_path, 'main', 'queue_data')
+    refresh_queue_data(directory_path, 'main')
+    assert not get_table(directory_path, 'main', 'corpus').empty
+
+    with open(queue_data_path, 'rb') as f:
+        header = f.readline()
+    os.remove(queue_data_path)
+    with open(queue_data_path, 'wb') as f:
+        f.write(header[:10])
+    refresh_queue_data(directory_path, 'main')
+    corpus = get_table(directory_path, 'main', 'corpus')
+    assert corpus.empty and 'filename' in corpus.columns
+
+
+def test_decode_queue_filenames():
+    decoded = decode_queue_filenames(pd.Series([
+        '/out/main/queue/id:000003,src:000001+000002,time:120,execs:50,op:splice,rep:4,+cov',
+        'id:000005,sync:asan,src:000002',
+        'id:000000,time:0,execs:0,orig:seed,with,commas',
+        'id:000000,sig:11,src:000001,time:5,execs:9,op:havoc,rep:2',
+        'id:000007,src:000003,time:9,execs:9,op:flip1,pos:4,val:+1',
+        'README.txt',
+    ]))
+    assert decoded['id'].tolist() == [3, 5, 0, 0, 7, -1]
+    splice = decoded.iloc[0]
+    assert (splice['src'], splice['src_splice'], splice['time'], splice['execs']) == (1, 2, 120, 50)
+    assert (splice['op'], splice['rep'], splice['cov']) == ('splice', 4, True)
+    assert decoded.at[1, 'sync'] == 'asan' and decoded.at[1, 'src'] == 2 and not decoded.at[1, 'cov']
+    assert decoded.at[2, 'orig'] == 'seed,with,commas' and pd.isna(decoded.at[2, 'src'])
+    assert decoded.at[3, 'sig'] == 11 and decoded.at[3, 'op'] == 'havoc'
+    assert (decoded.at[4, 'pos'], decoded.at[4, 'val']) == (4, '+1')
+    assert pd.isna(decoded.at[5, 'op'])
+
+
+def write_queue_data(directory_path: str, ids, finds: int = 0):
+    os.makedirs(os.path.join(directory_path, 'main'), exist_ok=True)
+    queue_data_path = os.path.join(directory_path, 'main', 'queue_data')
+    with open(queue_data_path, 'ab') as f:
+        if not os.path.getsize(queue_data_path):
+            f.write(QUEUE_DATA_HEADER)
+        for queue_id in ids:
+            f.write(f'"/out/main/queue/id:{queue_id:06d},src:000000,time:{queue_id},execs:1,op:havoc,rep:2",'
+                    f'10,100,0,0,0,{finds},0,0,5,100.000,1.000,0,0,0\n'.encode())
+
+
+def test_get_queue_entry(tmp_path):
+    directory_path = str(tmp_path)
+    # id 2 is missing, so later ids are not their own position
+    write_queue_data(directory_path, [0, 1, 3])
+    refresh_queue_data(directory_path, 'main')
+    assert get_queue_entry(directory_path, 'main', 1)['time'] == 1
+    assert get_queue_entry(directory_path, 'main', 3)['time'] == 3
+    assert get_queue_entry(directory_path, 'main', 2) is None
+    assert get_queue_entry(directory_path, 'main', 4) is None
+    assert get_queue_entry(directory_path, 'other', 0) is None
+
+    # a later row of the same entry replaces the earlier one
+    write_queue_data(directory_path, [1], finds=7)
+    refresh_queue_data(directory_path, 'main')
+    assert get_queue_entry(directory_path, 'main', 1)['finds'] == 7
+    assert len(get_table(directory_path, 'main', 'corpus')) == 3
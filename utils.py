@@ -1,169 +1,992 @@
 import pandas as pd
+import numpy as np
 import os
+import io
 from typing import *
-import glob
 import streamlit as st
 from stqdm import stqdm
-import logging
 import time
 from datetime import datetime
+from store import DataStore, StoreEntry
+from snapshot_cache import SnapshotCache, snapshot_path
+from downsample import MinMaxTiers
+from compact import compact_frame, concat_frames, frame_bytes
+from profiling import profiled, profile_span
 
 
-# logging configuration
-logging.basicConfig(
-    filename='logs/utils.log',
-    level=logging.INFO,
-    format='%(asctime)s,%(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S',
-    filemode='a'
-)
-logger = logging.getLogger()
+# charts are assumed to be at most this many pixels wide; two points per pixel
+# (a min and a max) is all a line trace can show
+CHART_WIDTH = 800
+MAX_POINTS_PER_TRACE = 2 * CHART_WIDTH
 
+# time windows offered by time_window_selector, in seconds
+TIME_WINDOWS = {
+    'All': None,
+    'Last 10 min': 600,
+    'Last hour': 3600,
+    'Last 24 hours': 86400,
+    'Custom': None,
+}
 
-def load_fuzzer_stats(directory_path: str) -> pd.DataFrame:
+# fuzzer_stats keys holding epoch seconds, 0 meaning "never"
+FUZZER_STATS_TIMESTAMPS = ['start_time',
+                           'last_update', 'last_find', 'last_crash', 'last_hang']
+
+
+def parse_fuzzer_stats(file_path: str) -> Dict[str, str]:
     """
-    Loads and combines fuzzer_stats files into a single DataFrame.
+    Parses a fuzzer_stats file into raw key/value strings.
+
+    Only the first colon separates key and value, so values such as
+    command_line keep their own colons.
+
+    Args:
+        file_path (str): Path to a fuzzer_stats file.
+
+    Returns:
+        Dict[str, str]: Stripped values keyed by stat name.
+    """
+    stats = {}
+    with open(file_path) as f:
+        for line in f:
+            key, sep, value = line.partition(':')
+            if sep:
+                stats[key.strip()] = value.strip()
+    return stats
+
+
+def build_fuzzer_stats_frame(stats: Dict[str, Dict[str, str]]) -> pd.DataFrame:
+    """
+    Converts raw fuzzer_stats values into one typed DataFrame.
+
+    Counters become ints, rates floats, percentages (e.g. "8.92%") floats and
+    epoch timestamps datetimes (NaT when 0). Other values stay strings.
 
     Args:
-        file_paths (List[str]): List of file paths to fuzzer_stats files.
+        stats (Dict[str, Dict[str, str]]): Raw stats keyed by fuzzer name.
 
     Returns:
         pd.DataFrame: DataFrame indexed by fuzzer name.
     """
-    start_time = time.time()
-    fuzzer_stats_dfs = {}
+    df = pd.DataFrame.from_dict(stats, orient='index').sort_index()
+    for column in df.columns:
+        values = df[column]
+        if column in FUZZER_STATS_TIMESTAMPS:
+            seconds = pd.to_numeric(values, errors='coerce')
+            df[column] = pd.to_datetime(seconds.where(seconds > 0), unit='s')
+        elif values.str.endswith('%').all():
+            df[column] = pd.to_numeric(
+                values.str.rstrip('%'), errors='coerce')
+        else:
+            converted = pd.to_numeric(values, errors='coerce')
+            # keep text values such as afl_banner or command_line as they are
+            if converted.notna().sum() == values.notna().sum():
+                df[column] = converted
+    return df
 
-    file_paths = glob.glob(os.path.join(directory_path, "*", "fuzzer_stats"))
 
-    for file_path in file_paths:
-        directory_name = os.path.dirname(file_path)
-        # fuzzer name e.g. main, asan, bsan
-        base_name = os.path.basename(directory_name)
-        df = pd.read_csv(file_path, sep=':', header=None)
+@profiled(rows=len)
+def load_fuzzer_stats(directory_path: str) -> pd.DataFrame:
+    """
+    Loads and combines fuzzer_stats files into a single DataFrame.
 
-        # Clean and transpose the key-value pairs so each fuzzer's stats is a row
-        df[0] = df[0].str.strip()
-        df[1] = df[1].str.strip()
-        df = df.set_index(0).T
-        df.index = [base_name]
-        fuzzer_stats_dfs[base_name] = df
+    Args:
+        directory_path (str): Campaign output directory containing one directory per fuzzer.
 
-    combined_fuzzer_stats_df = pd.concat(fuzzer_stats_dfs.values())
-    run_time_sec = pd.to_numeric(
-        combined_fuzzer_stats_df['run_time'], errors='coerce').fillna(0).astype(int)
-    combined_fuzzer_stats_df['run_time'] = run_time_sec.apply(
-        lambda x: f"{x//60}:{x % 60}")
+    Returns:
+        pd.DataFrame: Typed DataFrame indexed by fuzzer name.
+    """
+    stats = {}
+    # fuzzer name e.g. main, asan, bsan
+    for base_name in get_fuzzers(directory_path, 'fuzzer_stats'):
+        stats[base_name] = parse_fuzzer_stats(
+            os.path.join(directory_path, base_name, 'fuzzer_stats'))
 
-    logger.info(f"load_fuzzer_stats,{time.time() - start_time}")
+    combined_fuzzer_stats_df = build_fuzzer_stats_frame(stats)
     return combined_fuzzer_stats_df
 
-# Currently not in use. Refer to commit 7186c0f157a33a72c8aab2bd514ef7ef4910c876.
-# def load_plot_data(directory_path: str, skip_rows: int = 0) -> Dict:
-#     plot_data_dfs = {}
-#     file_paths = glob.glob(os.path.join(directory_path, "*", "plot_data"))
-
-#     for file_path in file_paths:
-#         base_name = os.path.basename(os.path.dirname(file_path))
 
-#         # only read new rows not previously stored in session state
-#         if skip_rows > 0:
-#             df = pd.read_csv(file_path, skiprows=range(1, skip_rows + 1))
-#         else:
-#             df = pd.read_csv(file_path)
+class FileTail:
+    """
+    Byte-offset cursor over an append-only CSV file such as plot_data or queue_data.
 
-#         df.columns = df.columns.str.strip()
-#         df.rename(columns={df.columns[0]: 'relative_time'}, inplace=True)
-#         plot_data_dfs[base_name] = df
+    Remembers the inode and the offset of the last complete line consumed so
+    each read only touches bytes written since the previous one. A partially
+    written trailing line is left for the next read. If the file is replaced
+    (inode change) or truncated (size below the saved offset), the cursor
+    rewinds and the next read starts from the beginning of the file.
+    """
 
-#     return plot_data_dfs
+    def __init__(self, file_path: str, has_header: bool = True):
+        self.file_path = file_path
+        self.has_header = has_header
+        self.inode = None
+        self.offset = 0
+        self.header = b''
+
+    def reset(self):
+        self.inode = None
+        self.offset = 0
+        self.header = b''
+
+    def state(self) -> Dict:
+        return {'inode': self.inode, 'offset': self.offset, 'header': self.header}
+
+    def restore(self, state: Dict):
+        self.inode = state['inode']
+        self.offset = state['offset']
+        self.header = state['header']
+
+    def read(self, max_bytes: Optional[int] = None) -> Tuple[bytes, bool]:
+        """
+        Reads the complete lines appended since the last call.
+
+        Args:
+            max_bytes (int, optional): Read at most this many bytes, leaving the
+                rest for the next call. Used to stream very large files in blocks.
+
+        Returns:
+            Tuple[bytes, bool]: New complete lines (header excluded), and whether
+            they start from the beginning of the file, in which case previously
+            loaded rows must be discarded.
+        """
+        stat = os.stat(self.file_path)
+        if self.inode is not None and (stat.st_ino != self.inode or stat.st_size < self.offset):
+            self.reset()
+        self.inode = stat.st_ino
+        from_start = self.offset == 0
+
+        if stat.st_size == self.offset:
+            return b'', from_start
+
+        with open(self.file_path, 'rb') as f:
+            f.seek(self.offset)
+            size = stat.st_size - self.offset
+            chunk = f.read(size if max_bytes is None else min(size, max_bytes))
+            if b'\n' not in chunk and len(chunk) < size:
+                # single line longer than max_bytes
+                chunk += f.read(size - len(chunk))
+
+        # only consume up to the last newline, AFL++ may be mid-write
+        end = chunk.rfind(b'\n') + 1
+        chunk = chunk[:end]
+        self.offset += end
+
+        if self.has_header and not self.header and chunk:
+            header_end = chunk.find(b'\n') + 1
+            self.header = chunk[:header_end]
+            chunk = chunk[header_end:]
+
+        return chunk, from_start
+
+
+def parse_csv_chunk(header: bytes, chunk: bytes, first_column: str) -> pd.DataFrame:
+    """
+    Parses a block of complete CSV lines using a previously read header line.
 
+    Args:
+        header (bytes): Header line of the file, e.g. "# relative_time, cycles_done, ...".
+        chunk (bytes): Complete data lines following the header.
+        first_column (str): Name to give the first column (its header starts with "#").
 
-def load_plot_data(file_path: str, skip_rows: int = 0) -> pd.DataFrame:
-    start_time = time.time()
-    if skip_rows > 0:
-        df = pd.read_csv(file_path, skiprows=range(1, skip_rows + 1))
-    else:
-        df = pd.read_csv(file_path)
+    Returns:
+        pd.DataFrame: Parsed rows. Without any, an empty frame with the header's
+        columns, or with no columns if the header line is not fully written yet.
+    """
+    if not header:
+        # header line not fully written yet
+        return pd.DataFrame()
+    # without a complete data line this parses the header alone, keeping its columns
+    df = pd.read_csv(io.BytesIO(header + chunk))
     df.columns = df.columns.str.strip()
-    df.rename(columns={df.columns[0]: 'relative_time'}, inplace=True)
-    logger.info(f"load_plot_data,{time.time() - start_time}")
+    df.rename(columns={df.columns[0]: first_column}, inplace=True)
     return df
 
 
-def load_queue_data(file_path: str, skip_rows: int = 0) -> pd.DataFrame:
-    start_time = time.time()
-    if skip_rows > 0:
-        df = pd.read_csv(file_path, skiprows=range(1, skip_rows + 1))
-    else:
-        df = pd.read_csv(file_path)
-    df.columns = df.columns.str.strip()
-    df.rename(columns={df.columns[0]: 'filename'}, inplace=True)
-    logger.info(f"load_queue_data,{time.time() - start_time}")
+def load_plot_data(file_path: str, tail: Optional[FileTail] = None) -> Tuple[pd.DataFrame, bool]:
+    """
+    Loads the rows of a plot_data file not yet consumed by tail.
+
+    Args:
+        file_path (str): Path to the plot_data file.
+        tail (FileTail, optional): Cursor to resume from. A fresh cursor reads the whole file.
+
+    Returns:
+        Tuple[pd.DataFrame, bool]: New rows, and whether they replace previously loaded rows.
+    """
+    with profile_span('load_plot_data') as span:
+        tail = tail or FileTail(file_path)
+        chunk, from_start = tail.read()
+        df = compact_frame(parse_csv_chunk(tail.header, chunk, 'relative_time'), 'plot_data')
+        span.rows, span.bytes = len(df), len(chunk)
+    return df, from_start
+
+
+def load_queue_data(file_path: str, tail: Optional[FileTail] = None) -> Tuple[pd.DataFrame, bool]:
+    """
+    Loads the rows of a queue_data file not yet consumed by tail.
+
+    Args:
+        file_path (str): Path to the queue_data file.
+        tail (FileTail, optional): Cursor to resume from. A fresh cursor reads the whole file.
+
+    Returns:
+        Tuple[pd.DataFrame, bool]: New rows, and whether they replace previously loaded rows.
+    """
+    with profile_span('load_queue_data') as span:
+        tail = tail or FileTail(file_path)
+        chunk, from_start = tail.read()
+        df = compact_frame(parse_csv_chunk(tail.header, chunk, 'filename'), 'queue_data')
+        span.rows, span.bytes = len(df), len(chunk)
+    return df, from_start
+
+
+# AFL++ queue/crash/hang filename grammar, e.g.
+#   id:000376,src:000000,time:777,execs:3068,op:flip1,pos:9,+cov
+#   id:001346,sync:main,src:001306,+cov
+#   id:000123,src:000011+000092,time:..,execs:..,op:splice,rep:4
+#   id:000000,time:0,execs:0,orig:seed_name
+#   id:000000,sig:11,src:000042,time:..,execs:..,op:havoc,rep:2  (crashes)
+QUEUE_FILENAME_PATTERN = (
+    r'^id:(?P<id>\d+)'
+    r'(?:,sig:(?P<sig>\d+))?'
+    r'(?:,sync:(?P<sync>[^,]+))?'
+    r'(?:,src:(?P<src>\d+)(?:\+(?P<src_splice>\d+))?)?'
+    r'(?:,time:(?P<time>\d+))?'
+    r'(?:,execs:(?P<execs>\d+))?'
+    r'(?:,orig:(?P<orig>.*))?'
+    r'(?:,op:(?P<op>[^,]+))?'
+    r'(?:,pos:(?P<pos>\d+))?'
+    r'(?:,val:(?P<val>[^,]+))?'
+    r'(?:,rep:(?P<rep>\d+))?'
+)
+QUEUE_FILENAME_INT_COLUMNS = ['sig', 'src', 'src_splice', 'time', 'execs', 'pos', 'rep']
+QUEUE_FILENAME_CATEGORY_COLUMNS = ['sync', 'op', 'val']
+
+
+def decode_queue_filenames(filenames: pd.Series) -> pd.DataFrame:
+    """
+    Decodes AFL++ queue, crash or hang filenames (or full paths) into typed columns.
+
+    Args:
+        filenames (pd.Series): Filenames or paths such as queue_data's filename column.
+
+    Returns:
+        pd.DataFrame: One row per filename, aligned with filenames' index, with columns
+        id (int), sig/src/src_splice/time/execs/pos/rep (nullable ints, src_splice being
+        the second parent of a splice), sync/op/val (categorical), orig (str) and
+        cov (bool, the "+cov" flag).
+    """
+    names = filenames.str.rsplit('/', n=1).str[-1]
+    df = names.str.extract(QUEUE_FILENAME_PATTERN)
+    df['id'] = pd.to_numeric(df['id'], errors='coerce').fillna(-1).astype('int64')
+    for column in QUEUE_FILENAME_INT_COLUMNS:
+        df[column] = pd.to_numeric(df[column], errors='coerce').astype('Int64')
+    for column in QUEUE_FILENAME_CATEGORY_COLUMNS:
+        df[column] = df[column].astype('category')
+    df['cov'] = names.str.endswith(',+cov').astype(bool)
     return df
 
 
-def update_session_fuzzer_stats(directory_path):
-    start_time = time.time()
-    st.session_state.fuzzer_stats = load_fuzzer_stats(directory_path)
-    logger.info(f"update_session_fuzzer_stats,{time.time() - start_time}")
+def build_corpus_table(queue_data: pd.DataFrame, existing: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    Joins decoded filename columns onto queue_data rows and indexes them by queue id.
 
+    Args:
+        queue_data (pd.DataFrame): New queue_data rows.
+        existing (pd.DataFrame, optional): Previously built corpus table to extend.
+            Rows with an id already present are replaced by the newer row.
 
-def update_session_plot_data(directory_path):
-    start_time = time.time()
-    for file_path in stqdm(glob.glob(os.path.join(directory_path, "*", "plot_data")), desc="Updating plot data"):
-        base_name = os.path.basename(os.path.dirname(file_path))
-        if base_name not in st.session_state or 'plot_data' not in st.session_state[base_name]:
-            plot_data = load_plot_data(file_path)
-            st.session_state[base_name] = {
-                'plot_data': plot_data,
-                'plot_data_len': len(plot_data)
-            }
+    Returns:
+        pd.DataFrame: Corpus table indexed by (unique, sorted) queue id.
+    """
+    decoded = decode_queue_filenames(queue_data['filename'])
+    corpus = compact_frame(pd.concat([queue_data, decoded], axis=1).set_index('id'), 'corpus')
+    if existing is not None and not existing.empty:
+        corpus = concat_frames([existing, corpus], ignore_index=False)
+    corpus = corpus[~corpus.index.duplicated(keep='last')]
+    if not corpus.index.is_monotonic_increasing:
+        corpus = corpus.sort_index()
+    return corpus
+
+
+# e.g. "[00:01:24] fuzz 0 (0), find 87/143 among 4375(1.99) and spend 9/74(11.46),
+#       cover 21.83 yet, 955/47 undet bits, continue 0."
+PLOT_DET_DATA_PATTERN = (
+    r'^\[(?P<hours>\d+):(?P<minutes>\d+):(?P<seconds>\d+)\] '
+    r'fuzz (?P<fuzz>\d+) \((?P<fuzz_flag>\d+)\), '
+    r'find (?P<find>\d+)/(?P<find_total>\d+) among (?P<among>\d+)\((?P<among_ratio>[\d.]+)\) '
+    r'and spend (?P<spend>\d+)/(?P<spend_total>\d+)\((?P<spend_ratio>[\d.]+)\), '
+    r'cover (?P<cover>[\d.]+) yet, '
+    r'(?P<undet_bits>\d+)/(?P<undet_bits_total>\d+) undet bits, '
+    r'continue (?P<continue>\d+)'
+)
+
+
+def load_plot_det_data(file_path: str, tail: Optional[FileTail] = None) -> Tuple[pd.DataFrame, bool]:
+    """
+    Loads the deterministic stage records of a plot_det_data file not yet consumed by tail.
+
+    Args:
+        file_path (str): Path to the plot_det_data file.
+        tail (FileTail, optional): Headerless cursor to resume from. A fresh cursor reads the whole file.
+
+    Returns:
+        Tuple[pd.DataFrame, bool]: New rows (relative_time in seconds followed by the numbers of
+        each line, named after the word before them), and whether they replace previously loaded rows.
+    """
+    with profile_span('load_plot_det_data') as span:
+        tail = tail or FileTail(file_path, has_header=False)
+        chunk, from_start = tail.read()
+        lines = pd.Series(chunk.decode(errors='replace').splitlines(), dtype=object)
+        df = lines.str.extract(PLOT_DET_DATA_PATTERN).dropna(subset=['hours'])
+        df = df.apply(pd.to_numeric).reset_index(drop=True)
+        df.insert(0, 'relative_time', df.pop('hours') * 3600 +
+                  df.pop('minutes') * 60 + df.pop('seconds'))
+        df = compact_frame(df, 'plot_det_data')
+        span.rows, span.bytes = len(df), len(chunk)
+    return df, from_start
+
+
+# introspection.txt is streamed in blocks of this size to bound memory on multi-GB logs
+INTROSPECTION_BLOCK_SIZE = 64 * 1024 * 1024
+INTROSPECTION_CYCLE_COLUMNS = ['cycle', 'cycle_wo_finds',
+                               'time_wo_finds', 'expand_havoc', 'queue']
+
+
+def parse_introspection_chunk(chunk: bytes) -> Dict[str, pd.DataFrame]:
+    """
+    Parses complete introspection.txt lines into one DataFrame per record type.
+
+    Record types:
+        QUEUE <parent> <mutations> = <result>: a new queue entry ("queue").
+        UNIQUE_CRASH / UNIQUE_TIMEOUT <parent> <mutations>: a new crash or hang ("unique").
+        CYCLE cycle=.. cycle_wo_finds=.. ...: a finished queue cycle ("cycles").
+
+    Args:
+        chunk (bytes): Complete lines of an introspection.txt file.
+
+    Returns:
+        Dict[str, pd.DataFrame]: DataFrames keyed by "queue", "unique" and "cycles".
+    """
+    queue_columns = {'original': [], 'mutation': [], 'result': []}
+    unique_columns = {'type': [], 'original': [], 'mutation': []}
+    cycle_columns = {column: [] for column in INTROSPECTION_CYCLE_COLUMNS}
+
+    for line in chunk.decode(errors='replace').splitlines():
+        record_type, _, line = line.strip().partition(' ')
+        if record_type == 'QUEUE':
+            # Split at the first '='
+            left, sep, right = line.partition('=')
+            if not sep:
+                continue
+            # Split left at the first space to get mutation history
+            orig_info, _, mutation = left.strip().partition(' ')
+            queue_columns['original'].append(orig_info)
+            queue_columns['mutation'].append(mutation)
+            queue_columns['result'].append(right.strip())
+        elif record_type in ('UNIQUE_CRASH', 'UNIQUE_TIMEOUT'):
+            orig_info, _, mutation = line.partition(' ')
+            unique_columns['type'].append(record_type)
+            unique_columns['original'].append(orig_info)
+            unique_columns['mutation'].append(mutation)
+        elif record_type == 'CYCLE':
+            values = dict(field.partition('=')[::2] for field in line.split())
+            for column in INTROSPECTION_CYCLE_COLUMNS:
+                cycle_columns[column].append(values.get(column))
+
+    cycles = pd.DataFrame(cycle_columns)
+    for column in INTROSPECTION_CYCLE_COLUMNS:
+        values = pd.to_numeric(cycles[column], errors='coerce')
+        # keep ints (also for empty blocks) so blocks concatenate without upcasting
+        cycles[column] = values.astype('int64') if values.notna().all() else values
+    return {
+        'queue': pd.DataFrame(queue_columns),
+        'unique': pd.DataFrame(unique_columns),
+        'cycles': cycles,
+    }
+
+
+def load_introspection(file_path: str, tail: Optional[FileTail] = None) -> Tuple[Dict[str, pd.DataFrame], bool]:
+    """
+    Streams the records of an introspection.txt file not yet consumed by tail.
+
+    Args:
+        file_path (str): Path to the introspection.txt file.
+        tail (FileTail, optional): Headerless cursor to resume from. A fresh cursor reads the whole file.
+
+    Returns:
+        Tuple[Dict[str, pd.DataFrame], bool]: New records per type (see parse_introspection_chunk),
+        and whether they replace previously loaded records.
+    """
+    with profile_span('load_introspection') as span:
+        tail = tail or FileTail(file_path, has_header=False)
+        chunk, from_start = tail.read(INTROSPECTION_BLOCK_SIZE)
+        blocks = [parse_introspection_chunk(chunk)]
+        span.bytes = len(chunk)
+        while chunk:
+            chunk, _ = tail.read(INTROSPECTION_BLOCK_SIZE)
+            if chunk:
+                blocks.append(parse_introspection_chunk(chunk))
+                span.bytes += len(chunk)
+
+        records = {record_type: compact_frame(concat_frames([block[record_type] for block in blocks]),
+                                              f"introspection_{record_type}")
+                   for record_type in blocks[0]}
+        span.rows = sum(len(df) for df in records.values())
+    return records, from_start
+
+
+@st.cache_resource
+def get_data_store() -> DataStore:
+    """
+    Returns the process-wide DataStore shared by every session and page.
+    """
+    return DataStore()
+
+
+# entries AFL++ creates early in every instance directory, telling them apart
+# from unrelated directories in the campaign output
+FUZZER_MARKERS = {'fuzzer_stats', 'fuzzer_setup', 'queue'}
+
+
+def scan_fuzzer_directory(fuzzer_path: str) -> Optional[FrozenSet[str]]:
+    """
+    Returns the names of the artifacts in a fuzzer directory, or None if it is not one.
+    """
+    try:
+        names = frozenset(os.listdir(fuzzer_path))
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    return names if names & FUZZER_MARKERS else None
+
+
+def scan_campaign_entry(directory_path: str, name: str) -> Dict[str, FrozenSet[str]]:
+    """
+    Returns the instances found under a top-level entry of the campaign directory:
+    the entry itself if it is a fuzzer directory, or the fuzzer directories inside
+    it, named "<node>/<fuzzer>", if it is a node directory (e.g. one host's out/
+    rsynced next to the others).
+    """
+    artifacts = scan_fuzzer_directory(os.path.join(directory_path, name))
+    if artifacts is not None:
+        return {name: artifacts}
+    try:
+        children = os.listdir(os.path.join(directory_path, name))
+    except (FileNotFoundError, NotADirectoryError):
+        return {}
+    instances = {}
+    for child in children:
+        if child.startswith('.'):
+            continue
+        artifacts = scan_fuzzer_directory(
+            os.path.join(directory_path, name, child))
+        if artifacts is not None:
+            instances[f"{name}/{child}"] = artifacts
+    return instances
+
+
+@profiled()
+def refresh_fuzzer_registry(directory_path: str, names: Optional[Iterable[str]] = None):
+    """
+    Updates the campaign's fuzzers table (fuzzer name -> names of its artifacts).
+
+    The campaign directory may hold fuzzer directories, node directories holding
+    fuzzer directories (registered as "<node>/<fuzzer>"), or both. The table is
+    replaced, never modified in place, so every reader iterates one consistent
+    snapshot of the fuzzer set even while instances are starting.
 
+    Args:
+        directory_path (str): Campaign output directory.
+        names (Iterable[str], optional): Top-level entries or "<node>/<fuzzer>" instances
+            to rescan, e.g. those a directory event was seen for. Rescans the whole
+            campaign if omitted.
+    """
+    store = get_data_store()
+    entry = store.entry(directory_path)
+    with entry.lock:
+        fuzzers = entry.tables.get('fuzzers')
+        if names is None or fuzzers is None:
+            try:
+                names = [name for name in os.listdir(directory_path)
+                         if not name.startswith('.')]
+            except FileNotFoundError:
+                names = []
+            registry = {}
         else:
-            existing_plot_data = st.session_state[base_name]['plot_data']
-            existing_plot_data_len = st.session_state[base_name]['plot_data_len']
-            new_plot_data = load_plot_data(
-                file_path, skip_rows=existing_plot_data_len)
+            registry = dict(fuzzers)
+
+        for name in names:
+            if '/' in name:
+                artifacts = scan_fuzzer_directory(
+                    os.path.join(directory_path, name))
+                instances = {} if artifacts is None else {name: artifacts}
+                stale = [name]
+            else:
+                instances = scan_campaign_entry(directory_path, name)
+                stale = [fuzzer_name for fuzzer_name in registry
+                         if fuzzer_name == name or fuzzer_name.startswith(f"{name}/")]
+            for fuzzer_name in stale:
+                registry.pop(fuzzer_name, None)
+            registry.update(instances)
+
+        registry = dict(sorted(registry.items()))
+        if registry != fuzzers:
+            store.publish(entry, 'fuzzers', registry)
+
+
+def get_fuzzers(directory_path: str, artifact: Optional[str] = None) -> List[str]:
+    """
+    Returns the sorted names of a campaign's fuzzer instances, discovering them on first use.
+
+    Args:
+        directory_path (str): Campaign output directory.
+        artifact (str, optional): Only return instances having this artifact, e.g. "plot_data".
+    """
+    fuzzers = get_data_store().get(directory_path, None, 'fuzzers')
+    if fuzzers is None:
+        refresh_fuzzer_registry(directory_path)
+        fuzzers = get_data_store().get(directory_path, None, 'fuzzers')
+    return [fuzzer_name for fuzzer_name, artifacts in fuzzers.items()
+            if artifact is None or artifact in artifacts]
+
+
+def fuzzer_node(fuzzer_name: str) -> str:
+    """
+    Returns the node directory of an instance, "" for instances directly in the campaign directory.
+    """
+    return fuzzer_name.rpartition('/')[0]
+
+
+def get_nodes(directory_path: str) -> Dict[str, List[str]]:
+    """
+    Returns the campaign's instances grouped by node (see fuzzer_node).
+    """
+    nodes = {}
+    for fuzzer_name in get_fuzzers(directory_path):
+        nodes.setdefault(fuzzer_node(fuzzer_name), []).append(fuzzer_name)
+    return nodes
+
+
+@profiled()
+def refresh_fuzzer_stats(directory_path: str):
+    """
+    Re-parses only the fuzzer_stats files whose mtime or size changed and
+    publishes a new typed DataFrame if any did.
+    """
+    store = get_data_store()
+    entry = store.entry(directory_path)
+    with entry.lock:
+        # file path -> ((mtime_ns, size), raw stats)
+        cache = entry.cursors.setdefault('fuzzer_stats', {})
+        file_paths = {os.path.join(directory_path, fuzzer_name, 'fuzzer_stats'): fuzzer_name
+                      for fuzzer_name in get_fuzzers(directory_path, 'fuzzer_stats')}
+        changed = set(file_paths) != set(cache)
+        for file_path in set(cache) - set(file_paths):
+            del cache[file_path]
+
+        for file_path in file_paths:
+            try:
+                stat = os.stat(file_path)
+            except FileNotFoundError:
+                # removed since the registry was updated
+                continue
+            signature = (stat.st_mtime_ns, stat.st_size)
+            if file_path in cache and cache[file_path][0] == signature:
+                continue
+            cache[file_path] = (signature, parse_fuzzer_stats(file_path))
+            changed = True
+
+        if changed or 'fuzzer_stats' not in entry.tables:
+            stats = {file_paths[file_path]: values
+                     for file_path, (_, values) in cache.items()}
+            store.publish(entry, 'fuzzer_stats',
+                          build_fuzzer_stats_frame(stats))
+
+
+def append_table(entry: StoreEntry, table: str, new_rows: pd.DataFrame, from_start: bool):
+    """
+    Publishes new rows of an append-only table, replacing it when from_start is set.
+    Must be called while holding entry.lock.
+    """
+    store = get_data_store()
+    existing = entry.tables.get(table)
+    if len(new_rows.columns) == 0:
+        # header line not fully written yet: publish nothing, or no rows with the known columns
+        if existing is None:
+            return
+        new_rows = existing.iloc[:0]
+    if from_start or existing is None:
+        store.publish(entry, table, new_rows)
+    elif not new_rows.empty:
+        store.publish(entry, table, concat_frames([existing, new_rows]))
+
+
+def open_tail(entry: StoreEntry, source: str, has_header: bool = True) -> Tuple[FileTail, Optional[Dict[str, pd.DataFrame]]]:
+    """
+    Returns the entry's cursor over one of its fuzzer's files, creating it on first use.
+
+    A new cursor is restored from the file's snapshot cache when one matches, in which
+    case the cached tables are published and returned so callers can rebuild derived
+    tables. Must be called while holding entry.lock.
+
+    Args:
+        entry (StoreEntry): Entry of the fuzzer owning the file.
+        source (str): File name under the fuzzer directory, e.g. "plot_data".
+        has_header (bool): Whether the file starts with a header line.
 
-            if not new_plot_data.empty:
-                updated_data = pd.concat(
-                    [existing_plot_data, new_plot_data], ignore_index=True)
+    Returns:
+        Tuple[FileTail, Optional[Dict[str, pd.DataFrame]]]: Cursor, and the restored tables if any.
+    """
+    tail = entry.cursors.get(source)
+    if tail is not None:
+        return tail, None
+    file_path = os.path.join(entry.directory_path, entry.fuzzer_name, source)
+    tail = FileTail(file_path, has_header=has_header)
+    cache = SnapshotCache(snapshot_path(
+        entry.directory_path, entry.fuzzer_name, source), file_path)
+    entry.cursors[source] = tail
+    entry.cursors[f"{source}_snapshot"] = cache
+
+    restored = cache.restore()
+    if restored is None:
+        return tail, None
+    state, tables = restored
+    tail.restore(state)
+    # snapshots saved before compaction (or with COMPACT_FRAMES=0) hold default dtypes
+    tables = {table: compact_frame(df, table) for table, df in tables.items()}
+    for table, df in tables.items():
+        get_data_store().publish(entry, table, df)
+    return tail, tables
+
+
+def save_snapshot(entry: StoreEntry, source: str, tables: List[str], reset: bool, force: bool = False):
+    """
+    Appends new rows of the tables parsed from source to its snapshot cache.
+    Must be called while holding entry.lock.
+    """
+    entry.cursors[f"{source}_snapshot"].save(
+        entry.cursors[source].state(),
+        {table: entry.tables[table] for table in tables if table in entry.tables},
+        reset=reset, force=force)
+
+
+# snapshotted source file -> tables parsed from it
+SNAPSHOT_SOURCES = {
+    'plot_data': ['plot_data'],
+    'queue_data': ['queue_data'],
+    'introspection.txt': ['introspection_queue', 'introspection_unique', 'introspection_cycles'],
+    'plot_det_data': ['plot_det_data'],
+}
+
+
+def flush_snapshots(directory_path: str, fuzzer_name: str):
+    """
+    Saves every snapshot cache of a fuzzer now instead of waiting for SNAPSHOT_INTERVAL.
+    """
+    entry = get_data_store().entry(directory_path, fuzzer_name)
+    with entry.lock:
+        for source, tables in SNAPSHOT_SOURCES.items():
+            if source in entry.cursors:
+                save_snapshot(entry, source, tables, False, force=True)
+
+
+def refresh_csv_table(entry: StoreEntry, file_path: str, table: str,
+                      loader: Callable[[str, FileTail], Tuple[pd.DataFrame, bool]]):
+    """
+    Tails a plot_data/queue_data style file into a store entry, publishing only when rows were added.
+
+    Args:
+        entry (StoreEntry): Entry of the fuzzer owning the file.
+        file_path (str): Path to the file.
+        table (str): Table name in the entry, also used to key its cursor.
+        loader (Callable): load_plot_data or load_queue_data.
+    """
+    with entry.lock:
+        tail, _ = open_tail(entry, table)
+        new_rows, from_start = loader(file_path, tail)
+        append_table(entry, table, new_rows, from_start)
+        save_snapshot(entry, table, [table], from_start)
+
+
+@profiled()
+def refresh_plot_data(directory_path: str, fuzzer_name: str):
+    entry = get_data_store().entry(directory_path, fuzzer_name)
+    refresh_csv_table(entry, os.path.join(directory_path, fuzzer_name, "plot_data"),
+                      'plot_data', load_plot_data)
 
-                st.session_state[base_name] = {
-                    'plot_data': updated_data,
-                    'plot_data_len': len(updated_data),
-                    'new_plot_data': new_plot_data
-                }
-    logger.info(f"update_session_plot_data,{time.time() - start_time}")
 
+@profiled()
+def refresh_queue_data(directory_path: str, fuzzer_name: str):
+    """
+    Tails a fuzzer's queue_data into the queue_data table and extends its id-indexed corpus table.
+    """
+    entry = get_data_store().entry(directory_path, fuzzer_name)
+    file_path = os.path.join(directory_path, fuzzer_name, "queue_data")
+    with entry.lock:
+        tail, restored = open_tail(entry, 'queue_data')
+        if restored is not None:
+            get_data_store().publish(entry, 'corpus',
+                                     build_corpus_table(restored['queue_data']))
+        new_rows, from_start = load_queue_data(file_path, tail)
+        append_table(entry, 'queue_data', new_rows, from_start)
+        save_snapshot(entry, 'queue_data', ['queue_data'], from_start)
+
+        if len(new_rows.columns) == 0:
+            # empty file or header line not fully written yet: as in append_table, a
+            # rewritten file leaves no rows with the known columns, otherwise nothing
+            if not from_start or 'queue_data' not in entry.tables:
+                return
+            new_rows = entry.tables['queue_data']
+        existing = None if from_start else entry.tables.get('corpus')
+        if from_start or existing is None or not new_rows.empty:
+            get_data_store().publish(entry, 'corpus',
+                                     build_corpus_table(new_rows, existing))
+
+
+@profiled()
+def refresh_introspection(directory_path: str, fuzzer_name: str):
+    """
+    Tails a fuzzer's introspection.txt into the introspection_queue, introspection_unique
+    and introspection_cycles tables, and keeps the introspection_index lineage index
+    (result path -> row of introspection_queue) up to date.
+    """
+    entry = get_data_store().entry(directory_path, fuzzer_name)
+    file_path = os.path.join(directory_path, fuzzer_name, "introspection.txt")
+    with entry.lock:
+        tail, restored = open_tail(
+            entry, 'introspection.txt', has_header=False)
+        index = entry.tables.get('introspection_index')
+        if restored is not None:
+            index = dict(zip(restored['introspection_queue']['result'].tolist(),
+                             range(len(restored['introspection_queue']))))
+        records, from_start = load_introspection(file_path, tail)
+
+        queue = entry.tables.get('introspection_queue')
+        offset = 0 if from_start or queue is None else len(queue)
+        for record_type, new_rows in records.items():
+            append_table(entry, f"introspection_{record_type}", new_rows, from_start)
+        if from_start or restored is not None or index is None or not records['queue'].empty:
+            if from_start or index is None:
+                index = {}
+            elif index is entry.tables.get('introspection_index'):
+                # a new dict, readers may be iterating the published one
+                index = dict(index)
+            index.update(zip(records['queue']['result'].tolist(), range(
+                offset, offset + len(records['queue']))))
+            # published after the rows it points to
+            get_data_store().publish(entry, 'introspection_index', index)
+        save_snapshot(entry, 'introspection.txt',
+                      [f"introspection_{record_type}" for record_type in records], from_start)
+
+
+@profiled()
+def refresh_plot_det_data(directory_path: str, fuzzer_name: str):
+    entry = get_data_store().entry(directory_path, fuzzer_name)
+    file_path = os.path.join(directory_path, fuzzer_name, "plot_det_data")
+    with entry.lock:
+        tail, _ = open_tail(entry, 'plot_det_data', has_header=False)
+        new_rows, from_start = load_plot_det_data(file_path, tail)
+        append_table(entry, 'plot_det_data', new_rows, from_start)
+        save_snapshot(entry, 'plot_det_data', ['plot_det_data'], from_start)
+
+
+def get_introspection_record(directory_path: str, fuzzer_name: str, result: str) -> Optional[pd.Series]:
+    """
+    Looks up the QUEUE introspection record that produced a queue entry.
 
+    Args:
+        directory_path (str): Campaign output directory.
+        fuzzer_name (str): Fuzzer owning the queue entry.
+        result (str): Full path of the queue entry as written in introspection.txt.
+
+    Returns:
+        Optional[pd.Series]: Record with original, mutation and result, or None if unknown.
+    """
+    index = get_table(directory_path, fuzzer_name, 'introspection_index')
+    queue = get_table(directory_path, fuzzer_name, 'introspection_queue')
+    if index is None or queue is None:
+        return None
+    position = index.get(result)
+    # the index may already point at rows published after queue was fetched
+    if position is None or position >= len(queue):
+        return None
+    return queue.iloc[position]
+
+
+@profiled()
+def update_session_fuzzer_stats(directory_path):
+    refresh_fuzzer_registry(directory_path)
+    refresh_fuzzer_stats(directory_path)
+    st.session_state.data_version = get_data_store().version(directory_path)
+
+
+@profiled()
+def update_session_plot_data(directory_path):
+    refresh_fuzzer_registry(directory_path)
+    for base_name in stqdm(get_fuzzers(directory_path, 'plot_data'), desc="Updating plot data"):
+        refresh_plot_data(directory_path, base_name)
+    st.session_state.data_version = get_data_store().version(directory_path)
+
+
+@profiled()
 def update_session_queue_data(directory_path):
-    start_time = time.time()
-    for file_path in stqdm(glob.glob(os.path.join(directory_path, "*", "queue_data")), desc="Updating queue data"):
-        base_name = os.path.basename(os.path.dirname(file_path))
-        if base_name not in st.session_state or 'queue_data' not in st.session_state[base_name]:
-            queue_data = load_queue_data(file_path)
-            st.session_state[base_name] = {
-                'queue_data': queue_data,
-                'queue_data_len': len(queue_data)
-            }
+    refresh_fuzzer_registry(directory_path)
+    for base_name in stqdm(get_fuzzers(directory_path, 'queue_data'), desc="Updating queue data"):
+        refresh_queue_data(directory_path, base_name)
+    st.session_state.data_version = get_data_store().version(directory_path)
+
+
+def get_fuzzer_stats(directory_path: str) -> pd.DataFrame:
+    """
+    Returns the shared fuzzer_stats DataFrame of a campaign, indexed by fuzzer name.
+    """
+    return get_data_store().get(directory_path, None, 'fuzzer_stats')
+
+
+def get_table(directory_path: str, fuzzer_name: str, table: str) -> Optional[pd.DataFrame]:
+    """
+    Returns a shared table (e.g. plot_data, queue_data) of one fuzzer, or None if not loaded yet.
+    """
+    return get_data_store().get(directory_path, fuzzer_name, table)
 
-        else:
-            existing_queue_data = st.session_state[base_name]['queue_data']
-            existing_queue_data_len = st.session_state[base_name]['queue_data_len']
-            new_queue_data = load_queue_data(
-                file_path, skip_rows=existing_queue_data_len)
 
-            if not new_queue_data.empty:
-                updated_data = pd.concat(
-                    [existing_queue_data, new_queue_data], ignore_index=True)
+def get_queue_entry(directory_path: str, fuzzer_name: str, queue_id: int) -> Optional[pd.Series]:
+    """
+    Looks up one queue entry of a fuzzer by id in its corpus table.
+
+    Returns:
+        Optional[pd.Series]: queue_data stats and decoded filename fields, or None if not loaded yet.
+    """
+    corpus = get_table(directory_path, fuzzer_name, 'corpus')
+    if corpus is None:
+        return None
+    queue_id = int(queue_id)
+    # ids are normally dense, making the id its own position
+    if 0 <= queue_id < len(corpus) and corpus.index[queue_id] == queue_id:
+        return corpus.iloc[queue_id]
+    if queue_id in corpus.index:
+        return corpus.loc[queue_id]
+    return None
+
+
+def get_tables(directory_path: str, table: str) -> Dict[str, pd.DataFrame]:
+    """
+    Returns a shared table of every registered fuzzer that has it loaded, keyed by fuzzer name.
+    """
+    fuzzer_names = set(get_fuzzers(directory_path))
+    return {fuzzer_name: df for fuzzer_name, df in get_data_store().tables(directory_path, table).items()
+            if fuzzer_name in fuzzer_names}
 
-                st.session_state[base_name] = {
-                    'queue_data': updated_data,
-                    'queue_data_len': len(updated_data),
-                }
 
-    logger.info(f"update_session_queue_data,{time.time() - start_time}")
+def get_table_footprint(directory_path: str) -> pd.DataFrame:
+    """
+    Returns the memory held by each fuzzer's DataFrame tables (e.g. plot_data, corpus).
+
+    Sizes are cached per table object, so only tables published since the last
+    call are measured.
+
+    Returns:
+        pd.DataFrame: Bytes indexed by fuzzer name, one column per table and a total.
+    """
+    store = get_data_store()
+    entry = store.entry(directory_path)
+    with entry.lock:
+        # (fuzzer name, table) -> (DataFrame, bytes)
+        cache = entry.cursors.setdefault('table_footprint', {})
+        footprint = {}
+        for fuzzer_name in get_fuzzers(directory_path):
+            tables = dict(store.entry(directory_path, fuzzer_name).tables)
+            for table, df in tables.items():
+                if not isinstance(df, pd.DataFrame):
+                    continue
+                cached = cache.get((fuzzer_name, table))
+                if cached is None or cached[0] is not df:
+                    cached = cache[(fuzzer_name, table)] = (df, frame_bytes(df))
+                footprint.setdefault(fuzzer_name, {})[table] = cached[1]
+        for key in set(cache) - {(fuzzer_name, table) for fuzzer_name, tables in footprint.items()
+                                 for table in tables}:
+            del cache[key]
+    df = pd.DataFrame.from_dict(footprint, orient='index').fillna(0).astype('int64').sort_index()
+    df['total'] = df.sum(axis=1)
+    return df
+
+def get_series(directory_path: str, fuzzer_name: str, table: str, y_column: str,
+               x_column: str = 'relative_time', window: Optional[Tuple[float, float]] = None,
+               max_points: int = MAX_POINTS_PER_TRACE) -> Optional[pd.DataFrame]:
+    """
+    Returns one column of a time-series table downsampled for plotting.
+
+    Rows are picked from min/max aggregation tiers kept in the store entry and
+    extended as rows arrive, so spikes survive and the cost does not grow with
+    the history length. A window narrow enough to fit max_points is returned at
+    full resolution.
+
+    Args:
+        directory_path (str): Campaign output directory.
+        fuzzer_name (str): Fuzzer owning the table.
+        table (str): Table name, e.g. "plot_data".
+        y_column (str): Column to plot.
+        x_column (str): Sorted column to plot against.
+        window (Tuple[float, float], optional): Inclusive x range to restrict to.
+        max_points (int): Point budget of the trace.
+
+    Returns:
+        Optional[pd.DataFrame]: x_column and y_column of the selected rows, or None if not loaded yet.
+    """
+    entry = get_data_store().entry(directory_path, fuzzer_name)
+    with entry.lock:
+        df = entry.tables.get(table)
+        if df is None:
+            return None
+        x = df[x_column].to_numpy()
+        y = df[y_column].to_numpy(dtype=float)
+        tiers = entry.cursors.setdefault(
+            ('tiers', table, x_column, y_column), MinMaxTiers())
+        tiers.update(x, y)
+        start, stop = 0, len(df)
+        if window is not None:
+            start = int(np.searchsorted(x, window[0], side='left'))
+            stop = int(np.searchsorted(x, window[1], side='right'))
+        indices = tiers.select(y, start, stop, max_points)
+    return df[[x_column, y_column]].iloc[indices]
+
+
+def time_window_selector(key: str, latest_time: float) -> Optional[Tuple[float, float]]:
+    """
+    Renders a time window picker for a time-series chart.
+
+    Args:
+        key (str): Unique widget key.
+        latest_time (float): Latest relative_time (seconds) of the charted data.
+
+    Returns:
+        Optional[Tuple[float, float]]: Selected (start, end) in seconds, or None for all data.
+    """
+    choice = st.radio("Time window", list(TIME_WINDOWS),
+                      horizontal=True, key=key)
+    if choice == 'Custom':
+        start_col, end_col = st.columns(2)
+        latest_minutes = float(latest_time) / 60
+        start = start_col.number_input(
+            "From (min)", min_value=0.0, value=0.0, key=f"{key}_start")
+        end = end_col.number_input(
+            "To (min)", min_value=0.0, value=latest_minutes, key=f"{key}_end")
+        return start * 60, end * 60
+    if TIME_WINDOWS.get(choice):
+        # numpy scalars of a narrow dtype would overflow on the subtraction
+        latest_time = float(latest_time)
+        return latest_time - TIME_WINDOWS[choice], latest_time
+    return None
+
+
+def get_latest_time(directory_path: str, table: str = 'plot_data', x_column: str = 'relative_time') -> float:
+    """
+    Returns the largest x value over every fuzzer's table, 0 if none is loaded.
+    """
+    return max((float(df[x_column].iloc[-1]) for df in get_tables(directory_path, table).values() if not df.empty),
+               default=0.0)
+
 
 def check_last_updated(update_interval):
     f"**Last updated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} (Update interval: {update_interval}s)"
\ No newline at end of file